@@ -1,12 +1,209 @@
 import argparse
-from autotest_generation.services.AutotestRunner import run_autotests
+import sys
+from autotest_generation.services.AutotestRunner import run_autotests, run_autotests_async, run_load_test
+from autotest_generation.services.RunHistory import SELECT_MODES
+from autotest_generation.services.AutotestRuntime import FIXTURE_MODES
+from autotest_generation.services.LoadRunner import parse_mix
+from autotest_generation.utils.Constants import HISTORY_FILE, STEP_TIMINGS_FILE, LOAD_REPORT_FILE
+from test_case_generation.utils.Constants import CACHE_DIR
+from test_case_generation.utils.PhaseProfiler import add_profiling_arguments, profiler_from_args, finish_profiling
 
 def main():
     parser = argparse.ArgumentParser(description="Генерация и запуск автотестов по YAML")
-    parser.add_argument("--yaml-file", required=True, help="Путь к YAML-файлу с тест-кейсами")
+    parser.add_argument("--yaml-file", required=True, help="Путь к YAML-файлу (или .jsonl) с тест-кейсами")
     parser.add_argument("--allure-results", default="allure-results", help="Куда сложить результаты Allure")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Число параллельных процессов pytest: кейсы делятся на шарды, "
+             "выровненные по длительностям прошлых запусков (по умолчанию: 1)"
+    )
+    parser.add_argument(
+        "--history-file",
+        default=str(HISTORY_FILE),
+        help=f"Файл истории запусков: результат, длительность и хэш каждого кейса "
+             f"(по умолчанию: {HISTORY_FILE})"
+    )
+    parser.add_argument(
+        "--select",
+        choices=SELECT_MODES,
+        default="all",
+        help="Какие кейсы запускать по истории: all — все, failed — упавшие в прошлый раз, "
+             "changed — новые и изменённые с последнего успешного запуска, "
+             "failed-first — все, но сначала упавшие и изменённые. По умолчанию: all"
+    )
+    parser.add_argument(
+        "--step-timings",
+        default=str(STEP_TIMINGS_FILE),
+        help=f"Куда сохранить сводку времени каждого запроса кейсов в JSON (по умолчанию: {STEP_TIMINGS_FILE})"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=str(CACHE_DIR),
+        help=f"Папка для кэша разобранных тест-кейсов (по умолчанию: {CACHE_DIR})"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Не использовать кэш разобранных тест-кейсов"
+    )
+    parser.add_argument(
+        "--maxfail",
+        type=int,
+        default=None,
+        help="Остановить прогон после стольких упавших тестов (суммарно по всем шардам)"
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        default=None,
+        help="Остановить прогон через столько секунд (код возврата 2)"
+    )
+    parser.add_argument(
+        "--fixtures",
+        choices=FIXTURE_MODES,
+        default="per-test",
+        help="Ресурсы для кейсов (--engine pytest): per-test — каждый кейс создаёт и удаляет свой ресурс; "
+             "shared — кейсы, которые только читают ресурс, используют один экземпляр на модуль/шард, "
+             "меняющие ресурс создают свой, а очистка выполняется один раз в конце. По умолчанию: per-test"
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["pytest", "asyncio"],
+        default="pytest",
+        help="Чем выполнять кейсы: pytest (генерация автотестов и запуск pytest) или asyncio "
+             "(прямое параллельное выполнение YAML без генерации кода). По умолчанию: pytest"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=32,
+        help="Для --engine asyncio: сколько кейсов выполняется одновременно (по умолчанию: 32)"
+    )
+    parser.add_argument(
+        "--per-host",
+        type=int,
+        default=None,
+        help="Для --engine asyncio и --load: максимум одновременных соединений к одному хосту "
+             "(по умолчанию: 10, для --load — по числу --users)"
+    )
+    transport = parser.add_argument_group(
+        "транспорт сгенерированных тестов (--engine pytest)"
+    )
+    transport.add_argument("--pool-size", type=int, help="Соединений в пуле на хост (по умолчанию: 10)")
+    transport.add_argument("--connect-timeout", type=float, help="Таймаут соединения, секунды (по умолчанию: 5)")
+    transport.add_argument("--read-timeout", type=float, help="Таймаут ожидания ответа, секунды (по умолчанию: 30)")
+    transport.add_argument(
+        "--retries",
+        type=int,
+        help="Повторы запроса: при ошибке соединения — для любого метода, при 502/503/504 и обрыве чтения — "
+             "только для идемпотентных (GET, PUT, DELETE, ...). По умолчанию: 2"
+    )
+    transport.add_argument("--backoff", type=float, help="Множитель паузы между повторами, секунды (по умолчанию: 0.5)")
+    load = parser.add_argument_group(
+        "нагрузочный режим: шаги кейсов воспроизводятся как профиль трафика"
+    )
+    load.add_argument("--load", action="store_true", help="Запустить нагрузку вместо автотестов")
+    load.add_argument("--duration", type=float, default=60.0, help="Длительность нагрузки, секунды (по умолчанию: 60)")
+    load.add_argument(
+        "--users",
+        type=int,
+        default=10,
+        help="Виртуальных пользователей: без --rps — одновременных потоков запросов, с --rps — максимум "
+             "параллельных запросов. Предусловия и постусловия выполняются один раз на пользователя, "
+             "кроме кейсов, шаги которых удаляют или создают ресурс: у них — в каждой итерации (по умолчанию: 10)"
+    )
+    load.add_argument(
+        "--rps",
+        type=float,
+        default=None,
+        help="Целевое число запросов в секунду, включая предусловия и постусловия (по умолчанию: без ограничения)"
+    )
+    load.add_argument(
+        "--mix",
+        action="append",
+        metavar="ШАБЛОН=ВЕС",
+        help="Вес кейсов с подходящим именем (шаблон fnmatch), например get_*=5 или delete_*=0. "
+             "Без --mix вес берётся из ключа кейса 'Вес' или равен 1. Можно повторять"
+    )
+    load.add_argument(
+        "--load-report",
+        default=str(LOAD_REPORT_FILE),
+        help=f"Куда сохранить отчёт нагрузки в JSON (по умолчанию: {LOAD_REPORT_FILE})"
+    )
+    load.add_argument(
+        "--max-error-rate",
+        type=float,
+        default=1.0,
+        help="Допустимая доля ошибок, проценты; больше — код возврата 1 (по умолчанию: 1)"
+    )
+    add_profiling_arguments(parser)
     args = parser.parse_args()
-    run_autotests(args.yaml_file, args.allure_results)
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+    profiler = profiler_from_args(args)
+    cache_dir = None if args.no_cache else args.cache_dir
+    try:
+        if args.load:
+            returncode = run_load_test(
+                args.yaml_file,
+                profiler=profiler,
+                duration=args.duration,
+                users=args.users,
+                rps=args.rps,
+                mix=mix,
+                limit_per_host=args.per_host,
+                report_file=args.load_report,
+                max_error_rate=args.max_error_rate,
+                cache_dir=cache_dir
+            )
+        elif args.engine == "asyncio":
+            returncode = run_autotests_async(
+                args.yaml_file,
+                args.allure_results,
+                profiler=profiler,
+                concurrency=args.concurrency,
+                limit_per_host=args.per_host or 10,
+                history_file=args.history_file,
+                select=args.select,
+                step_timings=args.step_timings,
+                cache_dir=cache_dir
+            )
+        else:
+            returncode = run_autotests(
+                args.yaml_file,
+                args.allure_results,
+                profiler=profiler,
+                workers=args.workers,
+                history_file=args.history_file,
+                transport=_transport_config(args),
+                maxfail=args.maxfail,
+                deadline=args.deadline,
+                select=args.select,
+                fixtures=args.fixtures,
+                step_timings=args.step_timings,
+                cache_dir=cache_dir
+            )
+    finally:
+        finish_profiling(profiler, args)
+    sys.exit(returncode)
+
+
+def _transport_config(args):
+    """
+    Явно заданные настройки транспорта; остальные берутся по умолчанию в сгенерированных тестах.
+    """
+    options = {
+        "pool_size": args.pool_size,
+        "connect_timeout": args.connect_timeout,
+        "read_timeout": args.read_timeout,
+        "retries": args.retries,
+        "backoff": args.backoff,
+    }
+    return {key: value for key, value in options.items() if value is not None}
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,207 @@
+import asyncio
+import json
+import ssl
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote, urlsplit
+
+# Символы, которые не перекодируются в пути и query (как requote_uri в requests)
+_SAFE_URL_CHARS = "!#$%&'()*+,/:;=?@[]~"
+
+
+class HttpResponse:
+    """
+    Ответ с тем же интерфейсом, что нужен проверкам AutotestRuntime:
+    status_code, headers, content, text, json().
+    """
+
+    __slots__ = ('status_code', 'headers', 'content')
+
+    def __init__(self, status_code: int, headers: Dict[str, str], content: bytes):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    @property
+    def text(self) -> str:
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+
+class _Connection:
+    __slots__ = ('reader', 'writer')
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class AsyncHttpClient:
+    """
+    Асинхронный HTTP/1.1 клиент на asyncio streams с пулом keep-alive соединений.
+
+    - соединения переиспользуются (Connection: keep-alive), пул — на каждый хост (scheme, host, port);
+    - limit_per_host ограничивает число одновременно открытых соединений к одному хосту;
+    - ответы читаются по Content-Length, chunked или до закрытия соединения;
+    - если переиспользованное соединение оказалось закрыто сервером, запрос повторяется на новом.
+    """
+
+    def __init__(self, limit_per_host: int = 10, timeout: float = 30.0):
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self._idle: Dict[Tuple[str, str, int], List[_Connection]] = {}
+        self._slots: Dict[Tuple[str, str, int], asyncio.Semaphore] = {}
+        # Статистика: сколько соединений открыто и сколько запросов выполнено
+        self.connections_opened = 0
+        self.requests_sent = 0
+
+    async def __aenter__(self) -> 'AsyncHttpClient':
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        for connections in self._idle.values():
+            for conn in connections:
+                conn.close()
+        self._idle.clear()
+
+    async def request(
+            self,
+            method: str,
+            url: str,
+            headers: Optional[Dict[str, str]] = None,
+            cookies: Optional[Dict[str, str]] = None,
+            json_body: Any = None
+    ) -> HttpResponse:
+        """
+        Выполняет запрос; json_body (если не None) сериализуется в JSON, как json= в requests.
+        """
+        parts = urlsplit(url)
+        scheme = parts.scheme or 'http'
+        host = parts.hostname or 'localhost'
+        port = parts.port or (443 if scheme == 'https' else 80)
+        key = (scheme, host, port)
+
+        target = quote(parts.path or '/', safe=_SAFE_URL_CHARS)
+        if parts.query:
+            target += '?' + quote(parts.query, safe=_SAFE_URL_CHARS)
+
+        body = b''
+        request_headers = {'Host': parts.netloc, 'Connection': 'keep-alive', 'Accept': '*/*'}
+        if json_body is not None:
+            body = json.dumps(json_body).encode('utf-8')
+            request_headers['Content-Type'] = 'application/json'
+        for name, value in (headers or {}).items():
+            request_headers[str(name)] = str(value)
+        if cookies:
+            request_headers['Cookie'] = '; '.join(f"{k}={v}" for k, v in cookies.items())
+        if body or method.upper() in ('POST', 'PUT', 'PATCH'):
+            request_headers['Content-Length'] = str(len(body))
+
+        head = f"{method.upper()} {target} HTTP/1.1\r\n" + ''.join(
+            f"{name}: {value}\r\n" for name, value in request_headers.items()
+        ) + "\r\n"
+        payload = head.encode('latin-1') + body
+
+        slots = self._slots.get(key)
+        if slots is None:
+            slots = self._slots[key] = asyncio.Semaphore(self.limit_per_host)
+        async with slots:
+            return await asyncio.wait_for(self._send(key, method.upper(), payload), self.timeout)
+
+    async def _send(self, key: Tuple[str, str, int], method: str, payload: bytes) -> HttpResponse:
+        conn = self._take_idle(key)
+        if conn is not None:
+            try:
+                return await self._exchange(key, conn, method, payload)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                # Сервер закрыл keep-alive соединение, пока оно лежало в пуле
+                conn.close()
+        conn = await self._open(key)
+        return await self._exchange(key, conn, method, payload)
+
+    def _take_idle(self, key: Tuple[str, str, int]) -> Optional[_Connection]:
+        connections = self._idle.get(key)
+        while connections:
+            conn = connections.pop()
+            if not conn.writer.is_closing() and not conn.reader.at_eof():
+                return conn
+            conn.close()
+        return None
+
+    async def _open(self, key: Tuple[str, str, int]) -> _Connection:
+        scheme, host, port = key
+        ssl_context = ssl.create_default_context() if scheme == 'https' else None
+        reader, writer = await asyncio.open_connection(host, port, ssl=ssl_context)
+        self.connections_opened += 1
+        return _Connection(reader, writer)
+
+    async def _exchange(self, key: Tuple[str, str, int], conn: _Connection, method: str, payload: bytes) -> HttpResponse:
+        conn.writer.write(payload)
+        await conn.writer.drain()
+        try:
+            response, keep_alive = await self._read_response(conn.reader, method)
+        except BaseException:
+            conn.close()
+            raise
+        self.requests_sent += 1
+        if keep_alive:
+            self._idle.setdefault(key, []).append(conn)
+        else:
+            conn.close()
+        return response
+
+    @staticmethod
+    async def _read_response(reader: asyncio.StreamReader, method: str) -> Tuple[HttpResponse, bool]:
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Соединение закрыто сервером")
+        version, status, *_ = status_line.decode('latin-1').split(' ', 2)
+        status_code = int(status)
+
+        headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        keep_alive = version.upper() == 'HTTP/1.1'
+        connection = headers.get('connection', '').lower()
+        if connection == 'close':
+            keep_alive = False
+        elif connection == 'keep-alive':
+            keep_alive = True
+
+        if method == 'HEAD' or status_code in (204, 304) or 100 <= status_code < 200:
+            content = b''
+        elif 'chunked' in headers.get('transfer-encoding', '').lower():
+            content = await AsyncHttpClient._read_chunked(reader)
+        elif 'content-length' in headers:
+            content = await reader.readexactly(int(headers['content-length']))
+        else:
+            # Без длины тело идёт до закрытия соединения
+            content = await reader.read()
+            keep_alive = False
+        return HttpResponse(status_code, headers, content), keep_alive
+
+    @staticmethod
+    async def _read_chunked(reader: asyncio.StreamReader) -> bytes:
+        chunks = []
+        while True:
+            size_line = await reader.readline()
+            size = int(size_line.split(b';', 1)[0].strip() or b'0', 16)
+            if size == 0:
+                # Завершающие заголовки (trailers) до пустой строки
+                while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                return b''.join(chunks)
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
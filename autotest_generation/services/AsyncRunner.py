@@ -0,0 +1,178 @@
+import asyncio
+import json
+import time
+import traceback
+from typing import Any, Dict, List, Optional
+
+from autotest_generation.services.AsyncHttpClient import AsyncHttpClient
+from autotest_generation.services.AllureResultWriter import AllureResultWriter, AllureStep, now_ms
+from autotest_generation.services import AutotestRuntime as runtime
+
+
+class CaseResult:
+    __slots__ = ('name', 'status', 'message', 'duration_s', 'timings')
+
+    def __init__(
+            self,
+            name: str,
+            status: str,
+            message: Optional[str],
+            duration_s: float,
+            timings: Optional[List[list]] = None
+    ):
+        self.name = name
+        self.status = status
+        self.message = message
+        self.duration_s = duration_s
+        # Тайминги запросов кейса (см. AutotestRuntime.record_timing)
+        self.timings = timings or []
+
+
+class AsyncRunner:
+    """
+    Исполнитель тест-кейсов на asyncio без pytest и генерации кода.
+
+    Семантика та же, что у сгенерированных тестов (AutotestRuntime): предусловия с проверкой
+    статуса и сохранением id в контекст, подстановка плейсхолдеров из контекста кейса,
+    основной шаг, проверка ожидаемого статуса/тела и времени ответа, постусловия (и после падения кейса).
+    У каждого кейса свой контекст; одновременно выполняется не больше concurrency кейсов,
+    соединения к хосту — из общего keep-alive пула (не больше limit_per_host).
+    Результаты пишутся в формате Allure в allure_results.
+    """
+
+    def __init__(
+            self,
+            base_url: str,
+            allure_results: Optional[str] = None,
+            concurrency: int = 32,
+            limit_per_host: int = 10,
+            timeout: float = 30.0
+    ):
+        self.base_url = base_url
+        self.concurrency = concurrency
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self.allure = AllureResultWriter(allure_results) if allure_results else None
+
+    def run(self, test_cases: List[Dict[str, Any]]) -> List[CaseResult]:
+        return asyncio.run(self.run_async(test_cases))
+
+    async def run_async(self, test_cases: List[Dict[str, Any]]) -> List[CaseResult]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        async with AsyncHttpClient(limit_per_host=self.limit_per_host, timeout=self.timeout) as client:
+
+            async def bounded(test_case):
+                async with semaphore:
+                    return await self.run_case(client, test_case)
+
+            # gather сохраняет порядок результатов как у кейсов
+            return await asyncio.gather(*(bounded(tc) for tc in test_cases))
+
+    async def run_case(self, client: AsyncHttpClient, test_case: Dict[str, Any]) -> CaseResult:
+        name = test_case.get("Тест-кейс", "unknown_test")
+        context: Dict[str, Any] = {}
+        steps: List[AllureStep] = []
+        timings: List[list] = []
+        start = now_ms()
+        status, message, trace = "passed", None, None
+        deleted = set()
+
+        try:
+            step = self._step(steps, 'Предусловия')
+            captures = runtime.precondition_captures(test_case)
+            for pre, capture in zip(test_case.get("Предусловия") or [], captures):
+                response, _ = await self._send(client, context, pre, timings, "Предусловия")
+                runtime.check_precondition(response, context, capture)
+            step.finish()
+
+            step = self._step(steps, 'Основной шаг')
+            last_response, last_ms = None, None
+            created = runtime.step_captures(test_case)
+            for number, request in enumerate(test_case.get("Шаги") or []):
+                last_response, last_ms = await self._send(client, context, request, timings)
+                if number in created:
+                    runtime.save_created_id(last_response, context, created[number])
+                runtime.check_step(last_response, context, request, last_ms)
+                runtime.track_deleted(context, self.base_url, request, deleted)
+            step.finish()
+
+            step = self._step(steps, 'Проверка ожидаемого результата')
+            runtime.check_expected(last_response, test_case.get("Ожидаемый результат") or {}, context)
+            step.finish()
+
+            latency, repeats = runtime.latency_repeats(test_case)
+            if latency and last_ms is not None:
+                step = self._step(steps, 'Проверка времени ответа')
+                samples = [last_ms]
+                for _ in range(repeats - 1):
+                    samples.append((await self._send(client, context, test_case["Шаги"][-1], timings, "Повторы"))[1])
+                runtime.check_latency(samples, latency)
+                step.finish()
+        except AssertionError as e:
+            status, message, trace = "failed", str(e), traceback.format_exc()
+            step.finish("failed", message)
+        except Exception as e:
+            # Ошибка соединения, таймаут, невалидный JSON и т.п. — кейс "сломан", а не провален
+            status, message, trace = "broken", f"{type(e).__name__}: {e}", traceback.format_exc()
+            step.finish("broken", message)
+        finally:
+            # Как runtime.run_postconditions: и после падения, статус не проверяется, ошибки игнорируются
+            step = self._step(steps, 'Постусловия')
+            for post in test_case.get("Постусловия") or []:
+                if not runtime.is_resolved(context, post) or runtime.is_deleted(context, self.base_url, post, deleted):
+                    continue
+                try:
+                    await self._send(client, context, post, timings, "Постусловия")
+                except Exception:
+                    pass
+            step.finish()
+
+        stop = now_ms()
+        if self.allure:
+            attachments = [(
+                "Тайминги шагов",
+                json.dumps(runtime.timing_summary(timings), ensure_ascii=False, indent=2),
+                "application/json"
+            )] if timings else None
+            self.allure.write(
+                name, test_case.get("Описание", ""), status, steps, start, stop,
+                message=message, trace=trace, attachments=attachments
+            )
+        return CaseResult(name, status, message, (stop - start) / 1000, timings)
+
+    @staticmethod
+    def _step(steps: List[AllureStep], name: str) -> AllureStep:
+        step = AllureStep(name)
+        steps.append(step)
+        return step
+
+    async def _send(
+            self,
+            client: AsyncHttpClient,
+            context: Dict[str, Any],
+            request: Dict[str, Any],
+            timings: List[list],
+            section: str = "Шаги"
+    ):
+        """
+        Выполняет запрос, возвращает (ответ, время в мс) и добавляет тайминг в timings.
+        """
+        method, url, headers, cookies, body = runtime.prepare_request(context, self.base_url, request)
+        start = time.perf_counter()
+        response = await client.request(method, url, headers=headers, cookies=cookies, json_body=body)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        runtime.record_timing(timings, section, method, url[len(self.base_url):], response.status_code, elapsed_ms)
+        return response, elapsed_ms
+
+
+def print_summary(results: List[CaseResult]) -> int:
+    """
+    Печатает итоги и возвращает код возврата как у pytest: 0 — все прошли, 1 — есть упавшие.
+    """
+    failed = [r for r in results if r.status != "passed"]
+    for result in failed:
+        print(f"[{result.status.upper()}] {result.name}: {result.message}")
+    print(f"Кейсов: {len(results)}, прошло: {len(results) - len(failed)}, упало: {len(failed)}")
+    if not results:
+        return 5
+    return 1 if failed else 0
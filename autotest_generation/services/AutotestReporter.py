@@ -0,0 +1,55 @@
+"""
+Плагин pytest для сгенерированных тестов: построчно пишет результаты тестов в JSON Lines
+(файл из переменной окружения MBT_REPORT_FILE) сразу по завершении каждого теста —
+вместе с таймингами шагов, которые тест добавил в user_properties как ('timings', ...).
+AutotestRunner читает файл по мере записи и показывает прогресс, не дожидаясь конца прогона.
+
+Копируется в папку сгенерированных тестов как conftest.py.
+"""
+import json
+import os
+
+_report_path = os.environ.get("MBT_REPORT_FILE")
+_report_file = None
+
+
+def _write(record):
+    global _report_file
+    if _report_file is None:
+        # Построчная буферизация: каждая запись сразу видна читающему процессу
+        _report_file = open(_report_path, "a", encoding="utf-8", buffering=1)
+    _report_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def pytest_runtest_logreport(report):
+    if not _report_path:
+        return
+    # Результат теста — фаза call; ошибка или пропуск на setup означают, что call не будет
+    if report.when == "call" or (report.when == "setup" and report.outcome != "passed"):
+        outcome = report.outcome
+        if report.when == "setup" and outcome == "failed":
+            outcome = "error"
+        record = {
+            "nodeid": report.nodeid,
+            "outcome": outcome,
+            "duration": round(report.duration, 6),
+            "message": _failure_message(report),
+        }
+        timings = dict(report.user_properties).get("timings")
+        if timings:
+            record["timings"] = timings
+        _write(record)
+
+
+def _failure_message(report):
+    if not report.failed or not report.longrepr:
+        return ""
+    crash = getattr(report.longrepr, "reprcrash", None)
+    if crash is not None:
+        return crash.message.splitlines()[0]
+    return str(report.longrepr).splitlines()[-1]
+
+
+def pytest_sessionfinish(session, exitstatus):
+    if _report_file is not None:
+        _report_file.close()
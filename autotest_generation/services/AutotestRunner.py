@@ -1,29 +1,360 @@
-import shutil
+import json
+import os
 import subprocess
-from autotest_generation.utils.Constants import GENERATED_DIR
+import threading
+import time
+from pathlib import Path
+from autotest_generation.utils.Constants import GENERATED_DIR, HISTORY_FILE, STEP_TIMINGS_FILE, LOAD_REPORT_FILE
 from autotest_generation.utils.TestCaseReader import load_test_cases
-from autotest_generation.services.AutotestGenerator import create_test_file
+from autotest_generation.services.AutotestGenerator import create_test_file, make_test_id
+from autotest_generation.services.ShardPlanner import ShardPlanner
+from autotest_generation.services.RunHistory import RunHistory, case_hash
+from autotest_generation.services.IncrementalCodegen import IncrementalCodegen, content_key
+from autotest_generation.services.AsyncRunner import AsyncRunner, print_summary
+from autotest_generation.services.LoadRunner import LoadRunner, case_weights, print_load_report
+from autotest_generation.services.LiveProgress import ProgressTracker, ReportTail
+from autotest_generation.services.AutotestRuntime import timing_summary
+from test_case_generation.utils.PhaseProfiler import phase
 
-def run_autotests(yaml_file, allure_results):
-    test_data = load_test_cases(yaml_file)
+# Плагин отчёта о результатах, кладётся в папку сгенерированных тестов как conftest.py
+REPORTER_SOURCE = Path(__file__).with_name("AutotestReporter.py")
+# Коды возврата при досрочной остановке: как у pytest для упавших тестов и прерванного прогона
+MAXFAIL_RETURNCODE = 1
+DEADLINE_RETURNCODE = 2
+
+
+def run_autotests(
+        yaml_file,
+        allure_results,
+        profiler=None,
+        workers=1,
+        history_file=HISTORY_FILE,
+        transport=None,
+        maxfail=None,
+        deadline=None,
+        select="all",
+        fixtures="per-test",
+        step_timings=STEP_TIMINGS_FILE,
+        cache_dir=None
+):
+    """
+    profiler (PhaseProfiler) замеряет фазы testcase_read, codegen и pytest_run.
+    transport — настройки транспорта сгенерированных тестов (см. AutotestTransport).
+    fixtures — per-test (каждый кейс создаёт и удаляет свои ресурсы) или shared
+    (читающие кейсы используют общий ресурс модуля/шарда, очистка — в конце, см. ResourcePool).
+
+    Вывод pytest передаётся построчно по мере появления, результаты тестов читаются
+    из JSON Lines отчёта (плагин AutotestReporter) — по ним выводится прогресс и оценка времени.
+    maxfail — остановить все процессы после стольких упавших тестов (суммарно);
+    deadline — остановить прогон через столько секунд.
+
+    Результаты пишутся в историю запусков history_file (см. RunHistory). По ней select
+    выбирает кейсы ещё до генерации кода: all, failed (упавшие в прошлый раз),
+    changed (новые и изменённые с последнего успешного запуска) или failed-first.
+    Тайминги запросов каждого кейса собираются из отчёта и сохраняются сводкой в step_timings.
+    cache_dir — кэш разобранных кейсов (см. load_test_cases): неизменённый файл не парсится заново.
+
+    При workers > 1 кейсы раскладываются по шардам (отдельный модуль и файл данных на шард,
+    баланс — по длительностям прошлых запусков из истории) и каждый шард запускается
+    отдельным процессом pytest со своей requests.Session. Результаты Allure всех шардов
+    складываются в одну папку allure_results.
+    Возвращает итоговый код возврата pytest.
+    """
+    with phase(profiler, "testcase_read"):
+        test_data = load_test_cases(yaml_file, cache_dir)
     base_url = test_data["environment"]["base_url"]
-    test_cases = test_data["test_cases"]
+    history = RunHistory(history_file)
+    test_cases = history.select(test_data["test_cases"], select)
+    print(f"Выбрано кейсов: {len(test_cases)} из {len(test_data['test_cases'])} (режим {select})")
+    if not test_cases:
+        print("Нет кейсов для запуска.")
+        return 0
+
+    planner = ShardPlanner(history.durations())
+    shards = planner.plan(test_cases, workers) if workers > 1 else [list(range(len(test_cases)))]
+
+    # Папка не пересоздаётся: неизменённые файлы (и их __pycache__) остаются как есть
+    with phase(profiler, "codegen"):
+        codegen = IncrementalCodegen(GENERATED_DIR)
+        keep = []
+        if len(shards) == 1:
+            test_files = [GENERATED_DIR / "test_todos.py"]
+            keep += create_test_file(
+                test_cases, base_url, test_files[0], transport=transport, codegen=codegen, fixtures=fixtures
+            )
+        else:
+            test_files = []
+            for number, shard in enumerate(shards, 1):
+                test_file = GENERATED_DIR / f"test_shard_{number}.py"
+                keep += create_test_file(
+                    [test_cases[i] for i in shard],
+                    base_url,
+                    test_file,
+                    data_file=f"test_shard_{number}.json",
+                    transport=transport,
+                    codegen=codegen,
+                    fixtures=fixtures
+                )
+                test_files.append(test_file)
+        reporter_source = REPORTER_SOURCE.read_bytes()
+        codegen.write("conftest.py", content_key(reporter_source), lambda: reporter_source)
+        keep.append("conftest.py")
+        codegen.prune(keep)
+        codegen.save()
+    print(f"Тесты сгенерированы: {', '.join(str(f) for f in test_files)} "
+          f"(записано файлов: {codegen.written}, без изменений: {codegen.unchanged})")
+
+    # pytest идёт в отдельном процессе: память дочернего процесса tracemalloc не видит
+    with phase(profiler, "pytest_run", memory=False):
+        if len(test_files) == 1:
+            targets = [GENERATED_DIR]
+            report_files = [GENERATED_DIR / "report.jsonl"]
+        else:
+            targets = test_files
+            report_files = [test_file.with_suffix(".jsonl") for test_file in test_files]
+        commands = [["pytest", str(target), f"--alluredir={allure_results}"] for target in targets]
+        if len(commands) > 1:
+            # Кэш pytest отключён: шарды не должны одновременно писать в .pytest_cache
+            for cmd in commands:
+                cmd += ["-p", "no:cacheprovider"]
+        cases_by_id = {make_test_id(tc): tc for tc in test_cases}
+        timings = {}
+        returncode = _run_pytest_processes(
+            commands,
+            report_files,
+            len(test_cases),
+            maxfail,
+            deadline,
+            on_result=lambda record: _record_result(history, cases_by_id, timings, record)
+        )
+    history.save()
+    write_step_timings(step_timings, timings)
 
-    if GENERATED_DIR.exists():
-        shutil.rmtree(GENERATED_DIR)
-    GENERATED_DIR.mkdir(parents=True, exist_ok=True)
-
-    test_file_path = GENERATED_DIR / "test_todos.py"
-    create_test_file(test_cases, base_url, test_file_path)
-    print(f"Тесты сгенерированы: {test_file_path}")
-
-    cmd = ["pytest", str(GENERATED_DIR), f"--alluredir={allure_results}"]
-    print("Запуск:", " ".join(cmd))
-    completed = subprocess.run(cmd, capture_output=True, text=True)
-    print("Pytest завершён с кодом:", completed.returncode)
-    print(">>> stdout:\n", completed.stdout)
-    print(">>> stderr:\n", completed.stderr)
-    if completed.returncode == 0:
+    if returncode == 0:
         print("Тесты прошли успешно!")
     else:
         print("Тесты завершились с ошибками.")
+    return returncode
+
+
+def run_autotests_async(
+        yaml_file,
+        allure_results,
+        profiler=None,
+        concurrency=32,
+        limit_per_host=10,
+        history_file=HISTORY_FILE,
+        select="all",
+        step_timings=STEP_TIMINGS_FILE,
+        cache_dir=None
+):
+    """
+    Прогон кейсов напрямую асинхронным исполнителем (без генерации кода и pytest).
+    profiler замеряет фазы testcase_read и async_run. Кейсы читаются (cache_dir), выбираются и результаты
+    записываются в историю так же, как в run_autotests. Возвращает код возврата как у pytest.
+    """
+    with phase(profiler, "testcase_read"):
+        test_data = load_test_cases(yaml_file, cache_dir)
+    history = RunHistory(history_file)
+    test_cases = history.select(test_data["test_cases"], select)
+    print(f"Выбрано кейсов: {len(test_cases)} из {len(test_data['test_cases'])} (режим {select})")
+    if not test_cases:
+        print("Нет кейсов для запуска.")
+        return 0
+    runner = AsyncRunner(
+        test_data["environment"]["base_url"],
+        allure_results=allure_results,
+        concurrency=concurrency,
+        limit_per_host=limit_per_host
+    )
+    print(f"Запуск {len(test_cases)} кейсов (asyncio, параллельно до {concurrency})")
+    # Хэши — до запуска: исполнитель кэширует в кейсах скомпилированные шаблоны и проверки
+    hashes = [case_hash(tc) for tc in test_cases]
+    with phase(profiler, "async_run"):
+        results = runner.run(test_cases)
+    for tc, hash_value, result in zip(test_cases, hashes, results):
+        history.record(tc, result.status, result.duration_s, hash_value)
+    history.save()
+    write_step_timings(step_timings, {make_test_id(tc): r.timings for tc, r in zip(test_cases, results) if r.timings})
+    returncode = print_summary(results)
+    if returncode == 0:
+        print("Тесты прошли успешно!")
+    else:
+        print("Тесты завершились с ошибками.")
+    return returncode
+
+
+def run_load_test(
+        yaml_file,
+        profiler=None,
+        duration=60.0,
+        users=10,
+        rps=None,
+        mix=None,
+        limit_per_host=None,
+        report_file=LOAD_REPORT_FILE,
+        max_error_rate=1.0,
+        cache_dir=None
+):
+    """
+    Нагрузочный прогон шагов кейсов (см. LoadRunner): duration секунд, users виртуальных пользователей,
+    при заданном rps — с постоянной частотой запросов; mix — веса кейсов [(шаблон имени, вес)].
+    profiler замеряет фазы testcase_read и load_run, cache_dir — как в run_autotests.
+    Отчёт сохраняется в report_file.
+    Код возврата 1, если доля ошибок больше max_error_rate процентов или не было ни одного запроса.
+    """
+    with phase(profiler, "testcase_read"):
+        test_data = load_test_cases(yaml_file, cache_dir)
+    test_cases = test_data["test_cases"]
+    weights = case_weights(test_cases, mix)
+    selected = sum(1 for w in weights if w > 0)
+    mode = f"{rps} запросов в секунду, до {users} параллельно" if rps else f"{users} пользователей"
+    print(f"Нагрузка: {selected} кейсов из {len(test_cases)}, {duration:g} с, {mode}")
+    runner = LoadRunner(
+        test_data["environment"]["base_url"],
+        duration,
+        users=users,
+        rps=rps,
+        limit_per_host=limit_per_host
+    )
+    with phase(profiler, "load_run"):
+        report = runner.run(test_cases, weights)
+    print_load_report(report)
+    with open(report_file, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Отчёт нагрузки: {report_file}")
+    if not report["requests"] or report["error_rate"] > max_error_rate:
+        print("Нагрузка завершилась с ошибками.")
+        return 1
+    return 0
+
+
+def _record_result(history, cases_by_id, timings, record):
+    test_id = RunHistory.test_id_from_nodeid(record.get("nodeid", ""))
+    test_case = cases_by_id.get(test_id)
+    if test_case is not None:
+        history.record(test_case, record.get("outcome", "failed"), record.get("duration"))
+    if record.get("timings"):
+        timings[test_id] = record["timings"]
+
+
+def write_step_timings(path, timings, slowest=20):
+    """
+    Компактная сводка таймингов прогона:
+    {"cases": {id: {"total_ms", "steps": [[раздел, запрос, статус, мс], ...]}},
+     "slowest": [[id, раздел, запрос, статус, мс], ...]} — самые долгие запросы прогона.
+    """
+    if not timings:
+        return
+    steps = [[test_id] + step for test_id, case_timings in timings.items() for step in case_timings]
+    steps.sort(key=lambda step: -step[4])
+    summary = {
+        "cases": {test_id: timing_summary(case_timings) for test_id, case_timings in timings.items()},
+        "slowest": steps[:slowest],
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, separators=(",", ":"))
+    print(f"Тайминги шагов: {path}")
+
+
+def _run_pytest_processes(commands, report_files, total, maxfail=None, deadline=None, on_result=None):
+    """
+    Запускает процессы pytest одновременно, построчно транслирует их вывод и по отчётам
+    ведёт прогресс (каждая запись отчёта передаётся и в on_result). Останавливает все процессы
+    при достижении maxfail упавших тестов или по истечении deadline секунд.
+    Возвращает общий код возврата.
+    """
+    processes, pumps, tails = [], [], []
+    for number, (cmd, report_file) in enumerate(zip(commands, report_files), 1):
+        if report_file.exists():
+            report_file.unlink()
+        prefix = f"[шард {number}] " if len(commands) > 1 else ""
+        print(f"{prefix}Запуск:", " ".join(cmd))
+        process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+            env=dict(os.environ, MBT_REPORT_FILE=str(report_file.resolve()))
+        )
+        pump = threading.Thread(target=_pump_output, args=(process.stdout, prefix), daemon=True)
+        pump.start()
+        processes.append(process)
+        pumps.append(pump)
+        tails.append(ReportTail(report_file))
+
+    progress = ProgressTracker(total)
+    stop_reason = None
+    while any(process.poll() is None for process in processes):
+        time.sleep(0.2)
+        for tail in tails:
+            for record in tail.read():
+                progress.add(record)
+                if on_result:
+                    on_result(record)
+        progress.maybe_print()
+        if maxfail and progress.failed >= maxfail:
+            stop_reason = f"достигнут --maxfail {maxfail}"
+        elif deadline and progress.elapsed() >= deadline:
+            stop_reason = f"истёк --deadline {deadline} с"
+        if stop_reason:
+            print(f"Остановка прогона: {stop_reason}")
+            _terminate(processes)
+            break
+
+    for pump in pumps:
+        pump.join()
+    for tail in tails:
+        for record in tail.read():
+            progress.add(record)
+            if on_result:
+                on_result(record)
+    print(progress.summary())
+
+    returncodes = [process.wait() for process in processes]
+    for number, code in enumerate(returncodes, 1):
+        prefix = f"Шард {number}: p" if len(processes) > 1 else "P"
+        print(f"{prefix}ytest завершён с кодом:", code)
+    if stop_reason:
+        returncode = MAXFAIL_RETURNCODE if maxfail and progress.failed >= maxfail else DEADLINE_RETURNCODE
+    else:
+        returncode = combine_returncodes(returncodes)
+    if len(processes) > 1 or stop_reason:
+        print("Итоговый код возврата:", returncode)
+    return returncode
+
+
+def _pump_output(stream, prefix):
+    """
+    Построчно печатает вывод дочернего процесса, не накапливая его в памяти.
+    """
+    for line in stream:
+        print(f"{prefix}{line}", end="", flush=True)
+    stream.close()
+
+
+def _terminate(processes, timeout=10):
+    for process in processes:
+        if process.poll() is None:
+            process.terminate()
+    for process in processes:
+        try:
+            process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+def combine_returncodes(returncodes):
+    """
+    Общий код возврата шардов: 0 — только если все шарды прошли;
+    иначе наиболее серьёзный код (2 — прерван, 3 — внутренняя ошибка, 4 — ошибка запуска,
+    1 — упавшие тесты). 5 (тестов не найдено) учитывается, только если так у всех шардов.
+    """
+    failures = [code for code in returncodes if code not in (0, 5)]
+    if failures:
+        return max(failures)
+    if returncodes and all(code == 5 for code in returncodes):
+        return 5
+    return 0
@@ -0,0 +1,878 @@
+"""
+Общий исполнитель автотестов.
+
+Сгенерированный модуль не содержит кода шагов: он загружает файл данных с тест-кейсами
+и одним параметризованным тестом прогоняет каждый кейс через run_test_case.
+Этот файл копируется в папку сгенерированных тестов рядом с модулем (как autotest_runtime.py),
+поэтому зависит только от стандартной библиотеки (allure импортируется при запуске кейса).
+Те же функции подготовки запросов и проверок использует асинхронный исполнитель (AsyncRunner).
+
+В режиме общих ресурсов (fixtures: shared) кейсы, которые только читают ресурс, получают
+один созданный экземпляр на модуль (ResourcePool), а постусловия всех кейсов выполняются
+один раз в конце модуля.
+"""
+import json
+import math
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+# Статусы, при которых предусловие считается выполненным
+PRECONDITION_STATUSES = (200, 201, 202)
+# Куда сохраняется id созданного ресурса, если плейсхолдер не удалось определить по кейсу
+DEFAULT_CAPTURE = "id_todo"
+# Методы шагов, которые не меняют ресурс: такие кейсы в режиме shared используют общий экземпляр
+READ_ONLY_METHODS = ("GET", "HEAD", "OPTIONS")
+FIXTURE_MODES = ("per-test", "shared")
+# Ожидание по времени ответа в "Ожидаемый результат": {Максимум: мс, p95: мс, Повторы: N}
+LATENCY_KEY = "Время ответа"
+
+
+def load_cases(data_file: Path) -> Tuple[str, List[Dict[str, Any]], List[str], Dict[str, Any]]:
+    """
+    Читает файл данных: (base_url, список кейсов, id кейсов для pytest, настройки).
+    Настройки: transport — транспорт (см. autotest_transport), fixtures — per-test или shared.
+    """
+    with open(data_file, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    options = {
+        "transport": data.get("transport") or {},
+        "fixtures": data.get("fixtures") or "per-test",
+    }
+    return data["base_url"], data["test_cases"], data["ids"], options
+
+
+# Плейсхолдер в пути или строке тела: <id_todo>
+PLACEHOLDER_RE = re.compile(r"<(.*?)>")
+
+# Разделы кейса с запросами
+REQUEST_SECTIONS = ("Предусловия", "Шаги", "Постусловия")
+
+
+def compile_template(text):
+    """
+    Шаблон подстановки для строки: [литералы, слоты], литералов на один больше, чем слотов
+    (литерал, слот, литерал, ...). None, если плейсхолдеров в строке нет.
+    """
+    literals, slots = [], []
+    position = 0
+    for match in PLACEHOLDER_RE.finditer(text):
+        literals.append(text[position:match.start()])
+        slots.append(match.group(1))
+        position = match.end()
+    if not slots:
+        return None
+    literals.append(text[position:])
+    return [literals, slots]
+
+
+def fill_template(template, context):
+    """
+    Заполняет слоты шаблона значениями из контекста; плейсхолдер без значения остаётся как есть.
+    """
+    literals, slots = template
+    parts = [literals[0]]
+    for name, literal in zip(slots, literals[1:]):
+        parts.append(str(context[name]) if name in context else f"<{name}>")
+        parts.append(literal)
+    return "".join(parts)
+
+
+def _collect_body_slots(value, keypath, slots):
+    if isinstance(value, str):
+        template = compile_template(value)
+        if template is not None:
+            slots.append([keypath, template])
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            _collect_body_slots(item, keypath + [key], slots)
+    elif isinstance(value, list):
+        for index, item in enumerate(value):
+            _collect_body_slots(item, keypath + [index], slots)
+
+
+def compile_request(request):
+    """
+    Предкомпилированный запрос шага: метод, путь (или его шаблон), заголовки
+    (с Content-Type для JSON-тела) и слоты тела — пути [ключ, индекс, ...] к строкам с плейсхолдерами.
+    Выполняется при генерации (AutotestGenerator), так что при запуске остаётся только заполнить слоты.
+    """
+    method, path = request['Endpoint'].split()[:2]
+    body = request.get('Body', {})
+    headers = dict(request.get('Headers') or {})
+    # Если тело является словарём, используем параметр json= для автоматической сериализации
+    if isinstance(body, dict):
+        headers.setdefault("Content-Type", "application/json")
+    body_slots = []
+    _collect_body_slots(body, [], body_slots)
+    return {
+        "method": method,
+        "path": path,
+        "path_template": compile_template(path),
+        "headers": headers,
+        "body_slots": body_slots,
+    }
+
+
+def compile_test_case(test_case):
+    """
+    Копия кейса, в которой к каждому запросу добавлена предкомпилированная форма (ключ "_compiled"),
+    к кейсу — плейсхолдеры, в которые предусловия и создающие шаги сохраняют id (ключи "_captures", "_step_captures"),
+    а к ожидаемым результатам — план проверки тела (ключ "_plan").
+    """
+    compiled = dict(test_case)
+    for section in REQUEST_SECTIONS:
+        if test_case.get(section):
+            compiled[section] = [dict(request, _compiled=compile_request(request)) for request in test_case[section]]
+    compiled["_captures"] = precondition_captures(test_case)
+    compiled["_step_captures"] = step_captures(test_case)
+    if isinstance(test_case.get("Ожидаемый результат"), dict):
+        expected = test_case["Ожидаемый результат"]
+        compiled["Ожидаемый результат"] = dict(expected, _plan=compile_expected(expected))
+    for step in compiled.get("Шаги") or []:
+        if isinstance(step.get("Ожидаемый результат"), dict):
+            step["Ожидаемый результат"] = dict(step["Ожидаемый результат"],
+                                               _plan=compile_expected(step["Ожидаемый результат"]))
+    return compiled
+
+
+def precondition_captures(test_case):
+    """
+    Для каждого предусловия — имя плейсхолдера, в который сохраняется id созданного ресурса.
+    Определяется по следующим запросам кейса: POST /todos создаёт ресурс, к которому
+    дальше обращаются как /todos/<id_todo>, значит id сохраняется в id_todo.
+    """
+    captured = test_case.get("_captures")
+    if captured is not None:
+        return captured
+    requests = [request for section in REQUEST_SECTIONS for request in test_case.get(section) or []]
+    return [_capture_name(pre, requests[index + 1:]) or DEFAULT_CAPTURE
+            for index, pre in enumerate(test_case.get("Предусловия") or [])]
+
+
+def step_captures(test_case):
+    """
+    Шаги, которые сами создают ресурс: {номер шага: плейсхолдер для id из ответа}.
+    POST /todos в шагах, если постусловия удаляют /todos/<id_todo>: без сохранения id
+    постусловие осталось бы с плейсхолдером и созданный ресурс не удалился бы.
+    Шаги с явным "Сохранить" и плейсхолдеры, которые заполняют предусловия, не учитываются.
+    """
+    captured = test_case.get("_step_captures")
+    if captured is not None:
+        return captured
+    steps = test_case.get("Шаги") or []
+    later = steps + list(test_case.get("Постусловия") or [])
+    taken = set(precondition_captures(test_case))
+    captures = {}
+    for index, step in enumerate(steps):
+        if step["Endpoint"].split()[0].upper() != "POST" or step.get("Сохранить"):
+            continue
+        name = _capture_name(step, later[index + 1:])
+        if name and name not in taken:
+            captures[index] = name
+            taken.add(name)
+    return captures
+
+
+def _capture_name(request, later):
+    """
+    Плейсхолдер, под которым следующие запросы обращаются к ресурсу, созданному request:
+    POST /todos, затем /todos/<id_todo> — id_todo. None, если таких обращений нет.
+    """
+    prefix = _endpoint_path(request).rstrip("/") + "/<"
+    for other in later:
+        path = _endpoint_path(other)
+        if path.startswith(prefix) and ">" in path[len(prefix):]:
+            return path[len(prefix):path.index(">", len(prefix))]
+    return None
+
+
+def _endpoint_path(request):
+    parts = request["Endpoint"].split()
+    return parts[1].split("?")[0] if len(parts) > 1 else ""
+
+
+def is_read_only(test_case):
+    """
+    Кейс только читает ресурс: все его шаги — GET/HEAD/OPTIONS.
+    """
+    steps = test_case.get("Шаги") or []
+    return bool(steps) and all(step["Endpoint"].split()[0].upper() in READ_ONLY_METHODS for step in steps)
+
+
+def fill_body(body, body_slots, context):
+    """
+    Тело с заполненными слотами. Без слотов тело передаётся как есть, без копирования;
+    иначе копируются только контейнеры на пути к слотам.
+    """
+    if not body_slots:
+        return body
+    if body_slots[0][0] == []:
+        # Тело — сама строка с плейсхолдерами
+        return fill_template(body_slots[0][1], context)
+
+    new_body = _shallow_copy(body)
+    copied = {(): new_body}
+    for keypath, template in body_slots:
+        container = new_body
+        prefix = ()
+        for key in keypath[:-1]:
+            prefix += (key,)
+            child = copied.get(prefix)
+            if child is None:
+                child = copied[prefix] = _shallow_copy(container[key])
+                container[key] = child
+            container = child
+        container[keypath[-1]] = fill_template(template, context)
+    return new_body
+
+
+def _shallow_copy(value):
+    return dict(value) if isinstance(value, dict) else list(value)
+
+
+def _compiled_request(request):
+    compiled = request.get("_compiled")
+    if compiled is None:
+        # Кейс не прошёл через генерацию (например, исполнитель asyncio) — компилируем один раз
+        compiled = request["_compiled"] = compile_request(request)
+    return compiled
+
+
+def is_resolved(context, request):
+    """
+    Все плейсхолдеры пути запроса есть в контексте. Постусловие с незаполненным id
+    (предусловие не выполнилось) пропускается: удалять нечего.
+    """
+    path_template = _compiled_request(request)["path_template"]
+    return path_template is None or all(name in context for name in path_template[1])
+
+
+def prepare_request(context, base_url, request):
+    """
+    Запрос шага ({Endpoint, Headers, Cookies, Body}) с подставленными плейсхолдерами:
+    (method, url, headers, cookies, body).
+    Заголовки общие для всех вызовов — менять их нельзя.
+    """
+    compiled = _compiled_request(request)
+    path_template = compiled["path_template"]
+    path = fill_template(path_template, context) if path_template else compiled["path"]
+    body = fill_body(request.get('Body', {}), compiled["body_slots"], context)
+    return compiled["method"], f"{base_url}{path}", compiled["headers"], request.get('Cookies', {}), body
+
+
+def send_request(session, context, base_url, request, timings=None, section="Шаги"):
+    """
+    Выполняет запрос шага через requests.Session.
+    Если сессия замеряет запросы (autotest_transport), тайминги прикладываются к текущему шагу Allure.
+    Возвращает (ответ, время запроса в мс); время также добавляется в timings (см. record_timing).
+    """
+    method, url, headers, cookies, body = prepare_request(context, base_url, request)
+    start = time.perf_counter()
+    response = session.request(method, url, headers=headers, cookies=cookies, json=body)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    timing = getattr(response, "timing", None)
+    if timing is not None:
+        attach_timing(timing)
+    if timings is not None:
+        record_timing(timings, section, method, url[len(base_url):], response.status_code, elapsed_ms)
+    return response, elapsed_ms
+
+
+def record_timing(timings, section, method, path, status, elapsed_ms):
+    """
+    Тайминг шага кейса: [раздел, "МЕТОД путь", статус, мс] — компактно для сводки.
+    """
+    timings.append([section, f"{method} {path}", status, round(elapsed_ms, 3)])
+
+
+def attach_timing(timing):
+    import allure
+
+    allure.attach(
+        json.dumps(timing, ensure_ascii=False, indent=2),
+        name=f"Тайминги: {timing['request']}",
+        attachment_type=allure.attachment_type.JSON
+    )
+
+
+def run_precondition(session, context, base_url, pre, capture=DEFAULT_CAPTURE, timings=None):
+    response, _ = send_request(session, context, base_url, pre, timings, "Предусловия")
+    check_precondition(response, context, capture)
+
+
+def is_deleted(context, base_url, request, deleted):
+    method, url = prepare_request(context, base_url, request)[:2]
+    return method.upper() == "DELETE" and url in deleted
+
+
+def track_deleted(context, base_url, step, deleted):
+    """
+    Запоминает URL успешного шага DELETE (вызывается после проверок шага).
+    """
+    method, url = prepare_request(context, base_url, step)[:2]
+    if method.upper() == "DELETE":
+        deleted.add(url)
+
+
+def run_postconditions(session, context, base_url, test_case, timings=None, deleted=()):
+    """
+    Постусловия кейса (обычно удаление созданных ресурсов) — и после падения кейса.
+    Статус не проверяется (200/204/404 и т.д.), ошибки запросов игнорируются, как в ResourcePool.cleanup.
+    deleted — URL, уже удалённые успешным шагом DELETE (сценарий удаляет свой ресурс сам): их постусловия пропускаются.
+    """
+    for post in test_case.get("Постусловия") or []:
+        if not is_resolved(context, post) or is_deleted(context, base_url, post, deleted):
+            continue
+        try:
+            send_request(session, context, base_url, post, timings, "Постусловия")
+        except Exception:
+            pass
+
+
+def check_precondition(response, context, capture=DEFAULT_CAPTURE):
+    """
+    Проверяет статус ответа предусловия и сохраняет id созданного ресурса в контекст
+    под именем плейсхолдера capture (см. precondition_captures).
+    """
+    assert response.status_code in PRECONDITION_STATUSES, \
+        f'Неожиданный статус {response.status_code} при предусловии'
+    save_created_id(response, context, capture)
+
+
+def save_created_id(response, context, capture):
+    """
+    Сохраняет id из ответа (если он есть) под именем capture; ответ без id не ошибка.
+    """
+    try:
+        resp_json = response.json()
+        if isinstance(resp_json, dict) and 'id' in resp_json:
+            context[capture] = resp_json['id']
+    except Exception:
+        pass
+
+
+class ResourcePool:
+    """
+    Общие ресурсы модуля сгенерированных тестов (режим fixtures: shared).
+
+    acquire выполняет цепочку предусловий один раз на модуль: одинаковые префиксы цепочек
+    (родительские ресурсы и сам ресурс) создаются однажды, дальше кейсы получают копию
+    сохранённого контекста. Ошибка создания запоминается и повторяется для всех кейсов,
+    которым нужен этот ресурс, без новых запросов.
+    defer откладывает постусловия (с уже подставленными id) до cleanup в конце модуля;
+    одинаковые запросы выполняются один раз, в порядке последнего появления —
+    так вложенные ресурсы удаляются раньше родителей.
+    """
+
+    def __init__(self, session, base_url):
+        self.session = session
+        self.base_url = base_url
+        self.contexts = {}
+        self.deferred = {}
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self, preconditions, captures):
+        context = {}
+        key = []
+        for pre, capture in zip(preconditions, captures):
+            key.append([pre["Endpoint"], pre.get("Body")])
+            key_str = json.dumps(key, ensure_ascii=False, sort_keys=True, default=str)
+            entry = self.contexts.get(key_str)
+            if entry is None:
+                entry = dict(context)
+                try:
+                    run_precondition(self.session, entry, self.base_url, pre, capture)
+                    self.created += 1
+                except Exception as e:
+                    entry = e
+                self.contexts[key_str] = entry
+            else:
+                self.reused += 1
+            if isinstance(entry, Exception):
+                raise AssertionError(f'Общий ресурс не создан ({pre["Endpoint"]}): {entry}')
+            context = entry
+        return dict(context)
+
+    def defer(self, context, requests):
+        for request in requests:
+            method, url, headers, cookies, body = prepare_request(context, self.base_url, request)
+            key = json.dumps([method, url, body], ensure_ascii=False, sort_keys=True, default=str)
+            # Повторно отложенный запрос переносится в конец очереди
+            self.deferred.pop(key, None)
+            self.deferred[key] = (method, url, headers, cookies, body)
+
+    def cleanup(self):
+        for method, url, headers, cookies, body in self.deferred.values():
+            try:
+                self.session.request(method, url, headers=headers, cookies=cookies, json=body)
+            except Exception:
+                # Очистка не должна ронять прогон: ресурс мог быть уже удалён тестом
+                pass
+        self.deferred.clear()
+
+    def report(self):
+        return f"Общие ресурсы: создано {self.created}, переиспользовано {self.reused}"
+
+
+def check_step(response, context, step, elapsed_ms=None):
+    """
+    Проверки самого шага (сценарные кейсы): его ожидаемый результат (включая время ответа
+    по одному замеру elapsed_ms) и сохранение значений из ответа в контекст для следующих шагов
+    ("Сохранить": {плейсхолдер: поле ответа}, вложенные поля — через точку).
+    """
+    expected = step.get("Ожидаемый результат")
+    if expected:
+        check_expected(response, expected, context)
+        if expected.get(LATENCY_KEY) and elapsed_ms is not None:
+            check_latency([elapsed_ms], expected[LATENCY_KEY])
+    save_captures(response, context, step)
+
+
+def save_captures(response, context, step):
+    """
+    Сохраняет значения из ответа шага в контекст: "Сохранить": {плейсхолдер: поле ответа}.
+    """
+    captures = step.get("Сохранить")
+    if captures:
+        resp_json = response.json() if response.text else {}
+        for name, field in captures.items():
+            value = resp_json
+            for key in str(field).split("."):
+                assert isinstance(value, dict) and key in value, \
+                    f'В ответе {step["Endpoint"]} нет поля {field} для <{name}>'
+                value = value[key]
+            context[name] = value
+
+
+def check_expected(response, expected, context=None):
+    """
+    Проверяет статус и тело ответа по ожидаемому результату:
+      Статус     — код ответа;
+      Body       — ожидаемое тело (см. compile_matcher); значение "<плейсхолдер>" сравнивается
+                   со значением из контекста кейса (например, id, сохранённый из ответа создания);
+      Пути       — {селектор: ожидаемое значение}, селекторы в стиле JSONPath: $.items[*].id, $.meta['total'];
+      Сравнение  — partial (по умолчанию) или exact.
+    План проверки компилируется один раз на кейс (compile_expected) и сохраняется в ключе "_plan".
+    Все расхождения собираются и выводятся одним сообщением.
+    """
+    status = expected.get("Статус")
+    if status:
+        assert response is not None, 'Нет ответа основного шага'
+        assert str(response.status_code) == str(status), \
+            f'Ожидался статус {status}, получен {response.status_code}'
+
+    plan = expected.get("_plan")
+    if plan is None:
+        plan = expected["_plan"] = compile_expected(expected)
+    if plan["body"] is None and not plan["paths"]:
+        return
+
+    assert response is not None, 'Нет ответа основного шага'
+    resp_json = response.json() if response.text else None
+    diffs = []
+    if plan["body"] is not None:
+        match_plan(plan["body"], resp_json, "$", diffs, context)
+    for selector in plan["paths"]:
+        match_selector(selector, resp_json, diffs, context)
+    if diffs:
+        raise AssertionError(format_diffs(diffs))
+
+
+# ----------------------------------------------------------------------------
+# Проверка тела ответа
+# ----------------------------------------------------------------------------
+
+MATCH_MODES = ("partial", "exact")
+# Сколько расхождений выводить в сообщении
+MAX_DIFFS = 20
+# Значение, целиком состоящее из плейсхолдера: сравнивается со значением из контекста
+_REF_RE = re.compile(r"<([^<>]+)>")
+# Сегмент селектора: .key, ['key'], [0], [*]
+_SELECTOR_TOKEN_RE = re.compile(r"\.([^.\[\]]+)|\['([^']*)'\]|\[(\d+)\]|\[(\*)\]")
+
+
+def compile_expected(expected):
+    """
+    План проверки ожидаемого результата: {"body": план или None, "paths": [...]}.
+    Пустое ожидаемое тело ({} или []) не проверяется.
+    """
+    mode = expected.get("Сравнение") or "partial"
+    if mode not in MATCH_MODES:
+        raise ValueError(f"Неизвестный режим сравнения '{mode}'")
+    exact = mode == "exact"
+    body = expected.get("Body")
+    return {
+        "body": compile_matcher(body, exact) if body not in (None, {}, []) else None,
+        "paths": [
+            {"selector": selector, "tokens": parse_selector(selector), "plan": compile_matcher(value, exact)}
+            for selector, value in (expected.get("Пути") or {}).items()
+        ],
+    }
+
+
+def compile_matcher(expected, exact=False):
+    """
+    План сравнения значения (только JSON-типы, чтобы план можно было сохранить в файл данных):
+      объект — partial: в ответе есть все ожидаемые ключи, значения сравниваются рекурсивно;
+               exact: набор ключей совпадает;
+      список — без учёта порядка. partial: каждый ожидаемый элемент есть в ответе;
+               exact: те же элементы (с повторами) и та же длина;
+      строка "<имя>" — значение плейсхолдера из контекста (без него — сама строка).
+    Элементы, которые сравниваются на точное равенство (скаляры, любые в режиме exact),
+    ищутся по каноническому хэшу — за O(n + m), а не O(n·m). Для частичных объектов
+    кандидаты выбираются по индексу на общий скалярный ключ (например, id).
+    """
+    if isinstance(expected, dict):
+        return {"t": "dict", "exact": exact, "keys": {k: compile_matcher(v, exact) for k, v in expected.items()}}
+    if isinstance(expected, list):
+        hashes = [
+            canonical(item) if (exact or not isinstance(item, (dict, list))) and _ref_name(item) is None else None
+            for item in expected
+        ]
+        partial_dicts = [item for item, h in zip(expected, hashes) if h is None and isinstance(item, dict)]
+        index_key = _common_scalar_key(partial_dicts)
+        return {
+            "t": "list",
+            "exact": exact,
+            "values": expected,
+            "items": [compile_matcher(item, exact) for item in expected],
+            "hashes": hashes,
+            "index_key": index_key,
+            "index_values": [
+                canonical(item[index_key]) if h is None and index_key is not None and isinstance(item, dict) else None
+                for item, h in zip(expected, hashes)
+            ],
+        }
+    name = _ref_name(expected)
+    if name is not None:
+        return {"t": "ref", "name": name, "v": expected}
+    return {"t": "value", "v": expected}
+
+
+def _ref_name(value):
+    match = _REF_RE.fullmatch(value) if isinstance(value, str) else None
+    return match.group(1) if match else None
+
+
+def _common_scalar_key(items):
+    if not items:
+        return None
+    for key, value in items[0].items():
+        if all(key in item and not isinstance(item[key], (dict, list)) for item in items) \
+                and not isinstance(value, (dict, list)):
+            return key
+    return None
+
+
+def canonical(value):
+    """
+    Каноническая строка JSON-значения: порядок ключей не важен, 1.0 и 1 совпадают, true и 1 — нет.
+    """
+    return json.dumps(_normalize(value), ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+
+
+def _normalize(value):
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def _equal(actual, expected):
+    return actual == expected and isinstance(actual, bool) == isinstance(expected, bool)
+
+
+def match_plan(plan, actual, path, diffs, context=None):
+    """
+    Сравнивает actual с планом, добавляя расхождения (путь, описание) в diffs.
+    context — значения плейсхолдеров для узлов "<имя>".
+    """
+    kind = plan["t"]
+    if kind in ("value", "ref"):
+        expected = plan["v"]
+        if kind == "ref" and context is not None and plan["name"] in context:
+            expected = context[plan["name"]]
+        if not _equal(actual, expected):
+            diffs.append((path, f"ожидалось {_short(expected)}, получено {_short(actual)}"))
+    elif kind == "dict":
+        if not isinstance(actual, dict):
+            diffs.append((path, f"ожидался объект, получено {_short(actual)}"))
+            return
+        for key, sub_plan in plan["keys"].items():
+            if key not in actual:
+                diffs.append((f"{path}.{key}", "нет ключа"))
+            else:
+                match_plan(sub_plan, actual[key], f"{path}.{key}", diffs, context)
+        if plan["exact"]:
+            extra = [key for key in actual if key not in plan["keys"]]
+            if extra:
+                diffs.append((path, f"лишние ключи {', '.join(map(str, extra))}"))
+    else:
+        _match_list(plan, actual, path, diffs, context)
+
+
+def _match_list(plan, actual, path, diffs, context=None):
+    if not isinstance(actual, list):
+        diffs.append((path, f"ожидался список, получено {_short(actual)}"))
+        return
+    if plan["exact"] and len(actual) != len(plan["items"]):
+        diffs.append((path, f"ожидалось элементов: {len(plan['items'])}, получено: {len(actual)}"))
+
+    counts = None
+    index = None
+    for position, (sub_plan, item_hash) in enumerate(zip(plan["items"], plan["hashes"])):
+        if item_hash is not None:
+            if counts is None:
+                counts = {}
+                for item in actual:
+                    key = canonical(item)
+                    counts[key] = counts.get(key, 0) + 1
+            if counts.get(item_hash, 0) > 0:
+                counts[item_hash] -= 1
+            else:
+                diffs.append((path, f"нет элемента {_short(plan['values'][position])}"))
+            continue
+
+        index_value = plan["index_values"][position]
+        if index_value is not None:
+            if index is None:
+                index = {}
+                for item in actual:
+                    if isinstance(item, dict) and plan["index_key"] in item:
+                        index.setdefault(canonical(item[plan["index_key"]]), []).append(item)
+            candidates = index.get(index_value, [])
+        else:
+            candidates = actual
+
+        candidate_diffs = None
+        for candidate in candidates:
+            attempt = []
+            match_plan(sub_plan, candidate, f"{path}[{plan['index_key']}={_short(candidate.get(plan['index_key']))}]"
+                       if index_value is not None else path + "[?]", attempt, context)
+            if not attempt:
+                break
+            if candidate_diffs is None or len(attempt) < len(candidate_diffs):
+                candidate_diffs = attempt
+        else:
+            if index_value is not None and candidate_diffs:
+                # Элемент с тем же ключом есть — выводим, чем он отличается
+                diffs.extend(candidate_diffs)
+            else:
+                diffs.append((path, f"нет элемента {_short(plan['values'][position])}"))
+
+
+def parse_selector(selector):
+    """
+    Селектор в стиле JSONPath ($.items[*].id) -> список сегментов: ключ (str), индекс (int) или "*".
+    """
+    if not selector.startswith("$"):
+        raise ValueError(f"Селектор должен начинаться с $: {selector}")
+    tokens, position = [], 1
+    while position < len(selector):
+        match = _SELECTOR_TOKEN_RE.match(selector, position)
+        if match is None:
+            raise ValueError(f"Не удалось разобрать селектор {selector} с позиции {position}")
+        key, quoted, number, star = match.groups()
+        if star:
+            tokens.append("*")
+        elif number is not None:
+            tokens.append(int(number))
+        else:
+            tokens.append(key if key is not None else quoted)
+        position = match.end()
+    return tokens
+
+
+def select(value, tokens):
+    """
+    Значения по сегментам селектора. С [*] — список всех найденных значений,
+    без него — одно значение. Если значения нет, возвращает (False, None).
+    """
+    values = [value]
+    wildcard = False
+    for token in tokens:
+        selected = []
+        for current in values:
+            if token == "*":
+                wildcard = True
+                if isinstance(current, list):
+                    selected.extend(current)
+                elif isinstance(current, dict):
+                    selected.extend(current.values())
+            elif isinstance(token, int):
+                if isinstance(current, list) and -len(current) <= token < len(current):
+                    selected.append(current[token])
+            elif isinstance(current, dict) and token in current:
+                selected.append(current[token])
+        values = selected
+    if wildcard:
+        return True, values
+    return (True, values[0]) if values else (False, None)
+
+
+def match_selector(selector, actual, diffs, context=None):
+    found, value = select(actual, selector["tokens"])
+    if not found:
+        diffs.append((selector["selector"], "нет значения"))
+    else:
+        match_plan(selector["plan"], value, selector["selector"], diffs, context)
+
+
+def format_diffs(diffs):
+    """
+    Сообщение о расхождениях: первое — в первой строке (её показывает прогресс прогона), остальные ниже.
+    """
+    lines = [f"{path}: {message}" for path, message in diffs[:MAX_DIFFS]]
+    header = f"Тело ответа не совпадает с ожидаемым: {lines[0]}"
+    if len(diffs) > 1:
+        header += f" (всего расхождений: {len(diffs)})"
+    rest = [f"  {line}" for line in lines[1:]]
+    if len(diffs) > MAX_DIFFS:
+        rest.append(f"  ... и ещё {len(diffs) - MAX_DIFFS}")
+    return "\n".join([header] + rest)
+
+
+def _short(value, limit=80):
+    text = json.dumps(value, ensure_ascii=False, default=str)
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+
+def latency_repeats(test_case):
+    """
+    (ожидание по времени ответа, сколько раз выполнить основной шаг) для кейса.
+    Повторяется только читающий шаг (GET/HEAD/OPTIONS): изменяющий запрос повторять нельзя,
+    для него время проверяется по одному замеру.
+    """
+    latency = (test_case.get("Ожидаемый результат") or {}).get(LATENCY_KEY)
+    if not latency:
+        return None, 1
+    repeats = max(1, int(latency.get("Повторы") or 1))
+    return latency, repeats if is_read_only(test_case) else 1
+
+
+def percentile(samples, percent):
+    """
+    Перцентиль по методу ближайшего ранга.
+    """
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+def check_latency(samples, latency):
+    """
+    Проверяет замеры времени ответа (мс) по ожиданию {Максимум: мс, p95: мс}.
+    """
+    problems = []
+    limit = latency.get("Максимум")
+    if limit is not None and max(samples) > float(limit):
+        problems.append(f"максимум {max(samples):.1f} мс > {limit} мс")
+    limit = latency.get("p95")
+    if limit is not None and percentile(samples, 95) > float(limit):
+        problems.append(f"p95 {percentile(samples, 95):.1f} мс > {limit} мс")
+    assert not problems, f"Время ответа: {', '.join(problems)} (замеров: {len(samples)})"
+
+
+def timing_summary(timings):
+    """
+    Компактная сводка таймингов кейса для JSON: общее время запросов и шаги.
+    """
+    return {"total_ms": round(sum(t[3] for t in timings), 3), "steps": timings}
+
+
+def attach_step_timings(timings):
+    import allure
+
+    allure.attach(
+        json.dumps(timing_summary(timings), ensure_ascii=False, indent=2),
+        name="Тайминги шагов",
+        attachment_type=allure.attachment_type.JSON
+    )
+
+
+def run_test_case(session, context, base_url, test_case, resources=None, timings=None):
+    """
+    Прогоняет один тест-кейс: предусловия, шаги, проверка ожидаемого результата, постусловия.
+
+    Постусловия выполняются и при падении кейса (run_postconditions).
+    С resources (ResourcePool) кейс, который только читает ресурс, берёт общий экземпляр,
+    а меняющий ресурс — общих родителей и свой экземпляр. Постусловия откладываются
+    до конца модуля сразу после предусловий.
+
+    Время каждого запроса пишется в timings (список, см. record_timing) и прикладывается к Allure.
+    Если задано "Время ответа", основной шаг повторяется до "Повторы" раз и проверяются максимум и p95.
+    """
+    import allure
+
+    allure.dynamic.title(test_case.get("Тест-кейс", "unknown_test"))
+    allure.dynamic.description(test_case.get("Описание", ""))
+    if timings is None:
+        timings = []
+    try:
+        _run_test_case(session, context, base_url, test_case, resources, timings)
+    finally:
+        if timings:
+            attach_step_timings(timings)
+
+
+def _run_test_case(session, context, base_url, test_case, resources, timings):
+    import allure
+
+    preconditions = test_case.get("Предусловия") or []
+    captures = precondition_captures(test_case)
+    if resources is not None:
+        shared = 0
+        if preconditions:
+            shared = len(preconditions) if is_read_only(test_case) else len(preconditions) - 1
+        with allure.step('Предусловия'):
+            if shared:
+                context.update(resources.acquire(preconditions[:shared], captures))
+            for pre, capture in zip(preconditions[shared:], captures[shared:]):
+                run_precondition(session, context, base_url, pre, capture, timings)
+        resources.defer(context, test_case.get("Постусловия") or [])
+        _run_steps(session, context, base_url, test_case, timings)
+        return
+
+    deleted = set()
+    try:
+        with allure.step('Предусловия'):
+            for pre, capture in zip(preconditions, captures):
+                run_precondition(session, context, base_url, pre, capture, timings)
+        _run_steps(session, context, base_url, test_case, timings, deleted)
+    finally:
+        with allure.step('Постусловия'):
+            run_postconditions(session, context, base_url, test_case, timings, deleted)
+
+
+def _run_steps(session, context, base_url, test_case, timings, deleted=None):
+    import allure
+
+    last_response, last_ms = None, None
+    created = step_captures(test_case)
+    with allure.step('Основной шаг'):
+        for number, step in enumerate(test_case.get("Шаги") or []):
+            last_response, last_ms = send_request(session, context, base_url, step, timings)
+            if number in created:
+                # До проверок: постусловия удалят ресурс и при упавшем шаге
+                save_created_id(last_response, context, created[number])
+            check_step(last_response, context, step, last_ms)
+            if deleted is not None:
+                track_deleted(context, base_url, step, deleted)
+
+    expected = test_case.get("Ожидаемый результат") or {}
+    with allure.step('Проверка ожидаемого результата'):
+        check_expected(last_response, expected, context)
+
+    latency, repeats = latency_repeats(test_case)
+    if latency and last_ms is not None:
+        with allure.step('Проверка времени ответа'):
+            samples = [last_ms]
+            last_step = test_case["Шаги"][-1]
+            for _ in range(repeats - 1):
+                samples.append(send_request(session, context, base_url, last_step, timings, "Повторы")[1])
+            check_latency(samples, latency)
@@ -0,0 +1,197 @@
+"""
+Транспорт для сгенерированных автотестов: requests.Session с настраиваемым пулом соединений,
+таймаутами, повторами и замером времени каждого запроса.
+
+Как и AutotestRuntime, файл копируется рядом со сгенерированным модулем (как autotest_transport.py)
+и зависит только от requests (и входящего в него urllib3).
+
+Настройки (словарь, недостающие ключи берутся из DEFAULT_TRANSPORT):
+  pool_size        — соединений в пуле на хост
+  connect_timeout  — таймаут установки соединения, секунды
+  read_timeout     — таймаут ожидания ответа, секунды
+  retries          — число повторов; повтор при ошибке соединения — для любого метода
+                     (запрос не дошёл до сервера), по статусу и обрыву чтения — только
+                     для идемпотентных методов
+  backoff          — множитель экспоненциальной паузы между повторами, секунды
+  retry_statuses   — статусы, при которых идемпотентный запрос повторяется
+
+Каждый ответ получает атрибут timing: dns_ms, connect_ms (вместе с TLS), ttfb_ms, total_ms,
+new_connections, reused_connection, retries.
+"""
+import socket
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from urllib3.util.connection import allowed_gai_family
+from urllib3.util.retry import Retry
+
+DEFAULT_TRANSPORT = {
+    "pool_size": 10,
+    "connect_timeout": 5.0,
+    "read_timeout": 30.0,
+    "retries": 2,
+    "backoff": 0.5,
+    "retry_statuses": [502, 503, 504],
+}
+
+IDEMPOTENT_METHODS = frozenset(["GET", "HEAD", "PUT", "DELETE", "OPTIONS", "TRACE"])
+
+# Замер текущего запроса потока: соединения пула пишут в него время DNS и соединения
+_current = threading.local()
+
+
+def _timing_record():
+    return getattr(_current, "timing", None)
+
+
+class _TimedConnectionMixin:
+    """
+    Замеряет разрешение имени и установку соединения (для HTTPS — вместе с TLS).
+    Имя разрешается один раз, затем соединение пробуется по очереди на каждый полученный адрес
+    (_dns_host), как это делает сам urllib3: если первый адрес (например, ::1) недоступен,
+    используется следующий (127.0.0.1). SNI и проверка сертификата по-прежнему используют исходный host.
+    """
+
+    def _new_conn(self):
+        record = _timing_record()
+        host = self._dns_host
+        start = time.perf_counter()
+        try:
+            infos = socket.getaddrinfo(host, self.port, allowed_gai_family(), socket.SOCK_STREAM)
+        except OSError:
+            # Ошибку разрешения пусть сообщит сам urllib3
+            infos = []
+        if record is not None:
+            record["dns_ms"] += (time.perf_counter() - start) * 1000
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        if not addresses:
+            return super()._new_conn()
+
+        error = None
+        try:
+            for address in addresses:
+                self._dns_host = address
+                try:
+                    return super()._new_conn()
+                except (NewConnectionError, ConnectTimeoutError) as e:
+                    error = e
+            raise error
+        finally:
+            self._dns_host = host
+
+    def connect(self):
+        record = _timing_record()
+        dns_before = record["dns_ms"] if record is not None else 0.0
+        start = time.perf_counter()
+        super().connect()
+        if record is not None:
+            dns_spent = record["dns_ms"] - dns_before
+            record["connect_ms"] += (time.perf_counter() - start) * 1000 - dns_spent
+            record["new_connections"] += 1
+
+
+class TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter, пулы которого создают соединения с замером времени.
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": TimedHTTPConnectionPool,
+            "https": TimedHTTPSConnectionPool,
+        }
+
+
+def make_retry(config):
+    return Retry(
+        total=config["retries"],
+        connect=config["retries"],
+        read=config["retries"],
+        status=config["retries"],
+        backoff_factor=config["backoff"],
+        status_forcelist=config["retry_statuses"],
+        allowed_methods=IDEMPOTENT_METHODS,
+        # После исчерпания повторов вернуть последний ответ, а не исключение: статус проверит тест
+        raise_on_status=False,
+        respect_retry_after_header=True,
+    )
+
+
+class TransportSession(requests.Session):
+    """
+    Session с таймаутами по умолчанию, пулом/повторами из настроек и замером каждого запроса.
+    stats — сводка по сессии: запросы, новые соединения, повторы.
+    """
+
+    def __init__(self, config=None):
+        super().__init__()
+        self.config = dict(DEFAULT_TRANSPORT, **(config or {}))
+        adapter = TimedHTTPAdapter(
+            pool_connections=self.config["pool_size"],
+            pool_maxsize=self.config["pool_size"],
+            max_retries=make_retry(self.config),
+        )
+        self.mount("http://", adapter)
+        self.mount("https://", adapter)
+        self.stats = {"requests": 0, "new_connections": 0, "reused_connections": 0, "retries": 0}
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", (self.config["connect_timeout"], self.config["read_timeout"]))
+        record = {"dns_ms": 0.0, "connect_ms": 0.0, "new_connections": 0}
+        _current.timing = record
+        start = time.perf_counter()
+        try:
+            response = super().request(method, url, **kwargs)
+        finally:
+            _current.timing = None
+        total_ms = (time.perf_counter() - start) * 1000
+
+        retries = getattr(getattr(response.raw, "retries", None), "history", None) or ()
+        response.timing = {
+            "request": f"{method.upper()} {url}",
+            "status": response.status_code,
+            "dns_ms": round(record["dns_ms"], 3),
+            "connect_ms": round(record["connect_ms"], 3),
+            "ttfb_ms": round(response.elapsed.total_seconds() * 1000, 3),
+            "total_ms": round(total_ms, 3),
+            "new_connections": record["new_connections"],
+            "reused_connection": record["new_connections"] == 0,
+            "retries": len(retries),
+        }
+
+        self.stats["requests"] += 1
+        self.stats["new_connections"] += record["new_connections"]
+        self.stats["reused_connections"] += record["new_connections"] == 0
+        self.stats["retries"] += len(retries)
+        return response
+
+    def stats_report(self):
+        s = self.stats
+        return (f"Транспорт: запросов {s['requests']}, новых соединений {s['new_connections']}, "
+                f"через keep-alive {s['reused_connections']}, повторов {s['retries']}")
+
+
+def create_session(config=None):
+    return TransportSession(config)
@@ -0,0 +1,98 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Union
+
+# Манифест папки сгенерированных тестов: {имя файла: {key, size, mtime_ns}}
+MANIFEST_NAME = ".codegen_manifest.json"
+
+
+def content_key(*parts: Union[str, bytes]) -> str:
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part.encode("utf-8") if isinstance(part, str) else part)
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class IncrementalCodegen:
+    """
+    Запись сгенерированных файлов с адресацией по содержимому.
+
+    Каждый файл пишется с ключом — хэшем исходных данных и версии генератора.
+    Если ключ совпадает с записанным в манифесте и файл на диске не менялся
+    (размер и mtime те же), файл не перезаписывается: содержимое не строится заново,
+    а у неизменённых модулей остаётся валидным байткод в __pycache__.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.manifest_path = self.directory / MANIFEST_NAME
+        self.manifest: Dict[str, Dict] = self._load()
+        self.written = 0
+        self.unchanged = 0
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def is_current(self, name: str, key: str) -> bool:
+        entry = self.manifest.get(name)
+        if entry is None or entry.get("key") != key:
+            return False
+        try:
+            stat = (self.directory / name).stat()
+        except OSError:
+            return False
+        # Файл могли изменить или перезаписать в обход манифеста
+        return stat.st_size == entry.get("size") and stat.st_mtime_ns == entry.get("mtime_ns")
+
+    def write(self, name: str, key: str, render: Callable[[], Union[str, bytes]]) -> bool:
+        """
+        Записывает файл name, если его ключ изменился. render вызывается только при записи.
+        Возвращает True, если файл был (пере)записан.
+        """
+        if self.is_current(name, key):
+            self.unchanged += 1
+            return False
+
+        content = render()
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        path = self.directory / name
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+        stat = path.stat()
+        self.manifest[name] = {"key": key, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        self.written += 1
+        return True
+
+    def prune(self, keep: Iterable[str]) -> int:
+        """
+        Удаляет из папки файлы, не относящиеся к текущему набору (шарды прошлых запусков и т.п.),
+        чтобы pytest не собрал устаревшие модули. Папки (__pycache__) не трогаются.
+        """
+        keep = set(keep) | {MANIFEST_NAME}
+        removed = 0
+        for path in self.directory.iterdir():
+            if path.is_file() and path.name not in keep:
+                path.unlink()
+                self.manifest.pop(path.name, None)
+                removed += 1
+        for name in [name for name in self.manifest if name not in keep]:
+            del self.manifest[name]
+        return removed
+
+    def save(self) -> None:
+        tmp_path = self.manifest_path.with_name(self.manifest_path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
@@ -0,0 +1,88 @@
+import math
+from array import array
+from typing import Dict, Iterable
+
+
+class LatencyHistogram:
+    """
+    Гистограмма времени ответа в стиле HdrHistogram: фиксированная память при любом числе замеров.
+
+    Значения хранятся в микросекундах. До sub_bucket_count мкс каждое значение — своя ячейка,
+    дальше каждый диапазон [2^k, 2^(k+1)) делится на sub_bucket_count/2 равных ячеек,
+    так что относительная погрешность не больше 10^-significant_digits.
+    Значения больше highest_ms попадают в последнюю ячейку (точный максимум хранится отдельно).
+    Гистограммы с одинаковыми параметрами складываются (merge) — например, по виртуальным пользователям.
+    """
+
+    __slots__ = ('highest_ms', 'significant_digits', 'sub_bits', 'sub_bucket_count',
+                 'counts', 'total', 'min_us', 'max_us', 'sum_us')
+
+    def __init__(self, highest_ms: float = 60_000, significant_digits: int = 2):
+        self.highest_ms = highest_ms
+        self.significant_digits = significant_digits
+        self.sub_bits = max(1, math.ceil(math.log2(2 * 10 ** significant_digits)))
+        self.sub_bucket_count = 1 << self.sub_bits
+        self.counts = array('Q', bytes(8 * (self._index(int(highest_ms * 1000)) + 1)))
+        self.total = 0
+        self.min_us = None
+        self.max_us = 0
+        self.sum_us = 0
+
+    def _index(self, value_us: int) -> int:
+        if value_us < self.sub_bucket_count:
+            return value_us
+        exponent = value_us.bit_length() - self.sub_bits
+        half = self.sub_bucket_count >> 1
+        return self.sub_bucket_count + (exponent - 1) * half + ((value_us >> exponent) - half)
+
+    def _highest_equivalent(self, index: int) -> int:
+        if index < self.sub_bucket_count:
+            return index
+        half = self.sub_bucket_count >> 1
+        exponent = (index - self.sub_bucket_count) // half + 1
+        sub = (index - self.sub_bucket_count) % half + half
+        return ((sub + 1) << exponent) - 1
+
+    def record(self, value_ms: float) -> None:
+        value_us = max(0, int(value_ms * 1000))
+        self.counts[min(self._index(value_us), len(self.counts) - 1)] += 1
+        self.total += 1
+        self.sum_us += value_us
+        self.max_us = max(self.max_us, value_us)
+        self.min_us = value_us if self.min_us is None else min(self.min_us, value_us)
+
+    def merge(self, other: 'LatencyHistogram') -> None:
+        assert len(other.counts) == len(self.counts), "Гистограммы с разными параметрами"
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        self.total += other.total
+        self.sum_us += other.sum_us
+        self.max_us = max(self.max_us, other.max_us)
+        if other.min_us is not None:
+            self.min_us = other.min_us if self.min_us is None else min(self.min_us, other.min_us)
+
+    def percentile(self, percent: float) -> float:
+        """
+        Значение (мс), не меньше которого percent% замеров: верхняя граница ячейки, но не больше максимума.
+        """
+        if not self.total:
+            return 0.0
+        rank = max(1, math.ceil(percent / 100 * self.total))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self._highest_equivalent(index), self.max_us) / 1000
+        return self.max_us / 1000
+
+    def summary(self, percents: Iterable[float] = (50, 90, 95, 99)) -> Dict[str, float]:
+        """
+        {count, min_ms, mean_ms, p50_ms, ..., max_ms} для отчёта.
+        """
+        result = {"count": self.total, "min_ms": (self.min_us or 0) / 1000,
+                  "mean_ms": round(self.sum_us / self.total / 1000, 3) if self.total else 0.0}
+        for percent in percents:
+            result[f"p{percent:g}_ms"] = self.percentile(percent)
+        result["max_ms"] = self.max_us / 1000
+        return result
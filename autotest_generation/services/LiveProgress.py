@@ -0,0 +1,97 @@
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+class ReportTail:
+    """
+    Инкрементальное чтение JSON Lines отчёта, который дописывается другим процессом:
+    каждый вызов read() возвращает только новые полные строки.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.offset = 0
+        self._partial = b""
+
+    def read(self) -> List[Dict[str, Any]]:
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(self.offset)
+                chunk = f.read()
+        except OSError:
+            return []
+        self.offset += len(chunk)
+        data = self._partial + chunk
+        lines = data.split(b"\n")
+        # Последняя строка может быть записана не до конца
+        self._partial = lines.pop()
+        records = []
+        for line in lines:
+            if line.strip():
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    pass
+        return records
+
+
+class ProgressTracker:
+    """
+    Счётчики результатов и оценка оставшегося времени по средней скорости прогона.
+    """
+
+    def __init__(self, total: int, interval: float = 2.0):
+        self.total = total
+        self.interval = interval
+        self.start = time.monotonic()
+        self.counts: Dict[str, int] = {"passed": 0, "failed": 0, "error": 0, "skipped": 0}
+        self._last_print = 0.0
+
+    @property
+    def done(self) -> int:
+        return sum(self.counts.values())
+
+    @property
+    def failed(self) -> int:
+        return self.counts["failed"] + self.counts["error"]
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.start
+
+    def add(self, record: Dict[str, Any]) -> None:
+        outcome = record.get("outcome", "failed")
+        self.counts[outcome] = self.counts.get(outcome, 0) + 1
+        if outcome in ("failed", "error"):
+            print(f"[{outcome.upper()}] {record.get('nodeid')}: {record.get('message', '')}")
+
+    def eta(self) -> Optional[float]:
+        if not self.done or self.done >= self.total:
+            return None
+        return self.elapsed() / self.done * (self.total - self.done)
+
+    def summary(self) -> str:
+        percent = self.done * 100 // self.total if self.total else 100
+        eta = self.eta()
+        eta_str = f", осталось ~{_format_seconds(eta)}" if eta is not None else ""
+        return (f"Прогресс: {self.done}/{self.total} ({percent}%), прошло {self.counts['passed']}, "
+                f"упало {self.failed}, пропущено {self.counts['skipped']}, "
+                f"время {_format_seconds(self.elapsed())}{eta_str}")
+
+    def maybe_print(self) -> None:
+        now = time.monotonic()
+        if now - self._last_print >= self.interval:
+            self._last_print = now
+            print(self.summary(), flush=True)
+
+
+def _format_seconds(seconds: float) -> str:
+    seconds = int(seconds)
+    if seconds < 60:
+        return f"{seconds}с"
+    minutes, seconds = divmod(seconds, 60)
+    if minutes < 60:
+        return f"{minutes}м{seconds:02d}с"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}ч{minutes:02d}м"
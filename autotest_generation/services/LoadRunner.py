@@ -0,0 +1,326 @@
+import asyncio
+import random
+from fnmatch import fnmatchcase
+from typing import Any, Dict, List, Optional, Tuple
+
+from autotest_generation.services.AsyncHttpClient import AsyncHttpClient
+from autotest_generation.services.LatencyHistogram import LatencyHistogram
+from autotest_generation.services import AutotestRuntime as runtime
+
+# Вес кейса в смеси нагрузки (необязательный ключ кейса в YAML)
+WEIGHT_KEY = "Вес"
+
+
+def parse_mix(values: Optional[List[str]]) -> List[Tuple[str, float]]:
+    """
+    Веса кейсов из аргументов вида "<шаблон имени>=<вес>" (шаблон — как в fnmatch: get_*, crud_todos).
+    """
+    mix = []
+    for value in values or []:
+        pattern, sep, weight = value.rpartition("=")
+        if not sep or not pattern:
+            raise ValueError(f"Ожидается <шаблон>=<вес>, получено: {value}")
+        weight = float(weight)
+        if weight < 0:
+            raise ValueError(f"Вес не может быть отрицательным: {value}")
+        mix.append((pattern, weight))
+    return mix
+
+
+def case_weights(test_cases: List[Dict[str, Any]], mix: Optional[List[Tuple[str, float]]] = None) -> List[float]:
+    """
+    Вес каждого кейса: последний подошедший шаблон из mix, иначе ключ кейса "Вес", иначе 1.
+    Кейсы с весом 0 в нагрузку не попадают.
+    """
+    weights = []
+    for test_case in test_cases:
+        name = test_case.get("Тест-кейс", "")
+        weight = float(test_case.get(WEIGHT_KEY, 1))
+        for pattern, value in mix or []:
+            if fnmatchcase(name, pattern):
+                weight = value
+        weights.append(weight)
+    return weights
+
+
+def consumes_setup(test_case: Dict[str, Any]) -> bool:
+    """
+    Шаги кейса удаляют ресурс, созданный его предусловиями: DELETE на путь с плейсхолдером
+    предусловия (DELETE /todos/<id_todo>). Повтор таких шагов на том же ресурсе дал бы 404.
+    """
+    captures = set(runtime.precondition_captures(test_case))
+    for step in test_case.get("Шаги") or []:
+        method, _, path = step["Endpoint"].partition(" ")
+        if method.upper() == "DELETE" and captures.intersection(runtime.PLACEHOLDER_RE.findall(path)):
+            return True
+    return False
+
+
+def iteration_postconditions(test_case: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Постусловия, которые удаляют ресурс, созданный шагами кейса (POST /todos в шагах и
+    DELETE /todos/<id_todo> в постусловиях, см. runtime.step_captures): каждая итерация создаёт
+    новый ресурс, поэтому они выполняются после каждой итерации с её контекстом.
+    """
+    created = set(runtime.step_captures(test_case).values())
+    return [post for post in test_case.get("Постусловия") or []
+            if created.intersection(runtime.PLACEHOLDER_RE.findall(post["Endpoint"]))]
+
+
+class CaseLoadStats:
+    __slots__ = ('name', 'weight', 'iterations', 'requests', 'errors', 'histogram')
+
+    def __init__(self, name: str, weight: float):
+        self.name = name
+        self.weight = weight
+        self.iterations = 0
+        self.requests = 0
+        # {причина: количество}: "статус 500", "ConnectionResetError", "предусловие", ...
+        self.errors: Dict[str, int] = {}
+        self.histogram = LatencyHistogram()
+
+    def error(self, reason: str) -> None:
+        self.errors[reason] = self.errors.get(reason, 0) + 1
+
+
+class RatePacer:
+    """
+    Расписание запросов с постоянной частотой rps: n-й запрос — в момент start + n / rps.
+    Расписание не сдвигается, если пользователи не успевают: время ответа считается от
+    запланированного момента, а не от фактической отправки, поэтому задержка из-за перегрузки
+    попадает в перцентили (без «coordinated omission»).
+    """
+
+    def __init__(self, rps: float, start: float):
+        self.interval = 1.0 / rps
+        self.next = start
+
+    async def wait(self) -> float:
+        slot = self.next
+        self.next += self.interval
+        delay = slot - asyncio.get_running_loop().time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return slot
+
+
+class LoadRunner:
+    """
+    Нагрузочный режим: шаги тест-кейсов воспроизводятся как профиль трафика.
+
+    users виртуальных пользователей в течение duration секунд выбирают кейсы по весам
+    и выполняют их шаги (итерация — все шаги кейса). Предусловия кейса выполняются
+    один раз на пользователя — при первом выборе кейса, постусловия — один раз в конце;
+    каждая итерация начинается с копии контекста предусловий (значения "Сохранить" не переносятся).
+    Отступления от «один раз на пользователя», чтобы итерации не падали и не оставляли ресурсы:
+    кейсы, шаги которых удаляют созданный предусловиями ресурс (consumes_setup), выполняют
+    предусловия и постусловия в каждой итерации; если шаги сами создают ресурс
+    (iteration_postconditions), id сохраняется из ответа, а его удаление выполняется после итерации.
+    Запросы предусловий и постусловий не входят в статистику времени ответа, а считаются отдельно
+    (setup_requests), но занимают места в расписании rps: rps — вся нагрузка на сервис,
+    и в отчёте она видна как offered_rps.
+    Без rps пользователи отправляют запросы один за другим (замкнутая модель, нагрузка — users);
+    с rps запросы всех пользователей идут по общему расписанию, users ограничивает их параллельность.
+
+    Ошибкой считается исключение при запросе и статус, не совпадающий с ожидаемым
+    (ожидаемый результат шага или, для последнего шага, кейса); тело ответа не проверяется.
+    После ошибки оставшиеся шаги итерации пропускаются.
+    Время ответа копится в гистограммах фиксированного размера (LatencyHistogram) по кейсам.
+    """
+
+    def __init__(
+            self,
+            base_url: str,
+            duration: float,
+            users: int = 10,
+            rps: Optional[float] = None,
+            limit_per_host: Optional[int] = None,
+            timeout: float = 30.0,
+            seed: int = 0
+    ):
+        self.base_url = base_url
+        self.duration = duration
+        self.users = users
+        self.rps = rps
+        self.limit_per_host = limit_per_host or users
+        self.timeout = timeout
+        self.seed = seed
+        self.setup_requests = 0
+
+    def run(self, test_cases: List[Dict[str, Any]], weights: List[float]) -> Dict[str, Any]:
+        return asyncio.run(self.run_async(test_cases, weights))
+
+    async def run_async(self, test_cases: List[Dict[str, Any]], weights: List[float]) -> Dict[str, Any]:
+        """
+        Запускает нагрузку и возвращает отчёт (см. report).
+        """
+        stats = [CaseLoadStats(tc.get("Тест-кейс", "unknown_test"), w) for tc, w in zip(test_cases, weights)]
+        active = [i for i, w in enumerate(weights) if w > 0 and test_cases[i].get("Шаги")]
+        if not active:
+            return self.report(stats, 0.0)
+        cum_weights = []
+        for i in active:
+            cum_weights.append((cum_weights[-1] if cum_weights else 0) + weights[i])
+        fresh = {i for i in active if consumes_setup(test_cases[i])}
+        # Постусловия по номеру кейса: после каждой итерации и один раз в конце
+        cleanup = {}
+        for i in active:
+            posts = test_cases[i].get("Постусловия") or []
+            per_iteration = posts if i in fresh else iteration_postconditions(test_cases[i])
+            cleanup[i] = (per_iteration, [post for post in posts if post not in per_iteration])
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        deadline = start + self.duration
+        pacer = RatePacer(self.rps, start) if self.rps else None
+        async with AsyncHttpClient(limit_per_host=self.limit_per_host, timeout=self.timeout) as client:
+            await asyncio.gather(*(
+                self._user(client, index, test_cases, stats, active, cum_weights, fresh, cleanup, deadline, pacer)
+                for index in range(self.users)
+            ))
+        return self.report(stats, min(loop.time(), deadline) - start)
+
+    async def _user(self, client, index, test_cases, stats, active, cum_weights, fresh, cleanup, deadline, pacer):
+        loop = asyncio.get_running_loop()
+        rng = random.Random(self.seed * 100_003 + index)
+        # Контекст предусловий по номеру кейса; None — предусловия не выполнились
+        contexts: Dict[int, Optional[Dict[str, Any]]] = {}
+        try:
+            while loop.time() < deadline:
+                i = rng.choices(active, cum_weights=cum_weights)[0]
+                if i not in contexts:
+                    contexts[i] = await self._setup(client, test_cases[i], stats[i], pacer)
+                    if all(contexts.get(j, {}) is None for j in active):
+                        break
+                if contexts[i] is None:
+                    continue
+                # Ресурс удаляется шагами: следующая итерация создаст новый
+                context = dict(contexts.pop(i) if i in fresh else contexts[i])
+                running = await self._iteration(client, test_cases[i], stats[i], context, deadline, pacer)
+                await self._teardown(client, cleanup[i][0], context, pacer)
+                if not running:
+                    break
+        finally:
+            for i, context in contexts.items():
+                if context is not None:
+                    await self._teardown(client, cleanup[i][1], context, pacer)
+
+    async def _setup(self, client, test_case, stats, pacer) -> Optional[Dict[str, Any]]:
+        context: Dict[str, Any] = {}
+        try:
+            for pre, capture in zip(test_case.get("Предусловия") or [], runtime.precondition_captures(test_case)):
+                runtime.check_precondition(await self._send(client, context, pre, pacer), context, capture)
+        except Exception:
+            stats.error("предусловие")
+            return None
+        return context
+
+    async def _teardown(self, client, requests, context, pacer) -> None:
+        """
+        Постусловия без проверки статуса; запросы с незаполненными плейсхолдерами пропускаются
+        (ресурс не был создан — например, создающий шаг упал).
+        """
+        for post in requests:
+            if not runtime.is_resolved(context, post):
+                continue
+            try:
+                await self._send(client, context, post, pacer)
+            except Exception:
+                pass
+
+    async def _iteration(self, client, test_case, stats, context, deadline, pacer) -> bool:
+        """
+        Одна итерация кейса. False — время нагрузки вышло.
+        """
+        loop = asyncio.get_running_loop()
+        steps = test_case["Шаги"]
+        created = runtime.step_captures(test_case)
+        stats.iterations += 1
+        for number, step in enumerate(steps):
+            started = await pacer.wait() if pacer else loop.time()
+            if started >= deadline:
+                return False
+            expected = step.get("Ожидаемый результат") or (
+                test_case.get("Ожидаемый результат") if number == len(steps) - 1 else None
+            ) or {}
+            try:
+                method, url, headers, cookies, body = runtime.prepare_request(context, self.base_url, step)
+                response = await client.request(method, url, headers=headers, cookies=cookies, json_body=body)
+            except Exception as e:
+                stats.requests += 1
+                stats.error(type(e).__name__)
+                return True
+            stats.requests += 1
+            stats.histogram.record((loop.time() - started) * 1000)
+            if number in created:
+                runtime.save_created_id(response, context, created[number])
+            status = expected.get("Статус")
+            if status and str(response.status_code) != str(status):
+                stats.error(f"статус {response.status_code}")
+                return True
+            try:
+                runtime.save_captures(response, context, step)
+            except Exception:
+                stats.error("Сохранить")
+                return True
+        return True
+
+    async def _send(self, client, context, request, pacer):
+        if pacer:
+            await pacer.wait()
+        self.setup_requests += 1
+        method, url, headers, cookies, body = runtime.prepare_request(context, self.base_url, request)
+        return await client.request(method, url, headers=headers, cookies=cookies, json_body=body)
+
+    def report(self, stats: List[CaseLoadStats], elapsed_s: float) -> Dict[str, Any]:
+        """
+        {duration_s, users, target_rps, requests, errors, error_rate, throughput_rps, setup_requests, offered_rps,
+         latency: {count, min_ms, mean_ms, p50_ms, p90_ms, p95_ms, p99_ms, max_ms},
+         cases: {имя: {weight, iterations, requests, errors: {причина: n}, latency}}}
+        """
+        total = LatencyHistogram()
+        for case in stats:
+            total.merge(case.histogram)
+        requests = sum(case.requests for case in stats)
+        errors = sum(sum(case.errors.values()) for case in stats)
+        return {
+            "duration_s": round(elapsed_s, 3),
+            "users": self.users,
+            "target_rps": self.rps,
+            "requests": requests,
+            "errors": errors,
+            "error_rate": round(errors / requests * 100, 3) if requests else 0.0,
+            "throughput_rps": round(requests / elapsed_s, 3) if elapsed_s > 0 else 0.0,
+            "setup_requests": self.setup_requests,
+            # Вся нагрузка на сервис: запросы шагов вместе с предусловиями и постусловиями
+            "offered_rps": round((requests + self.setup_requests) / elapsed_s, 3) if elapsed_s > 0 else 0.0,
+            "latency": total.summary(),
+            "cases": {
+                case.name: {
+                    "weight": case.weight,
+                    "iterations": case.iterations,
+                    "requests": case.requests,
+                    "errors": case.errors,
+                    "latency": case.histogram.summary(),
+                }
+                for case in stats if case.weight > 0
+            },
+        }
+
+
+def print_load_report(report: Dict[str, Any]) -> None:
+    def latency_line(latency):
+        return " ".join(f"{key[:-3]}={latency[key]:.1f}" for key in
+                        ("p50_ms", "p90_ms", "p95_ms", "p99_ms", "max_ms")) + " мс"
+
+    for name, case in report["cases"].items():
+        errors = ", ".join(f"{reason}: {count}" for reason, count in case["errors"].items())
+        print(f"  {name}: запросов {case['requests']}, {latency_line(case['latency'])}"
+              + (f", ошибки — {errors}" if errors else ""))
+    print(
+        f"Запросов: {report['requests']} за {report['duration_s']:.1f} с "
+        f"({report['throughput_rps']:.1f} в секунду), ошибок: {report['errors']} ({report['error_rate']:.2f}%), "
+        f"запросов предусловий/постусловий: {report['setup_requests']} "
+        f"(всего {report['offered_rps']:.1f} в секунду)"
+    )
+    print(f"Время ответа: {latency_line(report['latency'])}")
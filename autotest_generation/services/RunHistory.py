@@ -0,0 +1,120 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from autotest_generation.services.AutotestGenerator import make_test_id
+
+# Режимы выбора кейсов для запуска
+SELECT_MODES = ("all", "failed", "changed", "failed-first")
+FAILED_OUTCOMES = ("failed", "error", "broken")
+
+
+def case_hash(test_case: dict) -> str:
+    """
+    Хэш данных кейса (без учёта порядка ключей).
+    """
+    data = json.dumps(test_case, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+class RunHistory:
+    """
+    История запусков автотестов: по id кейса — результат и длительность последнего запуска,
+    хэш данных кейса при последнем запуске и при последнем успешном (passed_hash).
+
+    По истории выбираются кейсы для запуска (select) — до генерации кода,
+    а длительности используются для балансировки шардов (durations).
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.tests: Dict[str, Dict[str, Any]] = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                tests = json.load(f).get("tests", {})
+            return tests if isinstance(tests, dict) else {}
+        except (OSError, ValueError, AttributeError):
+            # Испорченная история не должна ломать запуск — просто начинаем заново
+            return {}
+
+    def durations(self) -> Dict[str, float]:
+        return {
+            test_id: float(entry["duration"])
+            for test_id, entry in self.tests.items() if entry.get("duration") is not None
+        }
+
+    def is_failed(self, test_id: str) -> bool:
+        entry = self.tests.get(test_id)
+        return entry is not None and entry.get("outcome") in FAILED_OUTCOMES
+
+    def is_changed(self, test_id: str, hash_value: str) -> bool:
+        """
+        Кейс новый или его данные изменились с последнего успешного прогона.
+        """
+        entry = self.tests.get(test_id)
+        return entry is None or entry.get("passed_hash") != hash_value
+
+    def select(self, test_cases: List[dict], mode: str = "all") -> List[dict]:
+        """
+        Кейсы для запуска:
+          all          — все;
+          failed       — упавшие в последнем запуске;
+          changed      — новые и изменённые с последнего успешного запуска;
+          failed-first — все, но сначала упавшие, затем изменённые, затем остальные.
+        Внутри каждой группы сохраняется исходный порядок.
+        """
+        if mode == "all":
+            return list(test_cases)
+        if mode not in SELECT_MODES:
+            raise ValueError(f"Неизвестный режим выбора кейсов '{mode}'")
+
+        failed, changed, rest = [], [], []
+        for tc in test_cases:
+            test_id = make_test_id(tc)
+            is_changed = self.is_changed(test_id, case_hash(tc))
+            if mode == "changed":
+                if is_changed:
+                    changed.append(tc)
+            elif self.is_failed(test_id):
+                failed.append(tc)
+            elif is_changed:
+                changed.append(tc)
+            else:
+                rest.append(tc)
+        if mode == "failed":
+            return failed
+        if mode == "changed":
+            return changed
+        return failed + changed + rest
+
+    def record(self, test_case: dict, outcome: str, duration: Optional[float], hash_value: Optional[str] = None) -> None:
+        """
+        hash_value — хэш данных кейса, посчитанный до запуска: исполнитель может дополнить кейс
+        служебными ключами, и хэш после запуска не совпадёт с хэшем в следующем select.
+        """
+        test_id = make_test_id(test_case)
+        hash_value = hash_value or case_hash(test_case)
+        entry = self.tests.setdefault(test_id, {})
+        entry["outcome"] = outcome
+        entry["duration"] = round(duration, 6) if duration is not None else entry.get("duration")
+        entry["hash"] = hash_value
+        if outcome == "passed":
+            entry["passed_hash"] = hash_value
+
+    @staticmethod
+    def test_id_from_nodeid(nodeid: str) -> Optional[str]:
+        # test_todos.py::test_scenario[getTodos_1] -> getTodos_1
+        start = nodeid.find("[")
+        if start == -1 or not nodeid.endswith("]"):
+            return None
+        return nodeid[start + 1:-1]
+
+    def save(self) -> None:
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"tests": self.tests}, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
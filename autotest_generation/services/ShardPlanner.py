@@ -0,0 +1,45 @@
+import heapq
+from statistics import median
+from typing import Dict, List
+
+from autotest_generation.services.AutotestGenerator import make_test_id
+
+# Длительность кейса, о котором ещё нет истории (и истории нет вовсе), секунды
+DEFAULT_DURATION = 1.0
+
+
+class ShardPlanner:
+    """
+    Разбиение тест-кейсов на шарды для параллельного запуска.
+
+    Шарды выравниваются по длительностям из прошлых запусков ({id кейса: секунды},
+    см. RunHistory.durations), а не по количеству кейсов: жадный алгоритм LPT —
+    кейсы от самого долгого к самому короткому отдаются в наименее загруженный шард.
+    Кейсы без истории считаются длящимися как медиана известных.
+    """
+
+    def __init__(self, durations: Dict[str, float]):
+        self.durations = durations
+        # Оценка для кейсов без истории считается один раз: новых кейсов может быть столько же, сколько известных
+        self.default = median(durations.values()) if durations else DEFAULT_DURATION
+
+    def estimate(self, test_id: str) -> float:
+        return self.durations.get(test_id, self.default)
+
+    def plan(self, test_cases: List[dict], workers: int) -> List[List[int]]:
+        """
+        Индексы кейсов по шардам (не больше workers шардов, пустых нет).
+        Внутри шарда кейсы идут в исходном порядке.
+        """
+        workers = max(1, min(workers, len(test_cases)))
+        weights = [self.estimate(make_test_id(tc)) for tc in test_cases]
+        order = sorted(range(len(test_cases)), key=lambda i: (-weights[i], i))
+
+        # Куча (нагрузка шарда, номер шарда)
+        heap = [(0.0, shard) for shard in range(workers)]
+        shards: List[List[int]] = [[] for _ in range(workers)]
+        for i in order:
+            load, shard = heapq.heappop(heap)
+            shards[shard].append(i)
+            heapq.heappush(heap, (load + weights[i], shard))
+        return [sorted(shard) for shard in shards if shard]
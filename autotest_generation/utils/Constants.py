@@ -1,3 +1,13 @@
 from pathlib import Path
 
 GENERATED_DIR = Path("generated_tests")
+# Файл данных с тест-кейсами и модуль исполнителя, которые кладутся рядом со сгенерированным тестом
+TEST_DATA_FILE = "test_cases.json"
+RUNTIME_MODULE = "autotest_runtime"
+TRANSPORT_MODULE = "autotest_transport"
+# История запусков: результат, длительность и хэш каждого кейса (выбор кейсов и балансировка шардов)
+HISTORY_FILE = Path(".mbt_history.json")
+# Сводка таймингов шагов последнего прогона (JSON)
+STEP_TIMINGS_FILE = Path("step_timings.json")
+# Отчёт нагрузочного режима (JSON)
+LOAD_REPORT_FILE = Path("load_report.json")
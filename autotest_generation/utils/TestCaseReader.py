@@ -1,5 +1,58 @@
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Union
+
 import yaml
 
-def load_test_cases(yaml_path: str) -> dict:
-    with open(yaml_path, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
+from test_case_generation.utils.SpecCache import SpecCache
+
+# C-ускоренный загрузчик (libyaml), если PyYAML собран с ним
+YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+def load_test_cases(yaml_path: str, cache_dir: Optional[Union[str, Path]] = None) -> dict:
+    """
+    Читает файл с тест-кейсами: YAML или JSON Lines (.jsonl).
+    Возвращает {"environment": {...}, "test_cases": [...]}.
+
+    Если передан cache_dir, разобранные кейсы кэшируются на диске (ключ — хэш содержимого файла
+    и версия инструмента, см. SpecCache): повторный запуск на неизменённом файле не парсит его заново.
+    Каждый вызов возвращает новые объекты — исполнители могут дополнять кейсы, не портя кэш.
+    """
+    with open(yaml_path, "rb") as f:
+        content = f.read()
+    cache = SpecCache(Path(cache_dir) / "test_cases") if cache_dir else None
+    cache_key = SpecCache.make_key(content) if cache else None
+    if cache:
+        data = cache.load(cache_key)
+        if data is not None:
+            return data
+
+    data = _parse(yaml_path, content)
+    if cache:
+        cache.save(cache_key, data)
+    return data
+
+
+def _parse(yaml_path: str, content: bytes) -> dict:
+    if yaml_path.endswith(".jsonl"):
+        environment: Dict[str, Any] = {}
+        test_cases = []
+        for item in iter_jsonl(yaml_path):
+            if "environment" in item and not test_cases:
+                environment = item["environment"]
+            else:
+                test_cases.append(item)
+        return {"environment": environment, "test_cases": test_cases}
+
+    return yaml.load(content.decode("utf-8"), Loader=YAML_LOADER)
+
+
+def iter_jsonl(jsonl_path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Построчно читает JSON Lines: первая строка — {"environment": ...}, далее по кейсу на строку.
+    """
+    with open(jsonl_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
@@ -0,0 +1,196 @@
+import random
+from typing import Any, Dict, List
+
+
+class SyntheticSpecGenerator:
+    """
+    Детерминированный (по seed) генератор синтетических OpenAPI спецификаций для бенчмарков.
+
+    Спецификация состоит из ресурсов с CRUD-операциями
+    (GET/POST коллекции, GET/PUT/DELETE элемента; часть ресурсов вложена в родительский),
+    и содержит нагрузочные случаи:
+    - глубокие цепочки $ref (DTO -> Chain_1 -> ... -> Chain_depth);
+    - циклические ссылки (самоссылающееся дерево и пара взаимно ссылающихся схем);
+    - широкие allOf (тело запроса) и oneOf (тело ответа) из wide вариантов;
+    - query-параметры с enum и границами — для комбинаторного режима.
+    """
+
+    TYPES = (
+        {"type": "string"},
+        {"type": "string", "format": "date"},
+        {"type": "string", "format": "date-time"},
+        {"type": "string", "format": "uuid"},
+        {"type": "integer"},
+        {"type": "number"},
+        {"type": "boolean"},
+    )
+    ITEM_METHODS = ("get", "put", "delete")
+
+    def __init__(
+            self,
+            operations: int = 100,
+            seed: int = 0,
+            ref_depth: int = 5,
+            wide: int = 8,
+            properties: int = 8,
+            query_params: int = 4
+    ):
+        self.operations = operations
+        self.ref_depth = ref_depth
+        self.wide = wide
+        self.properties = properties
+        self.query_params = query_params
+        self.rnd = random.Random(seed)
+
+    def generate(self) -> Dict[str, Any]:
+        schemas: Dict[str, Any] = {}
+        paths: Dict[str, Any] = {}
+        self._add_shared_schemas(schemas)
+
+        ops_left = self.operations
+        resource = 0
+        parents: List[str] = []
+        while ops_left > 0:
+            name = f"Resource{resource}"
+            self._add_resource_schemas(schemas, name)
+
+            # Каждый третий ресурс вкладываем в уже созданный
+            if parents and resource % 3 == 2:
+                parent = self.rnd.choice(parents)
+                base = f"/{parent.lower()}s/{{{parent.lower()}Id}}/{name.lower()}s"
+            else:
+                base = f"/{name.lower()}s"
+                parents.append(name)
+
+            collection_ops = self._collection_operations(name, ops_left)
+            paths[base] = collection_ops
+            ops_left -= len(collection_ops)
+            if ops_left > 0:
+                item_ops = self._item_operations(name, ops_left)
+                paths[f"{base}/{{{name.lower()}Id}}"] = item_ops
+                ops_left -= len(item_ops) - 1  # ключ parameters — не операция
+            resource += 1
+
+        return {
+            "openapi": "3.0.0",
+            "info": {"title": "Synthetic API", "version": "1.0.0"},
+            "servers": [{"url": "http://localhost:8080"}],
+            "paths": paths,
+            "components": {"schemas": schemas},
+        }
+
+    # ======================================
+    # Схемы
+    # ======================================
+
+    def _add_shared_schemas(self, schemas: Dict[str, Any]) -> None:
+        schemas["TreeNode"] = {
+            "type": "object",
+            "properties": {
+                "value": {"type": "integer"},
+                "left": {"$ref": "#/components/schemas/TreeNode"},
+                "right": {"$ref": "#/components/schemas/TreeNode"},
+            },
+        }
+        schemas["Owner"] = {
+            "type": "object",
+            "properties": {"name": {"type": "string"}, "pet": {"$ref": "#/components/schemas/Pet"}},
+        }
+        schemas["Pet"] = {
+            "type": "object",
+            "properties": {"name": {"type": "string"}, "owner": {"$ref": "#/components/schemas/Owner"}},
+        }
+        for i in range(self.wide):
+            schemas[f"Variant{i}"] = self._object_schema(prefix=f"v{i}_")
+
+    def _add_resource_schemas(self, schemas: Dict[str, Any], name: str) -> None:
+        dto = self._object_schema()
+        dto["properties"]["id"] = {"type": "integer"}
+        dto["properties"]["tree"] = {"$ref": "#/components/schemas/TreeNode"}
+        dto["properties"]["owner"] = {"$ref": "#/components/schemas/Owner"}
+        if self.ref_depth > 0:
+            dto["properties"]["chain"] = {"$ref": f"#/components/schemas/{name}Chain1"}
+        schemas[name] = dto
+
+        for level in range(1, self.ref_depth + 1):
+            chain = self._object_schema()
+            if level < self.ref_depth:
+                chain["properties"]["next"] = {"$ref": f"#/components/schemas/{name}Chain{level + 1}"}
+            schemas[f"{name}Chain{level}"] = chain
+
+    def _object_schema(self, prefix: str = "") -> Dict[str, Any]:
+        props = {}
+        for i in range(self.properties):
+            prop = dict(self.rnd.choice(self.TYPES))
+            if prop["type"] == "string" and "format" not in prop and self.rnd.random() < 0.3:
+                prop["enum"] = [f"value{j}" for j in range(self.rnd.randint(2, 5))]
+            props[f"{prefix}field{i}"] = prop
+        return {"type": "object", "required": [f"{prefix}field0"], "properties": props}
+
+    # ======================================
+    # Операции
+    # ======================================
+
+    def _ref(self, name: str) -> Dict[str, str]:
+        return {"$ref": f"#/components/schemas/{name}"}
+
+    def _json_content(self, schema: Dict[str, Any]) -> Dict[str, Any]:
+        return {"content": {"application/json": {"schema": schema}}}
+
+    def _wide_body(self, name: str) -> Dict[str, Any]:
+        return {"allOf": [self._ref(name)] + [self._ref(f"Variant{i}") for i in range(self.wide)]}
+
+    def _wide_response(self, name: str) -> Dict[str, Any]:
+        return {"oneOf": [self._ref(name)] + [self._ref(f"Variant{i}") for i in range(self.wide)]}
+
+    def _query_parameters(self) -> List[Dict[str, Any]]:
+        params = []
+        for i in range(self.query_params):
+            kind = self.rnd.randint(0, 2)
+            if kind == 0:
+                schema = {"type": "string", "enum": [f"opt{j}" for j in range(self.rnd.randint(2, 4))]}
+            elif kind == 1:
+                schema = {"type": "integer", "minimum": 0, "maximum": self.rnd.randint(10, 1000)}
+            else:
+                schema = {"type": "boolean"}
+            params.append({"name": f"q{i}", "in": "query", "required": self.rnd.random() < 0.5, "schema": schema})
+        return params
+
+    def _collection_operations(self, name: str, limit: int) -> Dict[str, Any]:
+        ops = {
+            "get": {
+                "operationId": f"list{name}",
+                "summary": f"List {name}",
+                "tags": [name],
+                "parameters": self._query_parameters(),
+                "responses": {"200": {"description": "OK", **self._json_content(
+                    {"type": "array", "items": self._ref(name)}
+                )}},
+            },
+            "post": {
+                "operationId": f"create{name}",
+                "summary": f"Create {name}",
+                "tags": [name],
+                "requestBody": self._json_content(self._wide_body(name)),
+                "responses": {"201": {"description": "Created", **self._json_content(self._ref(name))}},
+            },
+        }
+        return dict(list(ops.items())[:limit])
+
+    def _item_operations(self, name: str, limit: int) -> Dict[str, Any]:
+        id_param = {"name": f"{name.lower()}Id", "in": "path", "required": True, "schema": {"type": "integer"}}
+        ops: Dict[str, Any] = {"parameters": [id_param]}
+        for method in self.ITEM_METHODS[:limit]:
+            op: Dict[str, Any] = {
+                "operationId": f"{method}{name}",
+                "summary": f"{method.upper()} {name}",
+                "tags": [name],
+            }
+            if method == "put":
+                op["requestBody"] = self._json_content(self._wide_body(name))
+            if method == "delete":
+                op["responses"] = {"204": {"description": "Deleted"}}
+            else:
+                op["responses"] = {"200": {"description": "OK", **self._json_content(self._wide_response(name))}}
+            ops[method] = op
+        return ops
@@ -0,0 +1,206 @@
+import argparse
+import json
+import platform
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List
+
+import yaml
+
+from benchmarks.SyntheticSpecGenerator import SyntheticSpecGenerator
+from test_case_generation.models.OpenAPISpec import OpenAPISpec
+from test_case_generation.services.TestCaseGenerator import TestCaseGenerator
+from test_case_generation.services.TestCaseWriter import TextTestCaseWriter, YamlTestCaseWriter, YAML_DUMPER
+from test_case_generation.utils.Constants import TOOL_VERSION
+from test_case_generation.utils.PhaseProfiler import PhaseProfiler
+from autotest_generation.services.AutotestGenerator import create_test_file
+from autotest_generation.services.AsyncRunner import AsyncRunner
+from mock_server.MockServer import MockServer
+from autotest_generation.utils.TestCaseReader import load_test_cases
+
+
+def run_benchmark(
+        operations: int,
+        seed: int,
+        workdir: Path,
+        track_memory: bool = True,
+        runner: bool = False
+) -> Dict[str, Any]:
+    """
+    Один прогон всего конвейера на синтетической спецификации из operations операций.
+    runner — дополнительно выполнить кейсы исполнителем asyncio против заглушки API (фаза async_run).
+    Возвращает замеры по фазам (PhaseProfiler.to_dict()) и размеры результата.
+    """
+    spec_dict = SyntheticSpecGenerator(operations=operations, seed=seed).generate()
+    spec_path = workdir / f"spec_{operations}.yaml"
+    with open(spec_path, "w", encoding="utf-8") as f:
+        yaml.dump(spec_dict, f, Dumper=YAML_DUMPER, sort_keys=False)
+    del spec_dict
+
+    profiler = PhaseProfiler(track_memory=track_memory)
+    try:
+        spec = OpenAPISpec(str(spec_path), profiler=profiler)
+        generator = TestCaseGenerator(spec)
+        with profiler.phase("generate"):
+            generator.generate_test_cases()
+
+        yaml_path = workdir / f"test_cases_{operations}.yaml"
+        with profiler.phase("save_yaml"):
+            with YamlTestCaseWriter(str(yaml_path), spec.get_base_url()) as writer:
+                for tc in generator.test_cases:
+                    writer.write(tc)
+        with profiler.phase("save_text"):
+            with TextTestCaseWriter(str(workdir / f"test_cases_{operations}.txt")) as writer:
+                for tc in generator.test_cases:
+                    writer.write(tc)
+
+        with profiler.phase("testcase_read"):
+            test_data = load_test_cases(str(yaml_path))
+        with profiler.phase("codegen"):
+            create_test_file(
+                test_data["test_cases"],
+                test_data["environment"]["base_url"],
+                workdir / f"test_generated_{operations}.py"
+            )
+
+        requests_served = None
+        if runner:
+            mock = MockServer(spec, generator)
+            server = mock.run_in_thread()
+            try:
+                with profiler.phase("async_run"):
+                    AsyncRunner(server.base_url).run(test_data["test_cases"])
+            finally:
+                server.stop()
+            requests_served = mock.requests
+    finally:
+        profiler.stop()
+
+    result = {
+        "operations": len(spec.parsed_operations),
+        "schemas": len(spec.parsed_schemas),
+        "test_cases": len(generator.test_cases),
+        "phases": profiler.to_dict(),
+    }
+    if requests_served is not None:
+        result["requests"] = requests_served
+    return result
+
+
+def compare_with_baseline(
+        results: Dict[str, Any],
+        baseline: Dict[str, Any],
+        tolerance: float
+) -> List[str]:
+    """
+    Сравнивает результаты с сохранённым baseline. Регрессия — фаза, время или пик памяти
+    которой вырос больше чем в (1 + tolerance) раз. Возвращает список описаний регрессий.
+    """
+    regressions = []
+    for size, run in results["runs"].items():
+        base_run = baseline.get("runs", {}).get(size)
+        if base_run is None:
+            continue
+        for name, stats in run["phases"].items():
+            base_stats = base_run["phases"].get(name)
+            if base_stats is None:
+                continue
+            for metric in ("wall_s", "peak_mem_bytes"):
+                current, previous = stats.get(metric), base_stats.get(metric)
+                if not current or not previous:
+                    continue
+                if current > previous * (1 + tolerance):
+                    regressions.append(
+                        f"{size} операций, {name}.{metric}: {previous} -> {current} "
+                        f"(+{(current / previous - 1) * 100:.0f}%)"
+                    )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Бенчмарк конвейера (загрузка, разбор, генерация, сохранение, кодогенерация) "
+                    "на синтетических OpenAPI спецификациях"
+    )
+    parser.add_argument(
+        "--operations",
+        default="100,1000",
+        help="Размеры спецификаций (число операций) через запятую (по умолчанию: 100,1000)"
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Seed генератора спецификаций (по умолчанию: 0)"
+    )
+    parser.add_argument(
+        "--out",
+        default="benchmark_results.json",
+        help="Файл для результатов в JSON (по умолчанию: benchmark_results.json)"
+    )
+    parser.add_argument(
+        "--baseline",
+        default=None,
+        help="JSON с результатами предыдущего прогона для сравнения; при регрессии код возврата 1"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Допустимый рост времени/памяти фазы относительно baseline (по умолчанию: 0.2 — 20%%)"
+    )
+    parser.add_argument(
+        "--no-memory",
+        action="store_true",
+        help="Не замерять память (tracemalloc заметно замедляет работу, время получается точнее)"
+    )
+    parser.add_argument(
+        "--runner",
+        action="store_true",
+        help="Также выполнить кейсы исполнителем asyncio против локальной заглушки API (фаза async_run)"
+    )
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.operations.split(",") if s.strip()]
+    results: Dict[str, Any] = {
+        "meta": {
+            "tool_version": TOOL_VERSION,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "memory": not args.no_memory,
+            "runner": args.runner,
+        },
+        "runs": {},
+    }
+
+    with tempfile.TemporaryDirectory(prefix="mbt_bench_") as tmp:
+        for size in sizes:
+            print(f"=== {size} операций ===")
+            run = run_benchmark(size, args.seed, Path(tmp), track_memory=not args.no_memory, runner=args.runner)
+            results["runs"][str(size)] = run
+            print(f"Операций: {run['operations']}, схем: {run['schemas']}, тест-кейсов: {run['test_cases']}"
+                  + (f", запросов к заглушке: {run['requests']}" if "requests" in run else ""))
+            profiler = PhaseProfiler()
+            profiler.phases = run["phases"]
+            print(profiler.report())
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"Результаты сохранены в '{args.out}'")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(results, baseline, args.tolerance)
+        if regressions:
+            print("Регрессии относительно baseline:")
+            for line in regressions:
+                print("  " + line)
+            sys.exit(1)
+        print("Регрессий относительно baseline нет.")
+
+
+if __name__ == "__main__":
+    main()
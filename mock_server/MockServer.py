@@ -0,0 +1,282 @@
+import asyncio
+import json
+import threading
+from http import HTTPStatus
+from typing import Any, Dict, Optional, Tuple
+
+from mock_server.PathRouter import PathRouter
+from test_case_generation.models.OpenAPISpec import OpenAPISpec
+from test_case_generation.services.TestCaseGenerator import TestCaseGenerator
+
+# Предел размера заголовков запроса, байты: больше — 431 и закрытие соединения
+MAX_HEADER_BYTES = 64 * 1024
+# Очередь входящих соединений сокета: тысячи клиентов подключаются одновременно
+BACKLOG = 4096
+
+
+def render_response(status: int, body: bytes = b"", close: bool = False) -> bytes:
+    """
+    Готовый HTTP/1.1 ответ одним буфером (статус, заголовки и тело отправляются одной записью).
+    """
+    try:
+        reason = HTTPStatus(status).phrase
+    except ValueError:
+        reason = "Unknown"
+    head = f"HTTP/1.1 {status} {reason}\r\n"
+    if status in (204, 304):
+        body = b""
+    else:
+        head += f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+    if close:
+        head += "Connection: close\r\n"
+    return head.encode("latin-1") + b"\r\n" + body
+
+
+def _error(status: int, message: str) -> Tuple[int, bytes]:
+    return status, json.dumps({"error": message}, ensure_ascii=False).encode("utf-8")
+
+
+class MockRoute:
+    """
+    Маршрут спецификации: заранее собранные ответы операций
+    ({метод: (код, тело в байтах, пример тела, готовый HTTP-ответ)}).
+    item — путь элемента ресурса, у коллекции которого есть создатель (POST):
+    его GET/PUT/PATCH/DELETE работают с хранилищем.
+    creates — POST коллекции, у которой есть путь элемента: создаёт ресурс в хранилище.
+    """
+
+    __slots__ = ('path', 'responses', 'item', 'creates')
+
+    def __init__(self, path: str):
+        self.path = path
+        self.responses: Dict[str, Tuple[int, bytes, Any, bytes]] = {}
+        self.item = False
+        self.creates = False
+
+
+class MockServer:
+    """
+    Заглушка API по спецификации OpenAPI для офлайн-запуска сгенерированных тестов и бенчмарков исполнителя.
+
+    - ответы — примеры тел той же логикой, что и в тест-кейсах (TestCaseGenerator._build_response_body),
+      код — первый 2xx операции; статические ответы собираются в байты один раз при старте;
+    - маршрутизация — PathRouter (дерево сегментов);
+    - ресурсы с создателем хранятся в памяти: POST коллекции создаёт ресурс (пример ответа + тело запроса
+      + новый id), GET/PUT/PATCH/DELETE элемента читают, меняют и удаляют его, несуществующий — 404.
+      GET коллекции отдаёт пример из спецификации;
+    - HTTP/1.1 keep-alive (в том числе конвейер запросов) на asyncio.Protocol без потоков на соединение,
+      поэтому держит тысячи одновременных соединений, а ответ — это поиск маршрута и одна запись в сокет.
+
+    Один процесс: хранилище общее для всех соединений, и ресурс, созданный через одно соединение,
+    виден через любое другое.
+    """
+
+    def __init__(self, spec: OpenAPISpec, generator: Optional[TestCaseGenerator] = None):
+        generator = generator or TestCaseGenerator(spec)
+        self.router = PathRouter()
+        self.routes: Dict[str, MockRoute] = {}
+        # {путь коллекции запроса (/projects/3/tasks): {id: (ресурс, тело ответа)}}
+        self.store: Dict[str, Dict[str, Tuple[Dict[str, Any], bytes]]] = {}
+        self.next_id = 1
+        self.requests = 0
+        self.connections = 0
+        self.active_connections = 0
+
+        path_index = generator.path_index
+        for op in spec.parsed_operations:
+            route = self.routes.get(op.path)
+            if route is None:
+                route = self.routes[op.path] = MockRoute(op.path)
+                self.router.add(op.path, route)
+            example, code = generator._build_response_body(op)
+            body = json.dumps(example, ensure_ascii=False).encode("utf-8") if example is not None else b""
+            status = int(code) if code.isdigit() else 200
+            route.responses[op.method] = (status, body, example, render_response(status, body))
+
+        for path, route in self.routes.items():
+            creator = path_index.creator(path)
+            if path.rstrip("/").endswith("}") and creator is not None and creator.path != path:
+                route.item = True
+                self.routes[creator.path].creates = True
+
+    # ======================================
+    # Обработка запроса
+    # ======================================
+
+    def handle(self, method: str, target: str, body: bytes) -> bytes:
+        """
+        Ответ (готовые байты без Connection: close) на запрос method target с телом body.
+        """
+        self.requests += 1
+        path = target.split("?", 1)[0]
+        matched = self.router.match(path)
+        if matched is None:
+            return render_response(*_error(404, f"Нет маршрута {path}"))
+        route = matched[0]
+        response = route.responses.get(method)
+        if response is None:
+            return render_response(*_error(405, f"Метод {method} не поддерживается для {route.path}"))
+
+        if route.item:
+            return self._handle_item(method, path, body, response)
+        if route.creates and method == "POST":
+            return self._create(path, body, response)
+        return response[3]
+
+    def _create(self, path: str, body: bytes, response: Tuple[int, bytes, Any, bytes]) -> bytes:
+        code, _, example, _ = response
+        request_body, error = self._json_body(body)
+        if error:
+            return render_response(*error)
+        resource = dict(example) if isinstance(example, dict) else {}
+        if isinstance(request_body, dict):
+            resource.update(request_body)
+        resource["id"] = self.next_id
+        self.next_id += 1
+        payload = json.dumps(resource, ensure_ascii=False).encode("utf-8")
+        self.store.setdefault(path.rstrip("/"), {})[str(resource["id"])] = (resource, payload)
+        return render_response(code, payload)
+
+    def _handle_item(self, method: str, path: str, body: bytes, response: Tuple[int, bytes, Any, bytes]) -> bytes:
+        code, _, _, static_response = response
+        collection_path, _, item_id = path.rstrip("/").rpartition("/")
+        collection = self.store.get(collection_path)
+        stored = collection.get(item_id) if collection else None
+        if stored is None:
+            return render_response(*_error(404, f"Ресурс {path} не найден"))
+
+        if method == "DELETE":
+            del collection[item_id]
+            return static_response
+        if method in ("PUT", "PATCH"):
+            request_body, error = self._json_body(body)
+            if error:
+                return render_response(*error)
+            resource = dict(stored[0])
+            if isinstance(request_body, dict):
+                resource.update(request_body)
+            resource["id"] = stored[0]["id"]
+            stored = collection[item_id] = (resource, json.dumps(resource, ensure_ascii=False).encode("utf-8"))
+        return render_response(code, stored[1])
+
+    @staticmethod
+    def _json_body(body: bytes):
+        if not body:
+            return None, None
+        try:
+            return json.loads(body), None
+        except ValueError:
+            return None, _error(400, "Тело запроса — не JSON")
+
+    # ======================================
+    # Сервер
+    # ======================================
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8080) -> asyncio.AbstractServer:
+        loop = asyncio.get_running_loop()
+        return await loop.create_server(lambda: _HttpProtocol(self), host, port, backlog=BACKLOG, reuse_address=True)
+
+    async def serve_forever(self, host: str = "127.0.0.1", port: int = 8080) -> None:
+        server = await self.start(host, port)
+        async with server:
+            await server.serve_forever()
+
+    def run_in_thread(self, host: str = "127.0.0.1", port: int = 0) -> 'MockServerThread':
+        """
+        Запускает сервер в фоновом потоке со своим циклом событий (тесты, бенчмарки).
+        port=0 — свободный порт, фактический — в .port.
+        """
+        return MockServerThread(self, host, port)
+
+
+class MockServerThread:
+    def __init__(self, mock: MockServer, host: str, port: int):
+        self.loop = asyncio.new_event_loop()
+        started = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(self.loop)
+            self.server = self.loop.run_until_complete(mock.start(host, port))
+            started.set()
+            self.loop.run_forever()
+            self.server.close()
+            self.loop.run_until_complete(self.server.wait_closed())
+            self.loop.close()
+
+        self.thread = threading.Thread(target=run, daemon=True)
+        self.thread.start()
+        started.wait()
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.base_url = f"http://{host}:{self.port}"
+
+    def stop(self) -> None:
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+
+class _HttpProtocol(asyncio.Protocol):
+    """
+    Соединение HTTP/1.1: запросы разбираются из буфера по мере поступления данных (тело — по Content-Length),
+    ответы пишутся в порядке запросов.
+    """
+
+    __slots__ = ('mock', 'transport', 'buffer')
+
+    def __init__(self, mock: MockServer):
+        self.mock = mock
+        self.transport: Optional[asyncio.Transport] = None
+        self.buffer = bytearray()
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self.transport = transport
+        self.mock.connections += 1
+        self.mock.active_connections += 1
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        self.mock.active_connections -= 1
+
+    def data_received(self, data: bytes) -> None:
+        self.buffer += data
+        while self.transport is not None and not self.transport.is_closing():
+            end = self.buffer.find(b"\r\n\r\n")
+            if end < 0:
+                if len(self.buffer) > MAX_HEADER_BYTES:
+                    self._close_with(*_error(431, "Слишком большие заголовки"))
+                return
+            lines = bytes(self.buffer[:end]).decode("latin-1").split("\r\n")
+            parts = lines[0].split(" ")
+            if len(parts) != 3:
+                self._close_with(*_error(400, "Некорректная строка запроса"))
+                return
+            method, target, version = parts
+
+            headers = {}
+            for line in lines[1:]:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+            if "chunked" in headers.get("transfer-encoding", "").lower():
+                self._close_with(*_error(411, "Нужен Content-Length"))
+                return
+            try:
+                length = int(headers.get("content-length") or 0)
+            except ValueError:
+                self._close_with(*_error(400, "Некорректный Content-Length"))
+                return
+            if len(self.buffer) < end + 4 + length:
+                return
+            body = bytes(self.buffer[end + 4:end + 4 + length])
+            del self.buffer[:end + 4 + length]
+
+            connection = headers.get("connection", "").lower()
+            keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+            response = self.mock.handle(method.upper(), target, body)
+            if keep_alive:
+                self.transport.write(response)
+            else:
+                status_end = response.index(b"\r\n") + 2
+                self.transport.write(response[:status_end] + b"Connection: close\r\n" + response[status_end:])
+                self.transport.close()
+
+    def _close_with(self, status: int, body: bytes) -> None:
+        self.transport.write(render_response(status, body, close=True))
+        self.transport.close()
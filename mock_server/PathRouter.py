@@ -0,0 +1,68 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class _RouteNode:
+    __slots__ = ('children', 'param_child', 'param_name', 'route')
+
+    def __init__(self):
+        self.children: Dict[str, '_RouteNode'] = {}
+        self.param_child: Optional['_RouteNode'] = None
+        self.param_name: Optional[str] = None
+        self.route: Any = None
+
+
+class PathRouter:
+    """
+    Маршрутизатор по шаблонам путей OpenAPI ("/todos/{todoId}"), скомпилированным в дерево сегментов.
+
+    Поиск идёт по сегментам запроса за O(глубины пути) независимо от числа маршрутов:
+    сначала литеральный сегмент (/todos/count раньше /todos/{id}), затем параметр;
+    если ветка литерала дальше не совпала, пробуется ветка параметра.
+    """
+
+    def __init__(self):
+        self.root = _RouteNode()
+
+    @staticmethod
+    def _segments(path: str) -> List[str]:
+        return [s for s in path.split("/") if s]
+
+    def add(self, path: str, route: Any) -> None:
+        node = self.root
+        for segment in self._segments(path):
+            if segment.startswith("{") and segment.endswith("}"):
+                if node.param_child is None:
+                    node.param_child = _RouteNode()
+                    # Имя берётся из первого шаблона: /todos/{id} и /todos/{todoId}/items — один узел
+                    node.param_child.param_name = segment[1:-1]
+                node = node.param_child
+            else:
+                child = node.children.get(segment)
+                if child is None:
+                    child = node.children[segment] = _RouteNode()
+                node = child
+        node.route = route
+
+    def match(self, path: str) -> Optional[Tuple[Any, Dict[str, str]]]:
+        """
+        (маршрут, {имя параметра: значение}) для пути запроса без query-строки или None.
+        """
+        segments = self._segments(path)
+        params: Dict[str, str] = {}
+        route = self._match(self.root, segments, 0, params)
+        return None if route is None else (route, params)
+
+    def _match(self, node: _RouteNode, segments: List[str], index: int, params: Dict[str, str]) -> Any:
+        if index == len(segments):
+            return node.route
+        child = node.children.get(segments[index])
+        if child is not None:
+            route = self._match(child, segments, index + 1, params)
+            if route is not None:
+                return route
+        if node.param_child is not None:
+            route = self._match(node.param_child, segments, index + 1, params)
+            if route is not None:
+                params[node.param_child.param_name] = segments[index]
+                return route
+        return None
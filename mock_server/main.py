@@ -0,0 +1,53 @@
+import argparse
+import asyncio
+
+from mock_server.MockServer import MockServer
+from test_case_generation.models.OpenAPISpec import OpenAPISpec
+from test_case_generation.services.TestCaseGenerator import TestCaseGenerator
+
+
+def raise_open_files_limit():
+    """
+    Поднимает мягкий лимит открытых файлов до жёсткого: каждое соединение — дескриптор,
+    а по умолчанию (часто 1024) тысячи соединений не помещаются. На Windows модуля resource нет.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard != resource.RLIM_INFINITY and soft < hard:
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+            soft = hard
+        except (ValueError, OSError):
+            pass
+    return soft
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Заглушка API по спецификации OpenAPI")
+    parser.add_argument("spec_path", help="Путь к OpenAPI спецификации (.yaml/.yml/.json)")
+    parser.add_argument("--host", default="127.0.0.1", help="Адрес (по умолчанию: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8080, help="Порт (по умолчанию: 8080)")
+    parser.add_argument(
+        "--max-ref-depth",
+        type=int,
+        default=1,
+        help="Глубина рекурсивных схем в примерах ответов, как у генерации тест-кейсов (по умолчанию: 1)"
+    )
+    args = parser.parse_args()
+
+    spec = OpenAPISpec(args.spec_path)
+    mock = MockServer(spec, TestCaseGenerator(spec, max_ref_depth=args.max_ref_depth))
+    limit = raise_open_files_limit()
+    print(f"Заглушка {args.spec_path}: {len(mock.routes)} путей, http://{args.host}:{args.port}"
+          + (f" (лимит соединений: {limit})" if limit else ""))
+    try:
+        asyncio.run(mock.serve_forever(args.host, args.port))
+    except KeyboardInterrupt:
+        print(f"Остановлено, обработано запросов: {mock.requests}, соединений: {mock.connections}")
+
+
+if __name__ == "__main__":
+    main()
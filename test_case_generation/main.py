@@ -1,6 +1,12 @@
 import argparse
 from test_case_generation.models.OpenAPISpec import OpenAPISpec
 from test_case_generation.services.TestCaseGenerator import TestCaseGenerator
+from test_case_generation.services.ScenarioGenerator import ScenarioGenerator
+from test_case_generation.services.IncrementalRegenerator import IncrementalRegenerator
+from test_case_generation.services.OperationIndex import OperationIndex
+from test_case_generation.services.TestCaseWriter import TextTestCaseWriter, WRITERS
+from test_case_generation.utils.Constants import CACHE_DIR
+from test_case_generation.utils.PhaseProfiler import add_profiling_arguments, profiler_from_args, finish_profiling, phase
 
 def main():
     parser = argparse.ArgumentParser(
@@ -8,7 +14,7 @@ def main():
     )
     parser.add_argument(
         "spec_path",
-        help="Путь к OpenAPI спецификации (.yaml или .yml)"
+        help="Путь к OpenAPI спецификации (.yaml, .yml или .json)"
     )
     parser.add_argument(
         "--txt-out",
@@ -20,25 +26,211 @@ def main():
         default="test_cases.yaml",
         help="Файл для сохранения тест-кейсов в YAML формате (по умолчанию: test_cases.yaml)"
     )
+    parser.add_argument(
+        "--jsonl-out",
+        default="test_cases.jsonl",
+        help="Файл для сохранения тест-кейсов в формате JSON Lines (по умолчанию: test_cases.jsonl)"
+    )
+    parser.add_argument(
+        "--format",
+        choices=sorted(WRITERS),
+        default="yaml",
+        help="Формат структурированного вывода: yaml (в --yaml-out) или jsonl (в --jsonl-out). По умолчанию: yaml"
+    )
     parser.add_argument(
         "--no-print",
         action="store_true",
         help="Не выводить тест-кейсы в консоль"
     )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Число процессов для генерации тест-кейсов (по умолчанию: 1 — последовательно)"
+    )
+    parser.add_argument(
+        "--strength",
+        type=int,
+        default=None,
+        help="Комбинаторное покрытие query/header/cookie параметров: 2 — все пары значений (pairwise), "
+             "3 и больше — n-wise. По умолчанию выключено (один кейс на операцию). "
+             "Время построения растёт со степенью: на 20 параметрах по 5 значений pairwise — сотые доли "
+             "секунды, 3-wise — около 0.4 с, 4-wise и больше — секунды"
+    )
+    parser.add_argument(
+        "--max-ref-depth",
+        type=int,
+        default=1,
+        help="Сколько раз рекурсивная схема может вложиться сама в себя при генерации примеров (по умолчанию: 1)"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=str(CACHE_DIR),
+        help=f"Папка для кэша разобранных спецификаций (по умолчанию: {CACHE_DIR})"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Не использовать кэш разобранной спецификации"
+    )
+    parser.add_argument(
+        "--low-memory",
+        action="store_true",
+        help="Режим для очень больших спецификаций: исходный документ освобождается после разбора, "
+             "текстовое представление кейсов строится только при выводе"
+    )
+    parser.add_argument(
+        "--only",
+        action="append",
+        default=[],
+        metavar="SELECTOR",
+        help="Генерировать только операции, подходящие под селектор: id:<operationId>, tag:<тег>, "
+             "method:<метод>, path:<префикс пути> (можно через запятую и несколько раз)"
+    )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        metavar="SELECTOR",
+        help="Исключить операции, подходящие под селектор (тот же синтаксис, что и у --only)"
+    )
+    parser.add_argument(
+        "--latency-max",
+        type=float,
+        default=None,
+        metavar="MS",
+        help="Ожидаемое максимальное время ответа основного шага, мс (для всех операций; "
+             "переопределяется расширением x-latency операции)"
+    )
+    parser.add_argument(
+        "--latency-p95",
+        type=float,
+        default=None,
+        metavar="MS",
+        help="Ожидаемый 95-й перцентиль времени ответа основного шага, мс"
+    )
+    parser.add_argument(
+        "--latency-repeat",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Сколько раз выполнить читающий основной шаг для проверки времени ответа (по умолчанию: 1)"
+    )
+    parser.add_argument(
+        "--scenarios",
+        action="store_true",
+        help="Объединять операции ресурса в сценарный кейс CRUD (создание → чтение → изменение → "
+             "чтение → удаление) вместо отдельного кейса на операцию; id из ответа передаётся в следующие шаги"
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Перегенерировать только операции, изменившиеся с прошлого запуска; "
+             "кейсы остальных операций (включая ручные правки) сохраняются"
+    )
+    parser.add_argument(
+        "--manifest",
+        default=None,
+        help="Файл манифеста для --incremental (по умолчанию: <yaml-out>.manifest.json)"
+    )
+    add_profiling_arguments(parser)
 
     args = parser.parse_args()
+    profiler = profiler_from_args(args)
+    try:
+        _run(parser, args, profiler)
+    finally:
+        finish_profiling(profiler, args)
+
+
+def _run(parser, args, profiler):
+    spec = OpenAPISpec(
+        args.spec_path,
+        cache_dir=None if args.no_cache else args.cache_dir,
+        low_memory=args.low_memory,
+        profiler=profiler
+    )
+    generator = TestCaseGenerator(
+        spec,
+        max_ref_depth=args.max_ref_depth,
+        strength=args.strength,
+        low_memory=args.low_memory,
+        profiler=profiler,
+        latency={"max_ms": args.latency_max, "p95_ms": args.latency_p95, "repeat": args.latency_repeat}
+    )
+
+    # Выборочная генерация: невыбранные операции не доходят ни до генерации, ни до записи
+    selected = None
+    if args.only or args.exclude:
+        try:
+            selected = OperationIndex(spec.parsed_operations).select(args.only, args.exclude)
+        except ValueError as e:
+            parser.error(str(e))
+        print(f"Выбрано операций: {len(selected)} из {len(spec.parsed_operations)}")
+
+    structured_out = args.jsonl_out if args.format == "jsonl" else args.yaml_out
+    writers = [
+        TextTestCaseWriter(args.txt_out),
+        WRITERS[args.format](structured_out, spec.get_base_url()),
+    ]
+
+    if args.scenarios and args.incremental:
+        parser.error("--scenarios пока не поддерживается вместе с --incremental")
+
+    if args.incremental:
+        manifest_path = args.manifest or f"{structured_out}.manifest.json"
+        regenerator = IncrementalRegenerator(spec, generator, manifest_path)
+        changed = regenerator.changed_operations(writers)
+        if selected is not None:
+            selected_ids = {id(op) for op in selected}
+            changed = [op for op in changed if id(op) in selected_ids]
+        cases = generator.iter_test_cases(jobs=args.jobs, operations=changed)
+        with phase(profiler, "generate_and_save"):
+            regenerator.write(changed, _printed(cases, args.no_print), writers)
+        regenerator.save_manifest(changed)
+        print(f"Перегенерировано операций: {len(changed)} из {len(spec.parsed_operations)}")
+        print(f"Готово! Файлы '{args.txt_out}' и '{structured_out}' обновлены.")
+        return
+
+    # Кейсы генерируются и пишутся по одному, в памяти набор целиком не держится
+    # generate_and_save — весь конвейер; внутри него operation_generate (генерация операции)
+    # и serialize (запись кейса в файлы) — без замера памяти, т.к. вызываются на каждый кейс
+    txt_writer, structured_writer = writers
+    if args.scenarios:
+        cases = _with_scenarios(generator, selected, args.jobs)
+    else:
+        cases = generator.iter_test_cases(jobs=args.jobs, operations=selected)
+    with phase(profiler, "generate_and_save"), txt_writer, structured_writer:
+        for tc in _printed(cases, args.no_print):
+            with phase(profiler, "serialize", memory=False):
+                txt_writer.write(tc)
+                structured_writer.write(tc)
+
+    print(f"Готово! Файлы '{args.txt_out}' и '{structured_out}' созданы.")
 
-    spec = OpenAPISpec(args.spec_path)
-    generator = TestCaseGenerator(spec)
-    generator.generate_test_cases()
 
-    if not args.no_print:
-        generator.print_test_cases()
+def _with_scenarios(generator, selected, jobs: int):
+    """
+    Сценарии CRUD для ресурсов, затем обычные кейсы операций, которые сценарии не покрыли.
+    """
+    scenarios = ScenarioGenerator(generator)
+    resources = scenarios.resources(selected)
+    covered = scenarios.covered_operations(resources)
+    operations = selected if selected is not None else generator.spec.parsed_operations
+    rest = [op for op in operations if id(op) not in covered]
+    print(f"Сценариев CRUD: {len(resources)}, отдельных операций: {len(rest)}")
+    yield from scenarios.iter_scenarios(resources)
+    yield from generator.iter_test_cases(jobs=jobs, operations=rest)
 
-    generator.save_test_cases(args.txt_out)
-    generator.save_test_cases_yaml(args.yaml_out)
 
-    print(f"Готово! Файлы '{args.txt_out}' и '{args.yaml_out}' созданы.")
+def _printed(cases, no_print: bool):
+    """
+    Пропускает кейсы дальше по конвейеру, по пути выводя их в консоль (если не --no-print).
+    """
+    for tc in cases:
+        if not no_print:
+            print(tc)
+        yield tc
 
 if __name__ == "__main__":
     main()
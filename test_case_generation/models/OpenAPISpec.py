@@ -1,8 +1,15 @@
 from test_case_generation.models.SchemaObject import SchemaObject
 from test_case_generation.models.Operation import Operation
-from typing import Dict, List, Any
+from test_case_generation.utils.SpecCache import SpecCache
+from test_case_generation.utils.PhaseProfiler import PhaseProfiler, phase
+from typing import Dict, List, Any, Optional
+from pathlib import Path
+import json
 import yaml
 
+# C-ускоренный загрузчик (libyaml), если PyYAML собран с ним
+YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
 
 class OpenAPISpec:
     """
@@ -10,11 +17,45 @@ class OpenAPISpec:
     - servers, components, paths
     - parsed_schemas (dict of SchemaObject)
     - parsed_operations (list of Operation)
+
+    Если передан cache_dir, разобранная модель кэшируется на диске
+    (ключ — хэш содержимого файла и версия инструмента). При попадании
+    в кэш YAML/JSON не парсится вовсе.
+
+    low_memory=True освобождает исходный документ (raw_spec, paths, components)
+    сразу после разбора: дальше работа идёт только с parsed_schemas/parsed_operations.
+
+    profiler (PhaseProfiler) замеряет фазы spec_load, schema_parse и operation_parse;
+    в объекте он не сохраняется.
     """
 
-    def __init__(self, spec_path: str):
+    # Поля, которые сохраняются в кэш
+    _CACHED_FIELDS = ('raw_spec', 'servers', 'components', 'paths', 'parsed_schemas', 'parsed_operations')
+
+    def __init__(
+            self,
+            spec_path: str,
+            cache_dir: Optional[str] = None,
+            low_memory: bool = False,
+            profiler: Optional[PhaseProfiler] = None
+    ):
         self.spec_path = spec_path
-        self.raw_spec = self.load_spec()
+        self.low_memory = low_memory
+
+        cache = SpecCache(cache_dir) if cache_dir else None
+        with phase(profiler, "spec_load"):
+            with open(self.spec_path, 'rb') as f:
+                content = f.read()
+            cache_key = SpecCache.make_key(content) if cache else None
+
+            if cache:
+                state = cache.load(cache_key)
+                if state is not None:
+                    self.__dict__.update(state)
+                    self._release_raw()
+                    return
+
+            self.raw_spec = self._parse_content(content)
         self.servers = self.raw_spec.get('servers', [])
         self.components = self.raw_spec.get('components', {})
         self.paths = self.raw_spec.get('paths', {})
@@ -22,12 +63,34 @@ class OpenAPISpec:
         self.parsed_schemas: Dict[str, SchemaObject] = {}
         self.parsed_operations: List[Operation] = []
 
-        self._parse_components_schemas()
-        self._parse_operations()
+        with phase(profiler, "schema_parse"):
+            self._parse_components_schemas()
+        with phase(profiler, "operation_parse"):
+            self._parse_operations()
+
+        if cache:
+            cache.save(cache_key, {name: getattr(self, name) for name in self._CACHED_FIELDS})
+        self._release_raw()
+
+    def _release_raw(self) -> None:
+        if self.low_memory:
+            self.raw_spec = None
+            self.paths = {}
+            self.components = {}
 
     def load_spec(self) -> Dict[str, Any]:
-        with open(self.spec_path, 'r', encoding='utf-8') as f:
-            return yaml.safe_load(f)
+        with open(self.spec_path, 'rb') as f:
+            return self._parse_content(f.read())
+
+    def _parse_content(self, content: bytes) -> Dict[str, Any]:
+        """
+        .json парсится стандартным json (он заметно быстрее),
+        всё остальное — YAML через C-загрузчик.
+        """
+        text = content.decode('utf-8')
+        if Path(self.spec_path).suffix.lower() == '.json':
+            return json.loads(text)
+        return yaml.load(text, Loader=YAML_LOADER)
 
     def get_base_url(self) -> str:
         if not self.servers:
@@ -86,6 +149,7 @@ class OpenAPISpec:
                     all_params = path_params + method_level_params
                     rb = method_obj.get('requestBody', {})
                     resp = method_obj.get('responses', {})
+                    tags = method_obj.get('tags', [])
 
                     op = Operation(
                         method=key,
@@ -95,7 +159,9 @@ class OpenAPISpec:
                         operation_id=operation_id,
                         parameters=all_params,
                         request_body=rb,
-                        responses=resp
+                        responses=resp,
+                        tags=tags,
+                        latency=method_obj.get('x-latency')
                     )
                     self.parsed_operations.append(op)
 
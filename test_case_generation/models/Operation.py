@@ -1,11 +1,19 @@
 from typing import Optional, Dict, List, Any
 
+from test_case_generation.utils.Strings import intern_str
+
 
 class Operation:
     """
     Описывает одну операцию OpenAPI (метод, путь, параметры, requestBody, responses).
+    latency — ожидания по времени ответа из расширения x-latency ({max_ms, p95_ms, repeat}).
     """
 
+    __slots__ = (
+        'method', 'path', 'summary', 'description', 'operation_id',
+        'parameters', 'request_body', 'responses', 'tags', 'latency'
+    )
+
     def __init__(
             self,
             method: str,
@@ -16,15 +24,19 @@ class Operation:
             parameters: Optional[List[Dict[str, Any]]] = None,
             request_body: Optional[Dict[str, Any]] = None,
             responses: Optional[Dict[str, Any]] = None,
+            tags: Optional[List[str]] = None,
+            latency: Optional[Dict[str, Any]] = None,
     ):
-        self.method = method.upper()
-        self.path = path
+        self.method = intern_str(method.upper())
+        self.path = intern_str(path)
         self.summary = summary
         self.description = description
-        self.operation_id = operation_id
+        self.operation_id = intern_str(operation_id)
         self.parameters = parameters if parameters else []
         self.request_body = request_body if request_body else {}
         self.responses = responses if responses else {}
+        self.tags = [intern_str(t) for t in tags] if tags else []
+        self.latency = latency if latency else None
 
     def __repr__(self) -> str:
         return (
@@ -1,11 +1,20 @@
 from typing import Optional, Dict, List, Any
 
+from test_case_generation.utils.Strings import intern_str
+
 
 class SchemaObject:
     """
     Описывает схему (из components/schemas).
+    Хранится в __slots__, имена/типы/форматы интернируются:
+    на больших спецификациях таких объектов сотни тысяч.
     """
 
+    __slots__ = (
+        'name', 'schema_type', 'schema_format', 'properties', 'required',
+        'description', 'enum_values', 'ref', 'example'
+    )
+
     def __init__(
             self,
             name: str,
@@ -18,14 +27,14 @@ class SchemaObject:
             ref: str = '',
             example: Any = None
     ):
-        self.name = name
-        self.schema_type = schema_type
-        self.schema_format = schema_format
+        self.name = intern_str(name)
+        self.schema_type = intern_str(schema_type)
+        self.schema_format = intern_str(schema_format)
         self.properties = properties if properties else {}
         self.required = required if required else []
         self.description = description
         self.enum_values = enum_values if enum_values else []
-        self.ref = ref
+        self.ref = intern_str(ref)
         self.example = example
 
     def __repr__(self) -> str:
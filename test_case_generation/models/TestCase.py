@@ -1,4 +1,8 @@
-from typing import Dict, List, Any
+import types
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Текстовое представление кейса: (предусловия, шаги, ожидаемый результат, постусловия)
+TextParts = Tuple[List[str], List[str], List[str], List[str]]
 
 
 class TestCase:
@@ -24,26 +28,37 @@ class TestCase:
       Описание: <description>
       Предусловия: [ {Endpoint, Headers, Cookies, Body}, ... ]
       Шаги: [ {Endpoint, Headers, Cookies, Body}, ... ]
-      Ожидаемый результат: {Статус, Body}
+      Ожидаемый результат: {Статус, Body, Время ответа (если задано)}
       Постусловия: [ {Endpoint, Headers, Cookies, Body}, ... ]
+
+    Текстовые поля можно не хранить: если передан text_renderer, то preconditions/steps/
+    expected/postconditions строятся им при каждом обращении (режим низкого потребления памяти).
     """
 
+    __slots__ = (
+        'name', '_preconditions', '_steps', '_expected', '_postconditions', 'text_renderer',
+        'endpoint', 'operation_summary', 'operation_description',
+        'preconditions_struct', 'steps_struct', 'postconditions_struct', 'expected_struct'
+    )
+
     def __init__(
             self,
             name: str,
-            preconditions: List[str],
-            steps: List[str],
-            expected: List[str],
-            postconditions: List[str],
+            preconditions: Optional[List[str]],
+            steps: Optional[List[str]],
+            expected: Optional[List[str]],
+            postconditions: Optional[List[str]],
             endpoint: str = '',
             operation_summary: str = '',
-            operation_description: str = ''
+            operation_description: str = '',
+            text_renderer: Optional[Callable[[], TextParts]] = None
     ):
         self.name = name
-        self.preconditions = preconditions
-        self.steps = steps
-        self.expected = expected
-        self.postconditions = postconditions
+        self._preconditions = preconditions
+        self._steps = steps
+        self._expected = expected
+        self._postconditions = postconditions
+        self.text_renderer = text_renderer
 
         self.endpoint = endpoint  # Например: "GET /todos"
         self.operation_summary = operation_summary  # Смысл/summary
@@ -57,11 +72,69 @@ class TestCase:
         # Ожидаемый результат (статус, body) в виде dict
         self.expected_struct: Dict[str, Any] = {}
 
+    # ======================================
+    # Текстовые поля (возможно, ленивые)
+    # ======================================
+
+    def text_parts(self) -> TextParts:
+        if self._steps is None and self.text_renderer is not None:
+            return self.text_renderer()
+        return self._preconditions or [], self._steps or [], self._expected or [], self._postconditions or []
+
+    @property
+    def preconditions(self) -> List[str]:
+        return self.text_parts()[0]
+
+    @preconditions.setter
+    def preconditions(self, value: List[str]) -> None:
+        self._preconditions = value
+
+    @property
+    def steps(self) -> List[str]:
+        return self.text_parts()[1]
+
+    @steps.setter
+    def steps(self, value: List[str]) -> None:
+        self._steps = value
+
+    @property
+    def expected(self) -> List[str]:
+        return self.text_parts()[2]
+
+    @expected.setter
+    def expected(self, value: List[str]) -> None:
+        self._expected = value
+
+    @property
+    def postconditions(self) -> List[str]:
+        return self.text_parts()[3]
+
+    @postconditions.setter
+    def postconditions(self, value: List[str]) -> None:
+        self._postconditions = value
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """
+        Рендерер-функция (замыкание на генератор) не сериализуется, поэтому при pickle такой ленивый текст
+        материализуется. Рендерер-объект (OperationTextRenderer) сериализуется сам — без текста.
+        """
+        state = {name: getattr(self, name) for name in self.__slots__}
+        if isinstance(state['text_renderer'], types.FunctionType):
+            (state['_preconditions'], state['_steps'],
+             state['_expected'], state['_postconditions']) = self.text_parts()
+            state['text_renderer'] = None
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        for name, value in state.items():
+            setattr(self, name, value)
+
     def __str__(self) -> str:
         """
         Исходное текстовое оформление тест-кейса
         (с разделителями, предусловиями, шагами, post-условиями, выводом curl и т.д.).
         """
+        preconditions, steps, expected, postconditions = self.text_parts()
         separator_line = "=" * 70
         lines = []
 
@@ -81,8 +154,8 @@ class TestCase:
 
         # Предусловия
         lines.append("ПРЕДУСЛОВИЯ:")
-        if self.preconditions:
-            for i, p in enumerate(self.preconditions, 1):
+        if preconditions:
+            for i, p in enumerate(preconditions, 1):
                 lines.append(f"  {i}. {p}")
         else:
             lines.append("  — (Нет предусловий)")
@@ -90,8 +163,8 @@ class TestCase:
 
         # Шаги
         lines.append("ШАГИ:")
-        if self.steps:
-            for i, s in enumerate(self.steps, 1):
+        if steps:
+            for i, s in enumerate(steps, 1):
                 lines.append(f"  {i}. {s}")
         else:
             lines.append("  — (Нет шагов)")
@@ -99,8 +172,8 @@ class TestCase:
 
         # Ожидаемый результат
         lines.append("ОЖИДАЕМЫЙ РЕЗУЛЬТАТ:")
-        if self.expected:
-            for i, e in enumerate(self.expected, 1):
+        if expected:
+            for i, e in enumerate(expected, 1):
                 lines.append(f"  {i}. {e}")
         else:
             lines.append("  — (Нет ожидаемого результата)")
@@ -108,8 +181,8 @@ class TestCase:
 
         # Постусловия
         lines.append("ПОСТУСЛОВИЯ:")
-        if self.postconditions:
-            for i, post in enumerate(self.postconditions, 1):
+        if postconditions:
+            for i, post in enumerate(postconditions, 1):
                 lines.append(f"  {i}. {post}")
         else:
             lines.append("  — (Нет постусловий)")
@@ -124,6 +197,12 @@ class TestCase:
         - Без вывода curl
         - С обобщёнными данными
         """
+        expected = {
+            "Статус": self.expected_struct.get("status", "xxx"),
+            "Body": self.expected_struct.get("body", {})
+        }
+        if self.expected_struct.get("latency"):
+            expected["Время ответа"] = self.expected_struct["latency"]
         return {
             "Тест-кейс": self.name,
             "Endpoint": self.endpoint,
@@ -131,9 +210,6 @@ class TestCase:
             "Описание": self.operation_description,
             "Предусловия": self.preconditions_struct,
             "Шаги": self.steps_struct,
-            "Ожидаемый результат": {
-                "Статус": self.expected_struct.get("status", "xxx"),
-                "Body": self.expected_struct.get("body", {})
-            },
+            "Ожидаемый результат": expected,
             "Постусловия": self.postconditions_struct
         }
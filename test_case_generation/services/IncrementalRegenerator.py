@@ -0,0 +1,215 @@
+import hashlib
+import json
+import os
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from test_case_generation.models.OpenAPISpec import OpenAPISpec
+from test_case_generation.models.Operation import Operation
+from test_case_generation.models.SchemaObject import SchemaObject
+from test_case_generation.models.TestCase import TestCase
+from test_case_generation.services.RefResolver import RefResolver
+from test_case_generation.services.TestCaseGenerator import TestCaseGenerator
+from test_case_generation.services.TestCaseWriter import Block, TestCaseWriter
+from test_case_generation.utils.Constants import TOOL_VERSION
+
+
+class IncrementalRegenerator:
+    """
+    Инкрементальная перегенерация тест-кейсов по изменениям спецификации.
+
+    Рядом с результатами хранится манифест с отпечатком каждой операции:
+    sha256 от самой операции, связанных POST/DELETE, включая родительские ресурсы
+    (они попадают в пред- и постусловия), и всех транзитивно используемых схем.
+    Перегенерируются только операции, у которых отпечаток изменился; кейсы остальных операций берутся из существующих
+    файлов результата (txt/yaml/jsonl) как есть, со всеми ручными правками.
+
+    Кейсы сопоставляются с операциями по полю Endpoint ("METHOD /path").
+    """
+
+    def __init__(self, spec: OpenAPISpec, generator: TestCaseGenerator, manifest_path: str):
+        self.spec = spec
+        self.generator = generator
+        self.manifest_path = manifest_path
+        self.old_manifest = self._load_manifest()
+        self.fingerprints: Dict[str, str] = {
+            self.operation_key(op): self.fingerprint(op) for op in spec.parsed_operations
+        }
+
+    @staticmethod
+    def operation_key(op: Operation) -> str:
+        return f"{op.method} {op.path}"
+
+    # ======================================
+    # Отпечатки операций
+    # ======================================
+
+    def fingerprint(self, op: Operation) -> str:
+        related = [op] + self.generator.get_related_ops(op)
+        payloads = [self._operation_payload(o) for o in related]
+        # Примеры строятся по разобранным схемам (SchemaObject), поэтому отпечаток считается
+        # по ним, а не по исходному документу — так он работает и в режиме low_memory
+        resolver = self.generator.ref_resolver
+        schema_names = resolver.reachable(self._iter_refs(payloads))
+
+        h = hashlib.sha256()
+        h.update(self._canonical({
+            "tool_version": TOOL_VERSION,
+            "base_url": self.spec.get_base_url(),
+            "max_ref_depth": self.generator.max_ref_depth,
+            "strength": self.generator.strength,
+            "latency": self.generator.latency,
+            "operations": payloads,
+            "schemas": {name: self._schema_payload(self.spec.parsed_schemas[name]) for name in sorted(schema_names)},
+        }))
+        return h.hexdigest()
+
+    @staticmethod
+    def _operation_payload(op: Operation) -> Dict[str, Any]:
+        return {
+            "method": op.method,
+            "path": op.path,
+            "summary": op.summary,
+            "description": op.description,
+            "operation_id": op.operation_id,
+            "parameters": op.parameters,
+            "request_body": op.request_body,
+            "responses": op.responses,
+            "latency": op.latency,
+        }
+
+    @classmethod
+    def _schema_payload(cls, sobj: SchemaObject) -> Dict[str, Any]:
+        return {
+            "type": sobj.schema_type,
+            "format": sobj.schema_format,
+            "ref": sobj.ref,
+            "required": sobj.required,
+            "enum": sobj.enum_values,
+            "example": sobj.example,
+            "description": sobj.description,
+            "properties": {name: cls._schema_payload(prop) for name, prop in sobj.properties.items()},
+        }
+
+    @staticmethod
+    def _iter_refs(obj: Any) -> Iterator[str]:
+        stack = [obj]
+        while stack:
+            current = stack.pop()
+            if isinstance(current, dict):
+                ref = current.get('$ref')
+                if isinstance(ref, str):
+                    yield RefResolver.ref_name(ref)
+                stack.extend(current.values())
+            elif isinstance(current, list):
+                stack.extend(current)
+
+    @staticmethod
+    def _canonical(obj: Any) -> bytes:
+        return json.dumps(obj, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8')
+
+    # ======================================
+    # План перегенерации
+    # ======================================
+
+    def changed_operations(self, writers: List[TestCaseWriter]) -> List[Operation]:
+        """
+        Операции, для которых нужно заново сгенерировать кейсы.
+        Без манифеста или без одного из файлов результата перегенерируется всё.
+        """
+        if self.old_manifest is None or not all(os.path.exists(w.filename) for w in writers):
+            return list(self.spec.parsed_operations)
+        old = self.old_manifest.get("operations", {})
+        return [
+            op for op in self.spec.parsed_operations
+            if old.get(self.operation_key(op)) != self.fingerprints[self.operation_key(op)]
+        ]
+
+    # ======================================
+    # Склейка результатов
+    # ======================================
+
+    def write(self, changed: List[Operation], cases: Iterable[TestCase], writers: List[TestCaseWriter]) -> None:
+        """
+        Записывает файлы каждого writer: для изменённых операций — новые кейсы из cases,
+        для остальных — блоки из существующих файлов.
+        """
+        changed_keys = {self.operation_key(op) for op in changed}
+
+        new_blocks: List[Dict[str, List[str]]] = [{} for _ in writers]
+        for tc in cases:
+            for writer, blocks in zip(writers, new_blocks):
+                blocks.setdefault(tc.endpoint, []).append(writer.render_case(tc))
+
+        for writer, blocks in zip(writers, new_blocks):
+            # Шапка (окружение, base_url) всегда свежая: сервер в спецификации мог смениться
+            self._write_file(writer.filename, writer.render_header(), changed_keys, blocks, self._read_blocks(writer))
+
+    def save_manifest(self, regenerated: Optional[List[Operation]] = None) -> None:
+        """
+        Сохраняет отпечатки. Если перегенерирована только часть операций (regenerated),
+        для остальных остаются прежние отпечатки — изменения в них подхватит следующий запуск.
+        """
+        if regenerated is None:
+            operations = dict(self.fingerprints)
+        else:
+            old = self.old_manifest.get("operations", {}) if self.old_manifest else {}
+            operations = {key: old[key] for key in self.fingerprints if key in old}
+            for op in regenerated:
+                key = self.operation_key(op)
+                operations[key] = self.fingerprints[key]
+        manifest = {
+            "tool_version": TOOL_VERSION,
+            "operations": operations,
+        }
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _write_file(
+            self,
+            filename: str,
+            header: str,
+            changed_keys: Set[str],
+            new_blocks: Dict[str, List[str]],
+            old_blocks: List[Block]
+    ) -> None:
+        old_by_key: Dict[Optional[str], List[str]] = {}
+        for key, block in old_blocks:
+            old_by_key.setdefault(key, []).append(block)
+
+        removed_keys = set(self.old_manifest.get("operations", {})) if self.old_manifest else set()
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write(header)
+            for op in self.spec.parsed_operations:
+                key = self.operation_key(op)
+                source = new_blocks if key in changed_keys else old_by_key
+                for block in source.get(key, []):
+                    f.write(block)
+            # Кейсы, добавленные вручную для эндпоинтов, которых нет в спецификации,
+            # сохраняем; кейсы удалённых из спецификации операций — отбрасываем
+            for key, block in old_blocks:
+                if key not in self.fingerprints and key not in removed_keys:
+                    f.write(block)
+
+    @staticmethod
+    def _read_blocks(writer: TestCaseWriter) -> List[Block]:
+        """
+        Блоки существующего файла (без шапки); если файла нет — ни одного блока.
+        """
+        if not os.path.exists(writer.filename):
+            return []
+        with open(writer.filename, 'r', encoding='utf-8') as f:
+            return writer.split_blocks(f.read())[1]
+
+    def _load_manifest(self) -> Optional[Dict[str, Any]]:
+        if not os.path.exists(self.manifest_path):
+            return None
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if manifest.get("tool_version") != TOOL_VERSION:
+            return None
+        return manifest
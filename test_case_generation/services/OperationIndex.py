@@ -0,0 +1,99 @@
+import bisect
+from typing import Dict, Iterable, List, Set
+
+from test_case_generation.models.Operation import Operation
+
+HTTP_METHODS = ("GET", "PUT", "POST", "DELETE", "PATCH", "OPTIONS", "HEAD")
+
+
+class OperationIndex:
+    """
+    Индекс операций спецификации для выборочной генерации.
+
+    Селекторы (можно перечислять через запятую):
+      id:<operationId>   — операция по operationId
+      tag:<тег>          — все операции с тегом
+      method:<метод>     — все операции с HTTP-методом
+      path:<префикс>     — все операции, путь которых начинается с префикса по целым сегментам
+                           (/users — это /users и /users/{id}, но не /users-admin)
+    Селектор без префикса понимается так: "/..." — префикс пути, имя HTTP-метода — метод,
+    иначе — operationId или тег.
+    """
+
+    def __init__(self, operations: List[Operation]):
+        self.operations = operations
+        self.by_id: Dict[str, List[int]] = {}
+        self.by_tag: Dict[str, List[int]] = {}
+        self.by_method: Dict[str, List[int]] = {}
+        for i, op in enumerate(operations):
+            if op.operation_id:
+                self.by_id.setdefault(op.operation_id, []).append(i)
+            for tag in op.tags:
+                self.by_tag.setdefault(tag, []).append(i)
+            self.by_method.setdefault(op.method, []).append(i)
+        # Отсортированные пути: поиск по префиксу — bisect + проход по совпадениям
+        self._sorted_paths = sorted((op.path, i) for i, op in enumerate(operations))
+        self._path_keys = [path for path, _ in self._sorted_paths]
+
+    def match(self, selector: str) -> Set[int]:
+        """
+        Индексы операций, подходящих под один селектор.
+        """
+        kind, sep, value = selector.partition(":")
+        if not sep:
+            kind, value = "", selector
+        kind = kind.strip().lower()
+        value = value.strip()
+
+        if kind == "id":
+            return set(self.by_id.get(value, []))
+        if kind == "tag":
+            return set(self.by_tag.get(value, []))
+        if kind == "method":
+            return set(self.by_method.get(value.upper(), []))
+        if kind == "path":
+            return self._match_path_prefix(value)
+        if kind:
+            raise ValueError(f"Неизвестный тип селектора '{kind}' в '{selector}'")
+
+        if value.startswith("/"):
+            return self._match_path_prefix(value)
+        if value.upper() in HTTP_METHODS:
+            return set(self.by_method.get(value.upper(), []))
+        return set(self.by_id.get(value, [])) | set(self.by_tag.get(value, []))
+
+    def _match_path_prefix(self, prefix: str) -> Set[int]:
+        prefix = prefix.rstrip("/")
+        result = set()
+        # Пути с общим строковым префиксом идут подряд; из них берутся совпадения по целым сегментам
+        start = bisect.bisect_left(self._path_keys, prefix)
+        for path, i in self._sorted_paths[start:]:
+            if not path.startswith(prefix):
+                break
+            if path == prefix or path[len(prefix)] == "/":
+                result.add(i)
+        return result
+
+    def select(self, only: Iterable[str] = (), exclude: Iterable[str] = ()) -> List[Operation]:
+        """
+        Операции (в порядке спецификации), подходящие хотя бы под один селектор only
+        (или все, если only пуст) и ни под один селектор exclude.
+        """
+        only = self._split(only)
+        exclude = self._split(exclude)
+        if only:
+            selected: Set[int] = set()
+            for selector in only:
+                selected |= self.match(selector)
+        else:
+            selected = set(range(len(self.operations)))
+        for selector in exclude:
+            selected -= self.match(selector)
+        return [self.operations[i] for i in sorted(selected)]
+
+    @staticmethod
+    def _split(selectors: Iterable[str]) -> List[str]:
+        result = []
+        for item in selectors:
+            result.extend(s for s in item.split(",") if s.strip())
+        return result
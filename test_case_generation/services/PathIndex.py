@@ -0,0 +1,174 @@
+import re
+from typing import Dict, List, Optional
+
+from test_case_generation.models.Operation import Operation
+
+
+class PathTemplate:
+    """
+    Скомпилированный шаблон пути: "/projects/{pid}/tasks" разбивается один раз
+    на литералы и имена параметров, подстановка — это только склейка частей.
+    """
+
+    _PARAM_RE = re.compile(r"\{([^}]+)\}")
+
+    def __init__(self, path: str):
+        self.path = path
+        # Чётные элементы — литералы, нечётные — имена параметров
+        self.parts: List[str] = self._PARAM_RE.split(path)
+        self.param_names: List[str] = self.parts[1::2]
+
+    def render(self, values: Dict[str, str]) -> str:
+        parts = list(self.parts)
+        for i in range(1, len(parts), 2):
+            parts[i] = values[parts[i]]
+        return "".join(parts)
+
+
+class _PathNode:
+    """
+    Узел префиксного дерева по сегментам пути. Все сегменты-параметры
+    ({id}, {todoId}, ...) сворачиваются в один дочерний узел param_child.
+    """
+
+    __slots__ = ('parent', 'is_param', 'children', 'param_child', 'operations')
+
+    def __init__(self, parent: Optional['_PathNode'] = None, is_param: bool = False):
+        self.parent = parent
+        self.is_param = is_param
+        self.children: Dict[str, '_PathNode'] = {}
+        self.param_child: Optional['_PathNode'] = None
+        self.operations: Dict[str, Operation] = {}
+
+
+class PathIndex:
+    """
+    Индекс операций спецификации по шаблонам путей (trie по сегментам),
+    строится один раз на спецификацию.
+
+    Для операции находится её "коллекция": для /todos/{id} это /todos,
+    для /todos — сам /todos. Создатель ресурса — POST коллекции, удаление — DELETE элемента.
+    Для вложенных ресурсов (/projects/{pid}/tasks/{tid}) дополнительно находятся
+    создатели и удаления родителей (POST /projects, DELETE /projects/{pid}).
+    Поиск идёт за O(глубины пути).
+    """
+
+    def __init__(self, operations: List[Operation]):
+        self.root = _PathNode()
+        self._templates: Dict[str, PathTemplate] = {}
+        for op in operations:
+            self._insert(op.path).operations[op.method] = op
+
+    @staticmethod
+    def _segments(path: str) -> List[str]:
+        return path.strip("/").split("/")
+
+    @staticmethod
+    def _is_param_segment(segment: str) -> bool:
+        return "{" in segment
+
+    def template(self, path: str) -> PathTemplate:
+        template = self._templates.get(path)
+        if template is None:
+            template = self._templates[path] = PathTemplate(path)
+        return template
+
+    # ======================================
+    # Построение и поиск
+    # ======================================
+
+    def _insert(self, path: str) -> _PathNode:
+        node = self.root
+        for segment in self._segments(path):
+            if self._is_param_segment(segment):
+                if node.param_child is None:
+                    node.param_child = _PathNode(node, is_param=True)
+                node = node.param_child
+            else:
+                child = node.children.get(segment)
+                if child is None:
+                    child = node.children[segment] = _PathNode(node)
+                node = child
+        return node
+
+    def _find(self, path: str) -> Optional[_PathNode]:
+        node = self.root
+        for segment in self._segments(path):
+            if self._is_param_segment(segment):
+                node = node.param_child
+            else:
+                node = node.children.get(segment)
+            if node is None:
+                return None
+        return node
+
+    def _collection(self, path: str) -> Optional[_PathNode]:
+        node = self._find(path)
+        if node is None:
+            return None
+        # /todos/{id} -> /todos; одиночный сегмент-параметр (/{number}) коллекцией не сворачивается
+        if node.is_param and len(self._segments(path)) > 1:
+            return node.parent
+        return node
+
+    @staticmethod
+    def _creator(collection: _PathNode) -> Optional[Operation]:
+        op = collection.operations.get("POST")
+        if op is None and collection.param_child is not None:
+            op = collection.param_child.operations.get("POST")
+        return op
+
+    @staticmethod
+    def _deleter(collection: _PathNode) -> Optional[Operation]:
+        op = None
+        if collection.param_child is not None:
+            op = collection.param_child.operations.get("DELETE")
+        if op is None:
+            op = collection.operations.get("DELETE")
+        return op
+
+    def _parent_collections(self, collection: _PathNode) -> List[_PathNode]:
+        """
+        Коллекции родительских ресурсов, от ближайшего к корню:
+        для /projects/{pid}/tasks это [/projects].
+        """
+        result = []
+        node = collection.parent
+        while node is not None and node is not self.root:
+            if node.is_param and node.parent is not self.root:
+                result.append(node.parent)
+                node = node.parent
+            node = node.parent
+        return result
+
+    # ======================================
+    # Связанные операции
+    # ======================================
+
+    def creator(self, path: str) -> Optional[Operation]:
+        collection = self._collection(path)
+        return self._creator(collection) if collection else None
+
+    def deleter(self, path: str) -> Optional[Operation]:
+        collection = self._collection(path)
+        return self._deleter(collection) if collection else None
+
+    def parent_creators(self, path: str) -> List[Operation]:
+        """
+        POST родительских ресурсов в порядке создания (сначала внешний).
+        """
+        collection = self._collection(path)
+        if collection is None:
+            return []
+        creators = [self._creator(c) for c in reversed(self._parent_collections(collection))]
+        return [op for op in creators if op is not None]
+
+    def parent_deleters(self, path: str) -> List[Operation]:
+        """
+        DELETE родительских ресурсов в порядке удаления (сначала ближайший).
+        """
+        collection = self._collection(path)
+        if collection is None:
+            return []
+        deleters = [self._deleter(c) for c in self._parent_collections(collection)]
+        return [op for op in deleters if op is not None]
@@ -0,0 +1,163 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from test_case_generation.models.SchemaObject import SchemaObject
+
+
+class RefResolver:
+    """
+    Разрешение $ref для генерации примеров:
+    - граф ссылок между схемами components/schemas строится один раз;
+    - схемы, входящие в циклы (деревья, связные списки), находятся заранее
+      (компоненты сильной связности), рекурсия по ним обрезается на глубине max_depth;
+    - сгенерированный пример мемоизируется для каждой схемы, поэтому общие DTO
+      строятся один раз на всю спецификацию, а не на каждый запрос/ответ/предусловие.
+
+    Сам пример строит переданная функция build (TestCaseGenerator._gen_from_schema_obj),
+    resolver отвечает только за обход ссылок, циклы и кэш.
+    """
+
+    UNKNOWN_REF_VALUE = "test_value (::UnknownRef)"
+    RECURSION_CUT_VALUE = "test_value (::Recursive)"
+
+    def __init__(
+            self,
+            schemas: Dict[str, SchemaObject],
+            build: Callable[[SchemaObject], Any],
+            max_depth: int = 1
+    ):
+        self.schemas = schemas
+        self.max_depth = max(0, max_depth)
+        self._build = build
+
+        # Граф: имя схемы -> имена схем, на которые она ссылается
+        self.graph: Dict[str, Set[str]] = {
+            name: self._collect_refs(sobj) for name, sobj in schemas.items()
+        }
+        # Имя циклической схемы -> номер её компоненты сильной связности
+        self.cycle_ids: Dict[str, int] = self._find_cycles()
+
+        self._memo: Dict[str, Any] = {}
+        # Сколько раз каждая схема сейчас находится в стеке разрешения
+        self._on_stack: Dict[str, int] = {}
+        # Сколько схем из каждой циклической компоненты сейчас в стеке
+        self._active_cycles: Dict[int, int] = {}
+
+    @staticmethod
+    def ref_name(ref: str) -> str:
+        return ref.split('/')[-1]
+
+    def resolve(self, ref: str) -> Any:
+        """
+        Возвращает пример для схемы, на которую указывает $ref.
+        """
+        name = self.ref_name(ref)
+        sobj = self.schemas.get(name)
+        if sobj is None:
+            return self.UNKNOWN_REF_VALUE
+
+        cycle_id = self.cycle_ids.get(name)
+        # Результат не зависит от контекста, если в стеке нет схем из той же компоненты
+        cacheable = cycle_id is None or not self._active_cycles.get(cycle_id)
+        if cacheable and name in self._memo:
+            return self._memo[name]
+
+        depth = self._on_stack.get(name, 0)
+        if depth > self.max_depth:
+            return self.RECURSION_CUT_VALUE
+
+        self._on_stack[name] = depth + 1
+        if cycle_id is not None:
+            self._active_cycles[cycle_id] = self._active_cycles.get(cycle_id, 0) + 1
+        try:
+            value = self._build(sobj)
+        finally:
+            self._on_stack[name] = depth
+            if cycle_id is not None:
+                self._active_cycles[cycle_id] -= 1
+
+        if cacheable:
+            self._memo[name] = value
+        return value
+
+    def reachable(self, names: Iterable[str]) -> Set[str]:
+        """
+        Все схемы, достижимые по ссылкам из names (включая сами names, если они известны).
+        """
+        result: Set[str] = set()
+        pending = [n for n in names if n in self.graph]
+        while pending:
+            name = pending.pop()
+            if name in result:
+                continue
+            result.add(name)
+            pending.extend(n for n in self.graph[name] if n not in result)
+        return result
+
+    def _collect_refs(self, sobj: SchemaObject) -> Set[str]:
+        refs: Set[str] = set()
+        pending = [sobj]
+        while pending:
+            current = pending.pop()
+            if current.ref:
+                ref_name = self.ref_name(current.ref)
+                if ref_name in self.schemas:
+                    refs.add(ref_name)
+            pending.extend(current.properties.values())
+        return refs
+
+    def _find_cycles(self) -> Dict[str, int]:
+        """
+        Итеративный алгоритм Тарьяна. Циклическими считаются компоненты
+        из нескольких схем и схемы, ссылающиеся сами на себя.
+        """
+        index: Dict[str, int] = {}
+        lowlink: Dict[str, int] = {}
+        on_stack: Set[str] = set()
+        stack: List[str] = []
+        cycle_ids: Dict[str, int] = {}
+        counter = 0
+        next_cycle_id = 0
+
+        for root in self.graph:
+            if root in index:
+                continue
+            work: List[tuple] = [(root, iter(sorted(self.graph[root])))]
+            index[root] = lowlink[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+
+            while work:
+                node, children = work[-1]
+                child: Optional[str] = next(children, None)
+                if child is not None:
+                    if child not in index:
+                        index[child] = lowlink[child] = counter
+                        counter += 1
+                        stack.append(child)
+                        on_stack.add(child)
+                        work.append((child, iter(sorted(self.graph[child]))))
+                    elif child in on_stack:
+                        lowlink[node] = min(lowlink[node], index[child])
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] != index[node]:
+                    continue
+
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                if len(component) > 1 or node in self.graph[node]:
+                    for member in component:
+                        cycle_ids[member] = next_cycle_id
+                    next_cycle_id += 1
+
+        return cycle_ids
@@ -0,0 +1,196 @@
+import copy
+import json
+import re
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from test_case_generation.models.Operation import Operation
+from test_case_generation.models.TestCase import TestCase
+from test_case_generation.services.TestCaseGenerator import TestCaseGenerator
+
+# Операции элемента ресурса в порядке сценария (GET выполняется до и после изменений)
+UPDATE_METHODS = ("PUT", "PATCH")
+# Последний плейсхолдер пути элемента: /todos/<id_todo> -> id_todo
+_LAST_PLACEHOLDER_RE = re.compile(r"<([^<>]+)>$")
+
+
+class ScenarioGenerator:
+    """
+    Сценарные тест-кейсы: операции одного ресурса объединяются в один поток
+    создание → чтение → изменение (PUT, PATCH) → чтение → удаление.
+
+    Вместо отдельного кейса на каждую операцию (каждый со своим созданием и удалением ресурса)
+    ресурс создаётся один раз: id из ответа POST сохраняется в плейсхолдер пути элемента
+    (ключ шага "Сохранить") и подставляется в следующие шаги. Простые поля ответа создания
+    и изменений, которые возвращает и чтение, сохраняются в плейсхолдеры <id_todo_title>,
+    и чтение сравнивает с ними своё тело: значения из примера спецификации (id: 12345) сервер не повторит.
+    У каждого шага свой ожидаемый результат (ключ шага "Ожидаемый результат"),
+    общий ожидаемый результат кейса — последнего шага.
+    Предусловия — только для родительских ресурсов. Постусловия — удаление самого ресурса и родителей:
+    если сценарий упал до своего DELETE, ресурс всё равно удаляется (успешно удалённый шагом
+    ресурс исполнитель повторно не удаляет).
+
+    Сценарий строится для пути элемента (/todos/{id}), у которого есть создатель (POST коллекции)
+    и хотя бы одна операция элемента. Остальные операции покрываются обычными кейсами.
+    """
+
+    def __init__(self, generator: TestCaseGenerator):
+        self.generator = generator
+        self.path_index = generator.path_index
+
+    def resources(self, operations: Optional[List[Operation]] = None) -> Dict[str, List[Operation]]:
+        """
+        Пути элементов ресурсов и их операции (в порядке спецификации).
+        operations — подмножество операций (по умолчанию все операции спецификации).
+        """
+        if operations is None:
+            operations = self.generator.spec.parsed_operations
+        resources: Dict[str, List[Operation]] = {}
+        for op in operations:
+            if op.method not in ("GET", "DELETE") + UPDATE_METHODS or not op.path.rstrip("/").endswith("}"):
+                continue
+            creator = self.path_index.creator(op.path)
+            if creator is None or creator.path == op.path:
+                continue
+            resources.setdefault(op.path, []).append(op)
+        return resources
+
+    def covered_operations(self, resources: Dict[str, List[Operation]]) -> Set[int]:
+        """
+        id() операций, которые покрываются сценариями: операции элементов и их создатели.
+        """
+        covered = set()
+        for path, ops in resources.items():
+            covered.update(id(op) for op in ops)
+            covered.add(id(self.path_index.creator(path)))
+        return covered
+
+    def iter_scenarios(self, resources: Dict[str, List[Operation]]) -> Iterator[TestCase]:
+        names: Set[str] = set()
+        for path, ops in resources.items():
+            name = self._make_scenario_name(path)
+            if name in names:
+                name = f"{name}_{len(names) + 1}"
+            names.add(name)
+            yield self.make_scenario(path, ops, name)
+
+    @staticmethod
+    def _make_scenario_name(path: str) -> str:
+        segments = [s for s in path.strip("/").split("/") if s and "{" not in s]
+        return "crud_" + "_".join(re.sub(r"[^0-9a-zA-Z_]", "_", s) for s in segments)
+
+    def make_scenario(self, item_path: str, ops: List[Operation], name: str) -> TestCase:
+        gen = self.generator
+        by_method = {op.method: op for op in ops}
+        creator = self.path_index.creator(item_path)
+
+        replaced_item_path = gen._replace_path_params(item_path, gen._extract_path_param_names(ops[0]))
+        match = _LAST_PLACEHOLDER_RE.search(replaced_item_path)
+        capture = match.group(1) if match else "id"
+
+        # Шаги: создание, чтение, изменения, повторное чтение, удаление
+        flow: List[Operation] = [creator]
+        if "GET" in by_method:
+            flow.append(by_method["GET"])
+        updates = [by_method[m] for m in UPDATE_METHODS if m in by_method]
+        flow += updates
+        if updates and "GET" in by_method:
+            flow.append(by_method["GET"])
+        if "DELETE" in by_method:
+            flow.append(by_method["DELETE"])
+
+        read_fields = set()
+        if "GET" in by_method:
+            read_fields.update(self._scalar_fields(self._response_example(by_method["GET"])))
+        # Сохранённые поля ответа: {поле: плейсхолдер}
+        captured: Dict[str, str] = {}
+        steps_struct: List[Dict[str, Any]] = []
+        steps_text: List[str] = []
+        for op in flow:
+            step = self._make_step(op)
+            if op.method == "GET":
+                step["Ожидаемый результат"]["Body"] = {
+                    field: f"<{placeholder}>" for field, placeholder in captured.items() if field in read_fields
+                }
+            elif op is creator or op.method in UPDATE_METHODS:
+                saves = {capture: "id"} if op is creator else {}
+                for field in self._scalar_fields(self._response_example(op)):
+                    if field != "id" and field in read_fields:
+                        saves[f"{capture}_{field}"] = field
+                if op is creator:
+                    captured["id"] = capture
+                captured.update({field: placeholder for placeholder, field in saves.items() if field != "id"})
+                if saves:
+                    step["Сохранить"] = saves
+            steps_struct.append(step)
+            steps_text.append(self._make_step_text(step, capture if op is creator else None))
+
+        preconditions_struct = [gen._build_precondition_struct(op) for op in self.path_index.parent_creators(item_path)]
+        # Удаление самого ресурса — и постусловием: оно выполняется, даже если сценарий упал раньше
+        postconditions_ops = [self.path_index.deleter(item_path)] + self.path_index.parent_deleters(item_path)
+        postconditions_struct = [gen._build_postcondition_struct(op) for op in postconditions_ops if op is not None]
+
+        last_expected = steps_struct[-1]["Ожидаемый результат"]
+        endpoints = ", ".join(f"{op.method} {op.path}" for op in [creator] + ops)
+        tc = TestCase(
+            name=name,
+            preconditions=[gen._build_precondition_text(op, "") for op in self.path_index.parent_creators(item_path)],
+            steps=steps_text,
+            expected=[f"Каждый шаг получает ожидаемый ответ, последний — {last_expected['Статус']}"],
+            postconditions=[gen._build_postcondition_text(op, "") for op in postconditions_ops if op is not None],
+            endpoint=f"CRUD {item_path}",
+            operation_summary=f"Сценарий CRUD: {endpoints}",
+            operation_description=""
+        )
+        tc.preconditions_struct = preconditions_struct
+        tc.steps_struct = steps_struct
+        tc.postconditions_struct = postconditions_struct
+        # Копия: общий объект с шагом YAML-дампер вывел бы якорем (&id001), а якоря разных кейсов в файле конфликтуют
+        tc.expected_struct = {"status": last_expected["Статус"], "body": copy.deepcopy(last_expected["Body"])}
+        return tc
+
+    def _response_example(self, op: Operation) -> Any:
+        return self.generator._build_response_body(op)[0]
+
+    def _make_step(self, op: Operation) -> Dict[str, Any]:
+        gen = self.generator
+        param_names = gen._extract_path_param_names(op)
+        body = gen._build_request_body(op)
+        _, code = gen._build_response_body(op)
+        # Тело ответа с примером из спецификации не сравнивается: ожидания чтения собираются из сохранённых полей
+        expected = {"Статус": code, "Body": {}}
+        latency = gen.latency_expectation(op)
+        if latency:
+            # Шаг сценария не повторяется: время проверяется по одному замеру
+            expected["Время ответа"] = {k: v for k, v in latency.items() if k != "Повторы"}
+        return {
+            "Endpoint": f"{op.method} {gen._replace_path_params(op.path, param_names)}",
+            "Headers": {},
+            "Cookies": {},
+            "Body": body if body is not None else {},
+            "Ожидаемый результат": expected,
+        }
+
+    @staticmethod
+    def _scalar_fields(example: Any) -> List[str]:
+        """
+        Поля верхнего уровня с простыми значениями (не объект и не список) из примера тела ответа.
+        """
+        if not isinstance(example, dict):
+            return []
+        return [field for field, value in example.items() if not isinstance(value, (dict, list))]
+
+    @staticmethod
+    def _make_step_text(step: Dict[str, Any], capture: Optional[str]) -> str:
+        text = f"Отправить запрос {step['Endpoint']}"
+        if step["Body"]:
+            text += f" с телом:\n{json.dumps(step['Body'], ensure_ascii=False, indent=2)}"
+        text += f"\nОжидается ответ {step['Ожидаемый результат']['Статус']}"
+        if step["Ожидаемый результат"]["Body"]:
+            fields = ", ".join(f"{field} = {name}" for field, name in step["Ожидаемый результат"]["Body"].items())
+            text += f" с сохранёнными значениями: {fields}"
+        if capture:
+            text += f"\nСохранить id созданного ресурса в <{capture}>"
+        saved = [f"{field} в <{name}>" for name, field in (step.get("Сохранить") or {}).items() if field != "id"]
+        if saved:
+            text += f"\nСохранить поля ответа: {', '.join(saved)}"
+        return text
@@ -1,14 +1,18 @@
 import json
-import re
-from typing import Dict, Any, List, Optional
-
-import yaml
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Iterator, List, Optional
 
 from test_case_generation.models.OpenAPISpec import OpenAPISpec
-from test_case_generation.models.TestCase import TestCase
+from test_case_generation.models.TestCase import TestCase, TextParts
 from test_case_generation.models.Operation import Operation
 from test_case_generation.models.SchemaObject import SchemaObject
+from test_case_generation.services.RefResolver import RefResolver
+from test_case_generation.services.CombinatorialEngine import CombinatorialEngine
+from test_case_generation.services.PathIndex import PathIndex
+from test_case_generation.services.TestCaseWriter import TextTestCaseWriter, YamlTestCaseWriter
 from test_case_generation.utils.UniversalJSONEncoder import UniversalJSONEncoder
+from test_case_generation.utils.PhaseProfiler import PhaseProfiler, phase
+from test_case_generation.utils import Constants
 
 class TestCaseGenerator:
     """
@@ -20,41 +24,153 @@ class TestCaseGenerator:
     - генерация curl (осталась для текстового вывода), но без неё в YAML.
     """
 
-    def __init__(self, spec: OpenAPISpec):
+    def __init__(
+            self,
+            spec: OpenAPISpec,
+            max_ref_depth: int = 1,
+            strength: Optional[int] = None,
+            low_memory: bool = False,
+            profiler: Optional[PhaseProfiler] = None,
+            latency: Optional[Dict[str, Any]] = None
+    ):
         self.spec = spec
         self.base_url = spec.get_base_url()
         self.test_cases: List[TestCase] = []
 
-        # Соберём информацию о потенциально "связанных" операциях
-        self.resource_map: Dict[str, Dict[str, Operation]] = {}
-        self._build_resource_map()
+        # Разрешение $ref строится лениво, при первой генерации примера
+        self.max_ref_depth = max_ref_depth
+        self._ref_resolver: Optional[RefResolver] = None
 
-    def _build_resource_map(self):
-        for op in self.spec.parsed_operations:
-            segments = op.path.strip("/").split("/")
-            if len(segments) > 1 and "{" in segments[-1]:
-                base_path = "/" + "/".join(segments[:-1])
-            else:
-                base_path = op.path
+        # Комбинаторное покрытие параметров: None — один кейс на операцию,
+        # 2 — все пары значений, 3+ — n-wise
+        self.strength = strength
+        self.combinatorial = CombinatorialEngine(strength) if strength else None
+
+        # Режим низкого потребления памяти: текстовое представление кейсов
+        # не хранится, а рендерится при обращении (str(tc), tc.steps и т.д.)
+        self.low_memory = low_memory
+
+        # Ожидания по времени ответа по умолчанию ({max_ms, p95_ms, repeat}); x-latency операции
+        # переопределяет их по ключам. Без них "Время ответа" в кейсы не пишется
+        self.latency = {k: v for k, v in (latency or {}).items() if v is not None} or None
+
+        # Индекс путей для поиска "связанных" операций (создание/удаление ресурса и его родителей)
+        self.path_index = PathIndex(self.spec.parsed_operations)
+        # Готовые пути с плейсхолдерами: (path, имена path-параметров) -> путь
+        self._replaced_paths: Dict[tuple, str] = {}
+
+        # Замер генерации каждой операции (фаза operation_generate, без отслеживания памяти);
+        # в процессах пула не используется
+        self.profiler = profiler
 
-            if base_path not in self.resource_map:
-                self.resource_map[base_path] = {}
-            self.resource_map[base_path][op.method] = op
+    def generate_test_cases(self, jobs: int = 1, operations: Optional[List[Operation]] = None):
+        """
+        Генерирует по тест-кейсу на операцию.
+        operations — подмножество spec.parsed_operations (по умолчанию все);
+        суффикс _N всегда берётся из позиции операции в спецификации.
+        При jobs > 1 и достаточно большой спецификации операции распределяются
+        по пулу процессов; имена (_N) и порядок кейсов совпадают с последовательным режимом.
+        """
+        self.test_cases.extend(self.iter_test_cases(jobs=jobs, operations=operations))
+
+    def iter_test_cases(self, jobs: int = 1, operations: Optional[List[Operation]] = None) -> Iterator[TestCase]:
+        """
+        То же, что generate_test_cases, но кейсы отдаются по одному и не копятся в self.test_cases —
+        для потоковой записи больших наборов.
+        """
+        indexes = self._operation_indexes(operations)
+        if jobs > 1 and len(indexes) >= Constants.PARALLEL_MIN_OPERATIONS:
+            yield from self._generate_parallel(jobs, indexes)
+            return
 
-    def generate_test_cases(self):
-        count = 1
-        for op in self.spec.parsed_operations:
-            name = f"{op.operation_id or op.summary or op.method}_{count}"
-            test = self._make_test_case(op, name)
-            self.test_cases.append(test)
-            count += 1
+        for index in indexes:
+            with phase(self.profiler, "operation_generate", memory=False):
+                cases = self._make_operation_test_cases(index)
+            yield from cases
 
-    def _make_test_case(self, op: Operation, tc_name: str) -> TestCase:
+    def _make_operation_test_cases(self, index: int) -> List[TestCase]:
+        """
+        Тест-кейсы одной операции: один кейс, либо (в комбинаторном режиме)
+        по кейсу на строку покрывающего массива значений параметров — с суффиксом _N_M.
+        """
+        op = self.spec.parsed_operations[index]
+        name = self._make_test_case_name(op, index + 1)
+        combinations = self._parameter_combinations(op)
+        if len(combinations) <= 1:
+            return [self._make_test_case(op, name, index=index)]
+        return [
+            self._make_test_case(op, f"{name}_{row}", param_values, index=index)
+            for row, param_values in enumerate(combinations, 1)
+        ]
+
+    def _parameter_combinations(self, op: Operation) -> List[Dict[tuple, Optional[str]]]:
+        """
+        Строки покрывающего массива: {(in, name): значение или None (не передавать)}.
+        """
+        if not self.combinatorial:
+            return []
+        params = [p for p in op.parameters if p.get('in') in ('query', 'header', 'cookie')]
+        domains = [self.combinatorial.parameter_values(p, self._get_param_example(p)) for p in params]
+        keys = [(p.get('in'), p.get('name')) for p in params]
+        return [dict(zip(keys, row)) for row in self.combinatorial.combinations(domains)]
+
+    def _operation_indexes(self, operations: Optional[List[Operation]]) -> List[int]:
+        all_operations = self.spec.parsed_operations
+        if operations is None:
+            return list(range(len(all_operations)))
+        selected = {id(op) for op in operations}
+        return [i for i, op in enumerate(all_operations) if id(op) in selected]
+
+    def _generate_parallel(self, jobs: int, indexes: List[int]) -> Iterator[TestCase]:
+        # Несколько порций на процесс, чтобы выровнять нагрузку между ними
+        chunksize = max(1, len(indexes) // (jobs * 4))
+        with ProcessPoolExecutor(
+                max_workers=jobs,
+                initializer=_init_worker,
+                initargs=(self.spec, self._worker_options())
+        ) as pool:
+            # map сохраняет порядок операций независимо от того, какой процесс закончил первым
+            for cases in pool.map(_generate_one, indexes, chunksize=chunksize):
+                for tc in cases:
+                    # Ленивый текст (low_memory) пришёл без генератора: строится заново здесь
+                    if isinstance(tc.text_renderer, OperationTextRenderer):
+                        tc.text_renderer.generator = self
+                yield from cases
+
+    def _worker_options(self) -> Dict[str, Any]:
+        """
+        Параметры конструктора, с которыми в процессах пула создаётся такой же генератор.
+        """
+        return {
+            "max_ref_depth": self.max_ref_depth,
+            "strength": self.strength,
+            "low_memory": self.low_memory,
+            "latency": self.latency,
+        }
+
+    @staticmethod
+    def _make_test_case_name(op: Operation, count: int) -> str:
+        return f"{op.operation_id or op.summary or op.method}_{count}"
+
+    def _make_test_case(
+            self,
+            op: Operation,
+            tc_name: str,
+            param_values: Optional[Dict[tuple, Optional[str]]] = None,
+            with_text: Optional[bool] = None,
+            index: Optional[int] = None
+    ) -> TestCase:
         """
         Формирует объект TestCase, включая:
          - текстовые поля для старого формата (preconditions, steps, expected и т.п.)
          - структурированные поля для YAML (preconditions_struct, steps_struct, postconditions_struct)
+        param_values — значения query/header/cookie параметров из комбинаторного режима
+        ({(in, name): значение}, None — параметр не передаётся).
+        with_text=False — текстовые поля не строятся сразу, а рендерятся по запросу
+        (по умолчанию так делается в режиме low_memory); index — номер операции в спецификации для рендерера.
         """
+        if with_text is None:
+            with_text = not self.low_memory
         preconditions: List[str] = []
         steps: List[str] = []
         expected: List[str] = []
@@ -86,71 +202,79 @@ class TestCaseGenerator:
         for p in op.parameters:
             p_in = p.get('in')
             p_name = p.get('name')
+            if p_in not in ('header', 'query', 'cookie'):
+                continue
+            if param_values is not None and (p_in, p_name) in param_values:
+                value = param_values[(p_in, p_name)]
+                if value is None:
+                    continue
+            else:
+                value = self._get_param_example(p)
             if p_in == 'header':
-                headers_main[p_name] = self._get_param_example(p)
+                headers_main[p_name] = value
             elif p_in == 'query':
-                query_params_main[p_name] = self._get_param_example(p)
+                query_params_main[p_name] = value
             elif p_in == 'cookie':
-                cookies_main[p_name] = self._get_param_example(p)
+                cookies_main[p_name] = value
 
         query_str = self._build_query_string(query_params_main)
         full_path = replaced_path + query_str
 
-        # request body (для шага)
-        req_body_str = self._build_request_body_str(op)
-        # resp body + код (для expected)
-        resp_body_str, code = self._build_response_body_str(op)
+        # request body (для шага) и resp body + код (для expected); в JSON-текст — только для текстового вывода
+        req_body = self._build_request_body(op)
+        resp_body, code, resp_indent = self._response_example(op)
 
         # ------------------------------------------------
-        # Предусловия (если это GET/PUT/DELETE/PATCH, часто нужно POST для создания ресурса)
-        # Текстом
-        if op.method in ("GET", "PUT", "DELETE", "PATCH"):
-            post_op = self._get_related_post_op(op)
-            if post_op:
+        # Предусловия: создание родительских ресурсов (для вложенных путей),
+        # а для GET/PUT/DELETE/PATCH ещё и самого ресурса (POST)
+        for post_op in self._get_precondition_ops(op):
+            # Текстом
+            if with_text:
                 precond_text = self._build_precondition_text(post_op, replaced_path)
                 if precond_text:
                     preconditions.append(precond_text)
 
-                # Для YAML-структуры
-                precond_struct = self._build_precondition_struct(post_op)
-                if precond_struct:
-                    preconditions_struct.append(precond_struct)
+            # Для YAML-структуры
+            precond_struct = self._build_precondition_struct(post_op)
+            if precond_struct:
+                preconditions_struct.append(precond_struct)
 
         # ------------------------------------------------
-        # Постусловия (если операция != DELETE -> удалить ресурс)
-        if op.method != "DELETE":
-            delete_op = self._get_related_delete_op(op)
-            if delete_op:
+        # Постусловия: удаление ресурса (если операция != DELETE) и его родителей
+        for delete_op in self._get_postcondition_ops(op):
+            if with_text:
                 postcond_text = self._build_postcondition_text(delete_op, replaced_path)
                 if postcond_text:
                     postconditions.append(postcond_text)
 
-                postcond_struct = self._build_postcondition_struct(delete_op)
-                if postcond_struct:
-                    postconditions_struct.append(postcond_struct)
+            postcond_struct = self._build_postcondition_struct(delete_op)
+            if postcond_struct:
+                postconditions_struct.append(postcond_struct)
 
         # ------------------------------------------------
         # Основной шаг (текст)
-        step_text = ""
-        if req_body_str.strip():
-            step_text = (
-                f"Отправить запрос {op.method} {full_path} с телом:\n"
-                f"{req_body_str}\n"
-            )
-        else:
-            step_text = f"Отправить запрос {op.method} {full_path} (без тела)\n"
+        if with_text:
+            req_body_str = self._body_text(req_body, indent=2)
+            step_text = ""
+            if req_body_str.strip():
+                step_text = (
+                    f"Отправить запрос {op.method} {full_path} с телом:\n"
+                    f"{req_body_str}\n"
+                )
+            else:
+                step_text = f"Отправить запрос {op.method} {full_path} (без тела)\n"
 
-        # headers, cookies
-        if cookies_main:
-            c_list = [f"{k}={v}" for k, v in cookies_main.items()]
-            step_text += f"Установить cookie: {'; '.join(c_list)}\n"
-        if headers_main:
-            step_text += f"Хедеры: {json.dumps(headers_main, ensure_ascii=False)}\n"
+            # headers, cookies
+            if cookies_main:
+                c_list = [f"{k}={v}" for k, v in cookies_main.items()]
+                step_text += f"Установить cookie: {'; '.join(c_list)}\n"
+            if headers_main:
+                step_text += f"Хедеры: {json.dumps(headers_main, ensure_ascii=False)}\n"
 
-        # добавляем curl в текстовый вывод
-        curl_cmd = self._build_curl(op.method, full_path, headers_main, cookies_main, req_body_str)
-        step_text += f"curl: {curl_cmd}"
-        steps.append(step_text)
+            # добавляем curl в текстовый вывод
+            curl_cmd = self._build_curl(op.method, full_path, headers_main, cookies_main, req_body_str)
+            step_text += f"curl: {curl_cmd}"
+            steps.append(step_text)
 
         # ------------------------------------------------
         # Основной шаг (структура YAML)
@@ -158,34 +282,56 @@ class TestCaseGenerator:
             "Endpoint": f"{op.method} {replaced_path}{query_str}",
             "Headers": headers_main,
             "Cookies": cookies_main,
-            "Body": self._try_json_load(req_body_str) if req_body_str.strip() else {}
+            "Body": req_body if req_body is not None else {}
         }
         steps_struct.append(main_step_struct)
 
         # ------------------------------------------------
         # Ожидаемый результат (текст)
-        if resp_body_str.strip():
-            ex = f"Получен ответ {code} с телом:\n{resp_body_str}"
-        else:
-            ex = f"Получен ответ {code} (тело отсутствует)"
-        expected.append(ex)
+        latency = self.latency_expectation(op)
+        if with_text:
+            resp_body_str = self._body_text(resp_body, resp_indent)
+            if resp_body_str.strip():
+                ex = f"Получен ответ {code} с телом:\n{resp_body_str}"
+            else:
+                ex = f"Получен ответ {code} (тело отсутствует)"
+            expected.append(ex)
+            if latency:
+                expected.append(self._latency_text(latency))
 
         # Ожидаемый результат (структура)
-        resp_body_dict = self._try_json_load(resp_body_str) if resp_body_str.strip() else {}
         expected_struct["status"] = code
-        expected_struct["body"] = resp_body_dict
+        expected_struct["body"] = resp_body if resp_body is not None else {}
+        if latency:
+            expected_struct["latency"] = latency
 
         # Собираем объект TestCase
-        tc = TestCase(
-            name=tc_name,
-            preconditions=preconditions,
-            steps=steps,
-            expected=expected,
-            postconditions=postconditions,
-            endpoint=endpoint_str,
-            operation_summary=summary_str,
-            operation_description=desc_str
-        )
+        if with_text:
+            tc = TestCase(
+                name=tc_name,
+                preconditions=preconditions,
+                steps=steps,
+                expected=expected,
+                postconditions=postconditions,
+                endpoint=endpoint_str,
+                operation_summary=summary_str,
+                operation_description=desc_str
+            )
+        else:
+            # Текст не храним: он заново строится из операции, когда его запросят
+            tc = TestCase(
+                name=tc_name,
+                preconditions=None,
+                steps=None,
+                expected=None,
+                postconditions=None,
+                endpoint=endpoint_str,
+                operation_summary=summary_str,
+                operation_description=desc_str,
+                text_renderer=OperationTextRenderer(
+                    self, self.spec.parsed_operations.index(op) if index is None else index, tc_name, param_values
+                )
+            )
         # Дополняем его структурные поля (для YAML)
         tc.preconditions_struct = preconditions_struct
         tc.steps_struct = steps_struct
@@ -194,6 +340,32 @@ class TestCaseGenerator:
 
         return tc
 
+    def latency_expectation(self, op: Operation) -> Optional[Dict[str, Any]]:
+        """
+        "Время ответа" кейса операции: умолчания генератора, переопределённые x-latency операции.
+        {Максимум: мс, p95: мс, Повторы: N} или None, если ни максимум, ни p95 не заданы.
+        """
+        merged = dict(self.latency or {})
+        merged.update({k: v for k, v in (op.latency or {}).items() if v is not None})
+        if merged.get("max_ms") is None and merged.get("p95_ms") is None:
+            return None
+        latency: Dict[str, Any] = {}
+        if merged.get("max_ms") is not None:
+            latency["Максимум"] = merged["max_ms"]
+        if merged.get("p95_ms") is not None:
+            latency["p95"] = merged["p95_ms"]
+        latency["Повторы"] = int(merged.get("repeat") or 1)
+        return latency
+
+    @staticmethod
+    def _latency_text(latency: Dict[str, Any]) -> str:
+        limits = []
+        if "Максимум" in latency:
+            limits.append(f"не больше {latency['Максимум']} мс")
+        if "p95" in latency:
+            limits.append(f"p95 не больше {latency['p95']} мс")
+        return f"Время ответа: {', '.join(limits)} (замеров: {latency['Повторы']})"
+
     # ======================================
     # ВСПОМОГАТЕЛЬНЫЕ МЕТОДЫ ДЛЯ ОФОРМЛЕНИЯ
     # ======================================
@@ -218,13 +390,12 @@ class TestCaseGenerator:
         param_names = self._extract_path_param_names(post_op)
         replaced_path = self._replace_path_params(post_op.path, param_names)
 
-        body_json_str = self._build_request_body_str(post_op)
-        body_dict = self._try_json_load(body_json_str) if body_json_str.strip() else {}
+        body = self._build_request_body(post_op)
         return {
             "Endpoint": f"{post_op.method} {replaced_path}",
             "Headers": {},
             "Cookies": {},
-            "Body": body_dict
+            "Body": body if body is not None else {}
         }
 
     def _build_postcondition_text(self, delete_op: Operation, replaced_main_path: str) -> str:
@@ -249,25 +420,36 @@ class TestCaseGenerator:
     # Поиск "родственных" операций
     # ======================================
     def _get_related_post_op(self, op: Operation) -> Optional[Operation]:
-        base_path = self._get_base_path(op.path)
-        method_map = self.resource_map.get(base_path, {})
-        return method_map.get("POST")
+        return self.path_index.creator(op.path)
 
     def _get_related_delete_op(self, op: Operation) -> Optional[Operation]:
-        base_path = self._get_base_path(op.path)
-        method_map = self.resource_map.get(base_path, {})
-        return method_map.get("DELETE")
+        return self.path_index.deleter(op.path)
+
+    def _get_precondition_ops(self, op: Operation) -> List[Operation]:
+        ops = self.path_index.parent_creators(op.path)
+        if op.method in ("GET", "PUT", "DELETE", "PATCH"):
+            post_op = self._get_related_post_op(op)
+            if post_op:
+                ops.append(post_op)
+        return ops
+
+    def _get_postcondition_ops(self, op: Operation) -> List[Operation]:
+        ops = []
+        if op.method != "DELETE":
+            delete_op = self._get_related_delete_op(op)
+            if delete_op:
+                ops.append(delete_op)
+        return ops + self.path_index.parent_deleters(op.path)
+
+    def get_related_ops(self, op: Operation) -> List[Operation]:
+        """
+        Все операции, которые попадают в пред- и постусловия кейсов операции op.
+        """
+        return self._get_precondition_ops(op) + self._get_postcondition_ops(op)
 
     # ======================================
     # Прочие вспомогательные методы
     # ======================================
-    def _get_base_path(self, full_path: str) -> str:
-        segments = full_path.strip("/").split("/")
-        if len(segments) > 1 and "{" in segments[-1]:
-            return "/" + "/".join(segments[:-1])
-        else:
-            return full_path
-
     def _extract_path_param_names(self, op: Operation) -> List[str]:
         result = []
         for p in op.parameters:
@@ -276,14 +458,15 @@ class TestCaseGenerator:
         return result
 
     def _replace_path_params(self, path: str, path_param_names: List[str]) -> str:
-        new_path = path
-        matches = re.findall(r"\{([^}]+)\}", path)
-        for m in matches:
-            if m in path_param_names:
-                placeholder = self._make_path_placeholder(m)
-                new_path = new_path.replace(f"{{{m}}}", placeholder)
-            else:
-                new_path = new_path.replace(f"{{{m}}}", f"<{m}>")
+        key = (path, tuple(path_param_names))
+        new_path = self._replaced_paths.get(key)
+        if new_path is None:
+            template = self.path_index.template(path)
+            values = {
+                m: self._make_path_placeholder(m) if m in path_param_names else f"<{m}>"
+                for m in template.param_names
+            }
+            new_path = self._replaced_paths[key] = template.render(values)
         return new_path
 
     def _make_path_placeholder(self, param_name: str) -> str:
@@ -343,40 +526,44 @@ class TestCaseGenerator:
             return "3.14"
         return "test_value (::Unknown)"
 
-    def _build_request_body_str(self, op: Operation) -> str:
-        rb = op.request_body
-        if not rb:
-            return ""
-        c = rb.get('content', {})
-        if 'application/json' not in c:
-            return ""
-        media_info = c['application/json']
+    def _build_request_body(self, op: Operation) -> Any:
+        """
+        Пример тела запроса (JSON-совместимая копия, см. _json_ready) или None, если тела нет.
+        В текст (шаг, curl) сериализуется только при текстовом выводе — _build_request_body_str.
+        """
+        return self._media_example((op.request_body or {}).get('content', {}))[0]
 
-        if 'examples' in media_info:
-            examples_dict = media_info['examples']
-            if isinstance(examples_dict, dict):
-                first_ex = next(iter(examples_dict.values()), None)
-                if first_ex and isinstance(first_ex, dict):
-                    ex_val = first_ex.get('value')
-                    if ex_val is not None:
-                        return json.dumps(ex_val, ensure_ascii=False, indent=2, cls=UniversalJSONEncoder)
+    def _build_request_body_str(self, op: Operation) -> str:
+        return self._body_text(self._build_request_body(op), indent=2)
 
-        schema_def = media_info.get('schema')
-        if not schema_def:
-            return ""
-        obj = self._gen_example(schema_def)
-        return json.dumps(obj, ensure_ascii=False, indent=2, cls=UniversalJSONEncoder)
+    def _build_response_body(self, op: Operation) -> (Any, str):
+        """
+        (пример тела успешного ответа или None, его код; "xxx" — в спецификации нет 2xx-ответа).
+        """
+        body, code, _ = self._response_example(op)
+        return body, code
 
     def _build_response_body_str(self, op: Operation) -> (str, str):
+        body, code, indent = self._response_example(op)
+        return self._body_text(body, indent), code
+
+    def _response_example(self, op: Operation) -> (Any, str, Optional[int]):
         codes = [c for c in op.responses if c.startswith('2')]
         if not codes:
-            return ("", "xxx")
+            return None, "xxx", None
         code = sorted(codes)[0]
-        resp_info = op.responses[code]
-        c = resp_info.get('content', {})
-        if 'application/json' not in c:
-            return ("", code)
-        media_info = c['application/json']
+        body, from_examples = self._media_example(op.responses[code].get('content', {}))
+        # Явные примеры в тексте — с отступами, сгенерированные по схеме — в одну строку
+        return body, code, 2 if from_examples else None
+
+    def _media_example(self, content: Dict[str, Any]) -> (Any, bool):
+        """
+        Пример тела application/json: первый из examples, иначе сгенерированный по схеме.
+        (пример или None, взят ли он из examples).
+        """
+        media_info = content.get('application/json')
+        if not media_info:
+            return None, False
 
         if 'examples' in media_info:
             examples_dict = media_info['examples']
@@ -385,13 +572,49 @@ class TestCaseGenerator:
                 if first_ex and isinstance(first_ex, dict):
                     ex_val = first_ex.get('value')
                     if ex_val is not None:
-                        return (json.dumps(ex_val, ensure_ascii=False, indent=2, cls=UniversalJSONEncoder), code)
+                        return self._json_ready(ex_val), True
 
         schema_def = media_info.get('schema')
         if not schema_def:
-            return ("", code)
-        obj = self._gen_example(schema_def)
-        return (json.dumps(obj, ensure_ascii=False, cls=UniversalJSONEncoder), code)
+            return None, False
+        return self._json_ready(self._gen_example(schema_def)), False
+
+    @classmethod
+    def _json_ready(cls, value: Any) -> Any:
+        """
+        Новая копия значения в том виде, в каком её вернул бы json.loads(json.dumps(value, cls=UniversalJSONEncoder)):
+        даты — строками ISO, кортежи — списками, ключи — строками. Копия не разделяет объекты
+        с кэшем примеров (RefResolver), так что кейсы можно дополнять, не портя другие.
+        """
+        if isinstance(value, dict):
+            return {cls._json_key(k): cls._json_ready(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [cls._json_ready(v) for v in value]
+        if value is None or isinstance(value, (str, int, float)):
+            return value
+        return cls._json_ready(UniversalJSONEncoder().default(value))
+
+    @staticmethod
+    def _json_key(key: Any) -> str:
+        if isinstance(key, str):
+            return key
+        if key is None or isinstance(key, bool):
+            return json.dumps(key)
+        return repr(key) if isinstance(key, float) else str(key)
+
+    @staticmethod
+    def _body_text(body: Any, indent: Optional[int] = None) -> str:
+        return "" if body is None else json.dumps(body, ensure_ascii=False, indent=indent)
+
+    @property
+    def ref_resolver(self) -> RefResolver:
+        if self._ref_resolver is None:
+            self._ref_resolver = RefResolver(
+                self.spec.parsed_schemas,
+                build=self._gen_from_schema_obj,
+                max_depth=self.max_ref_depth
+            )
+        return self._ref_resolver
 
     def _gen_example(self, schema_def: Dict[str, Any]) -> Any:
         if 'allOf' in schema_def:
@@ -408,10 +631,7 @@ class TestCaseGenerator:
 
         ref = schema_def.get('$ref')
         if ref:
-            ref_name = ref.split('/')[-1]
-            if ref_name in self.spec.parsed_schemas:
-                return self._gen_from_schema_obj(self.spec.parsed_schemas[ref_name])
-            return "test_value (::UnknownRef)"
+            return self.ref_resolver.resolve(ref)
 
         if 'example' in schema_def:
             return schema_def['example']
@@ -451,10 +671,7 @@ class TestCaseGenerator:
 
     def _gen_from_schema_obj(self, sobj: SchemaObject) -> Any:
         if sobj.ref:
-            ref_name = sobj.ref.split('/')[-1]
-            if ref_name in self.spec.parsed_schemas:
-                return self._gen_from_schema_obj(self.spec.parsed_schemas[ref_name])
-            return "test_value (::UnknownRef)"
+            return self.ref_resolver.resolve(sobj.ref)
 
         if sobj.example is not None:
             return sobj.example
@@ -501,12 +718,6 @@ class TestCaseGenerator:
             parts.append(f"  -d '{safe_body}'")
         return " \\\n".join(parts)
 
-    def _try_json_load(self, s: str) -> Any:
-        try:
-            return json.loads(s)
-        except:
-            return {}
-
     # Методы сохранения/вывода
 
     def print_test_cases(self) -> None:
@@ -520,45 +731,63 @@ class TestCaseGenerator:
         """
         Сохраняет тест-кейсы в текстовом формате (старом) в файл.
         """
-        with open(filename, 'w', encoding='utf-8') as f:
+        with TextTestCaseWriter(filename) as writer:
             for tc in self.test_cases:
-                f.write(str(tc))
+                writer.write(tc)
 
     def save_test_cases_yaml(self, filename: str) -> None:
         """
         Сохраняет тест-кейсы в файл в формате YAML,
         добавляя блок окружения и две пустые строки между элементами test_cases.
         """
-        # 1) Собираем список словарей для каждого тест-кейса
-        data_testcases = [tc.to_yaml_dict() for tc in self.test_cases]
+        with YamlTestCaseWriter(filename, self.spec.get_base_url()) as writer:
+            for tc in self.test_cases:
+                writer.write(tc)
+
+class OperationTextRenderer:
+    """
+    Ленивый текст кейса (режим low_memory): кейс операции строится заново с текстом.
+    При pickle (кейсы из процессов пула) передаются только номер операции, имя кейса и значения
+    параметров, а не готовый текст; генератор подставляет принявший процесс (_generate_parallel).
+    """
+    __slots__ = ('generator', 'index', 'name', 'param_values')
+
+    def __init__(
+            self,
+            generator: Optional[TestCaseGenerator],
+            index: int,
+            name: str,
+            param_values: Optional[Dict[tuple, Optional[str]]]
+    ):
+        self.generator = generator
+        self.index = index
+        self.name = name
+        self.param_values = param_values
+
+    def __call__(self) -> TextParts:
+        op = self.generator.spec.parsed_operations[self.index]
+        return self.generator._make_test_case(op, self.name, self.param_values, with_text=True).text_parts()
+
+    def __getstate__(self) -> tuple:
+        return self.index, self.name, self.param_values
+
+    def __setstate__(self, state: tuple) -> None:
+        self.generator = None
+        self.index, self.name, self.param_values = state
+
+
+# ======================================
+# Пул процессов для generate_test_cases(jobs > 1)
+# ======================================
+# Генератор создаётся один раз на процесс: спецификация передаётся
+# в initializer, а задачи содержат только индекс операции.
+_worker_generator: Optional[TestCaseGenerator] = None
+
+
+def _init_worker(spec: OpenAPISpec, options: Dict[str, Any]) -> None:
+    global _worker_generator
+    _worker_generator = TestCaseGenerator(spec, **options)
 
-        # 2) Формируем блок окружения (environment)
-        environment_data = {
-            "base_url": self.spec.get_base_url()  # Берём из servers[0].url
-        }
 
-        with open(filename, 'w', encoding='utf-8') as f:
-            # Сначала пишем блок окружения
-            f.write("environment:\n")
-            env_dump = yaml.dump(environment_data, sort_keys=False, allow_unicode=True, default_flow_style=False)
-            # Сдвинем строчки на 2 пробела (как и test_cases)
-            env_lines = env_dump.splitlines()
-            env_indented = ["  " + line for line in env_lines]
-            # Вставим
-            f.write("\n".join(env_indented) + "\n\n")
-
-            # Теперь выводим корневой ключ test_cases
-            f.write("test_cases:\n")
-
-            # Обходим тест-кейсы по одному
-            for item in data_testcases:
-                # Выделяем YAML для одного тест-кейса
-                dumped_item = yaml.dump(item, sort_keys=False, allow_unicode=True, default_flow_style=False)
-
-                # Делаем отступ и "- " как в предыдущей версии
-                lines = dumped_item.splitlines()
-                indented = ["  " + l for l in lines]
-                if indented:
-                    indented[0] = "- " + indented[0][2:]
-                block = "\n".join(indented) + "\n\n\n"
-                f.write(block)
\ No newline at end of file
+def _generate_one(index: int) -> List[TestCase]:
+    return _worker_generator._make_operation_test_cases(index)
@@ -0,0 +1,196 @@
+import json
+from abc import ABC, abstractmethod
+from typing import IO, List, Optional, Tuple
+
+import yaml
+
+from test_case_generation.models.OpenAPISpec import YAML_LOADER
+from test_case_generation.models.TestCase import TestCase
+from test_case_generation.utils.UniversalJSONEncoder import UniversalJSONEncoder
+
+# C-ускоренный дампер (libyaml), если PyYAML собран с ним
+YAML_DUMPER = getattr(yaml, 'CDumper', yaml.Dumper)
+
+# Блок файла: (Endpoint тест-кейса или None, исходный текст блока)
+Block = Tuple[Optional[str], str]
+
+
+class TestCaseWriter(ABC):
+    """
+    Потоковая запись тест-кейсов: файл открывается один раз, кейсы пишутся
+    по одному по мере генерации, в памяти ничего не накапливается.
+
+        with YamlTestCaseWriter("test_cases.yaml", base_url) as writer:
+            for tc in generator.iter_test_cases():
+                writer.write(tc)
+
+    Каждый формат умеет также разбить готовый файл обратно на блоки
+    тест-кейсов (split_blocks) — это нужно для инкрементальной перегенерации.
+    """
+
+    def __init__(self, filename: str, base_url: str = ''):
+        self.filename = filename
+        self.base_url = base_url
+        self._file: Optional[IO[str]] = None
+
+    def __enter__(self) -> 'TestCaseWriter':
+        self._file = open(self.filename, 'w', encoding='utf-8')
+        self._file.write(self.render_header())
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self._file.close()
+        self._file = None
+
+    def write(self, tc: TestCase) -> None:
+        self._file.write(self.render_case(tc))
+
+    def render_header(self) -> str:
+        return ""
+
+    @abstractmethod
+    def render_case(self, tc: TestCase) -> str:
+        ...
+
+    @staticmethod
+    @abstractmethod
+    def split_blocks(text: str) -> Tuple[str, List[Block]]:
+        ...
+
+
+class TextTestCaseWriter(TestCaseWriter):
+    """
+    Человекочитаемый формат (TestCase.__str__).
+    """
+
+    SEPARATOR = "=" * 70
+    CASE_PREFIX = "ТЕСТ-КЕЙС: "
+
+    def render_case(self, tc: TestCase) -> str:
+        return str(tc)
+
+    @staticmethod
+    def split_blocks(text: str) -> Tuple[str, List[Block]]:
+        """
+        Блок начинается со строки-разделителя, за которой идёт "ТЕСТ-КЕЙС: ...".
+        """
+        sep, prefix = TextTestCaseWriter.SEPARATOR, TextTestCaseWriter.CASE_PREFIX
+        lines = text.splitlines(keepends=True)
+        starts = [
+            i for i in range(len(lines) - 1)
+            if lines[i].rstrip("\n") == sep and lines[i + 1].startswith(prefix)
+        ]
+        header = "".join(lines[:starts[0]]) if starts else text
+        blocks = []
+        for n, start in enumerate(starts):
+            end = starts[n + 1] if n + 1 < len(starts) else len(lines)
+            block_lines = lines[start:end]
+            key = None
+            for line in block_lines[3:]:
+                if line.startswith("Endpoint: "):
+                    key = line[len("Endpoint: "):].rstrip("\n")
+                    break
+                if not line.strip():
+                    break
+            blocks.append((key, "".join(block_lines)))
+        return header, blocks
+
+
+class YamlTestCaseWriter(TestCaseWriter):
+    """
+    YAML: блок environment, корневой ключ test_cases и элементы списка,
+    разделённые двумя пустыми строками.
+
+    Каждый кейс выводится C-дампером как одноэлементный список прямо в файл —
+    это даёт ту же разметку, что и дамп словаря со сдвигом строк на 2 пробела,
+    без промежуточного разбиения на строки. Ширина 82 = 80 + отступ элемента списка,
+    чтобы переносы длинных строк совпадали с прежним форматом.
+    """
+
+    CASES_KEY = "test_cases:"
+    DUMP_OPTIONS = dict(Dumper=YAML_DUMPER, sort_keys=False, allow_unicode=True, default_flow_style=False)
+
+    def render_header(self) -> str:
+        environment_data = {
+            "base_url": self.base_url  # Берём из servers[0].url
+        }
+        env_dump = yaml.dump(environment_data, **self.DUMP_OPTIONS)
+        # Сдвинем строчки на 2 пробела (как и test_cases)
+        env_indented = ["  " + line for line in env_dump.splitlines()]
+        return "environment:\n" + "\n".join(env_indented) + "\n\n" + self.CASES_KEY + "\n"
+
+    def write(self, tc: TestCase) -> None:
+        yaml.dump([tc.to_yaml_dict()], self._file, width=82, **self.DUMP_OPTIONS)
+        self._file.write("\n\n")
+
+    def render_case(self, tc: TestCase) -> str:
+        return yaml.dump([tc.to_yaml_dict()], width=82, **self.DUMP_OPTIONS) + "\n\n"
+
+    @staticmethod
+    def split_blocks(text: str) -> Tuple[str, List[Block]]:
+        """
+        Шапка — всё до строки "test_cases:" включительно,
+        блоки — элементы списка (строки, начинающиеся с "- " без отступа).
+        """
+        lines = text.splitlines(keepends=True)
+        try:
+            cases_line = next(i for i, line in enumerate(lines) if line.rstrip() == YamlTestCaseWriter.CASES_KEY)
+        except StopIteration:
+            return text, []
+        header = "".join(lines[:cases_line + 1])
+        starts = [i for i in range(cases_line + 1, len(lines)) if lines[i].startswith("- ")]
+        blocks = []
+        for n, start in enumerate(starts):
+            end = starts[n + 1] if n + 1 < len(starts) else len(lines)
+            block = "".join(lines[start:end])
+            key = None
+            try:
+                item = yaml.load(block, Loader=YAML_LOADER)
+                if isinstance(item, list) and item and isinstance(item[0], dict):
+                    key = item[0].get("Endpoint")
+            except yaml.YAMLError:
+                pass
+            blocks.append((key, block))
+        return header, blocks
+
+
+class JsonlTestCaseWriter(TestCaseWriter):
+    """
+    JSON Lines: первая строка — {"environment": {...}}, далее по строке
+    на тест-кейс (та же структура, что и элемент test_cases в YAML).
+    Автотесты читают такой файл построчно.
+    """
+
+    def render_header(self) -> str:
+        return self._dumps({"environment": {"base_url": self.base_url}}) + "\n"
+
+    def render_case(self, tc: TestCase) -> str:
+        return self._dumps(tc.to_yaml_dict()) + "\n"
+
+    @staticmethod
+    def _dumps(obj) -> str:
+        return json.dumps(obj, ensure_ascii=False, cls=UniversalJSONEncoder)
+
+    @staticmethod
+    def split_blocks(text: str) -> Tuple[str, List[Block]]:
+        header = ""
+        blocks = []
+        for line in text.splitlines(keepends=True):
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+            except ValueError:
+                item = None
+            if isinstance(item, dict) and "environment" in item and not blocks and not header:
+                header = line
+                continue
+            key = item.get("Endpoint") if isinstance(item, dict) else None
+            blocks.append((key, line))
+        return header, blocks
+
+
+WRITERS = {
+    "yaml": YamlTestCaseWriter,
+    "jsonl": JsonlTestCaseWriter,
+}
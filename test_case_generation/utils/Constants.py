@@ -0,0 +1,12 @@
+from pathlib import Path
+
+# Версия генератора: входит в ключ кэша, чтобы после обновления инструмента
+# не подхватывать модели, сохранённые старой версией.
+TOOL_VERSION = "1.3.0"
+
+# Папка для кэша разобранных спецификаций
+CACHE_DIR = Path(".mbt_cache")
+
+# Минимальное число операций, начиная с которого --jobs включает пул процессов.
+# На маленьких спецификациях запуск процессов дороже самой генерации.
+PARALLEL_MIN_OPERATIONS = 200
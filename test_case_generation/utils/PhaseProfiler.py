@@ -0,0 +1,192 @@
+import argparse
+import cProfile
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, Iterator, List, Optional
+
+
+class PhaseProfiler:
+    """
+    Замер фаз работы: суммарное время (wall), число вызовов, максимум одного вызова
+    и пик памяти (tracemalloc). Фазы могут вкладываться друг в друга,
+    пик вложенной фазы учитывается и во внешней.
+
+        profiler = PhaseProfiler()
+        with profiler.phase("spec_load"):
+            ...
+        print(profiler.report())
+
+    Для фаз, которые вызываются тысячи раз (генерация одной операции),
+    память лучше не отслеживать: profiler.phase("operation", memory=False).
+    """
+
+    def __init__(self, track_memory: bool = True):
+        self.track_memory = track_memory
+        self.phases: Dict[str, Dict[str, Any]] = {}
+        # Пики памяти открытых фаз (стек), для корректной работы вложенных фаз
+        self._peak_stack: List[int] = []
+        self._started_tracemalloc = False
+        self._cprofile: Optional[cProfile.Profile] = None
+
+    @contextmanager
+    def phase(self, name: str, memory: bool = True) -> Iterator[None]:
+        memory = memory and self.track_memory
+        if memory:
+            self._start_tracemalloc()
+            # Пик, накопленный внешними фазами до этого момента, не должен потеряться
+            current_peak = tracemalloc.get_traced_memory()[1]
+            self._peak_stack = [max(p, current_peak) for p in self._peak_stack]
+            tracemalloc.reset_peak()
+            self._peak_stack.append(0)
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            peak = None
+            if memory:
+                own_peak = max(self._peak_stack.pop(), tracemalloc.get_traced_memory()[1])
+                self._peak_stack = [max(p, own_peak) for p in self._peak_stack]
+                peak = own_peak
+            self._record(name, elapsed, peak)
+
+    def _record(self, name: str, elapsed: float, peak: Optional[int]) -> None:
+        stats = self.phases.get(name)
+        if stats is None:
+            stats = self.phases[name] = {"calls": 0, "wall_s": 0.0, "max_s": 0.0, "peak_mem_bytes": None}
+        stats["calls"] += 1
+        stats["wall_s"] += elapsed
+        stats["max_s"] = max(stats["max_s"], elapsed)
+        if peak is not None:
+            stats["peak_mem_bytes"] = max(stats["peak_mem_bytes"] or 0, peak)
+
+    def _start_tracemalloc(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+    def start_cprofile(self) -> None:
+        """
+        Включает cProfile на всё время до dump_profile().
+        """
+        self._cprofile = cProfile.Profile()
+        self._cprofile.enable()
+
+    def dump_profile(self, path: str) -> List[str]:
+        """
+        Сохраняет статистику cProfile в path (читается pstats / snakeviz)
+        и снимок tracemalloc в path + '.tracemalloc' (tracemalloc.Snapshot.load).
+        Возвращает список записанных файлов.
+        """
+        written = []
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self._cprofile.dump_stats(path)
+            self._cprofile = None
+            written.append(path)
+        if tracemalloc.is_tracing():
+            snapshot_path = f"{path}.tracemalloc"
+            tracemalloc.take_snapshot().dump(snapshot_path)
+            written.append(snapshot_path)
+        return written
+
+    def stop(self) -> None:
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self._cprofile = None
+        if self._started_tracemalloc and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._started_tracemalloc = False
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: dict(stats, wall_s=round(stats["wall_s"], 6), max_s=round(stats["max_s"], 6))
+            for name, stats in self.phases.items()
+        }
+
+    def to_json(self) -> str:
+        return json.dumps({"phases": self.to_dict()}, ensure_ascii=False, indent=2)
+
+    def save_json(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.to_json())
+
+    def report(self) -> str:
+        lines = [f"{'Фаза':<24}{'вызовов':>9}{'время, с':>12}{'макс, с':>10}{'пик памяти, МБ':>17}"]
+        for name, stats in self.phases.items():
+            peak = stats["peak_mem_bytes"]
+            peak_str = f"{peak / 1024 / 1024:.1f}" if peak is not None else "—"
+            lines.append(
+                f"{name:<24}{stats['calls']:>9}{stats['wall_s']:>12.3f}{stats['max_s']:>10.3f}{peak_str:>17}"
+            )
+        return "\n".join(lines)
+
+
+def phase(profiler: Optional[PhaseProfiler], name: str, memory: bool = True):
+    """
+    profiler.phase(name) или пустой контекст, если профилирование выключено.
+    """
+    if profiler is None:
+        return nullcontext()
+    return profiler.phase(name, memory=memory)
+
+
+# ======================================
+# Опции командной строки
+# ======================================
+
+def add_profiling_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Общие для обоих CLI опции --timings, --timings-json и --profile.
+    """
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        help="Вывести время и пик памяти по фазам работы"
+    )
+    parser.add_argument(
+        "--timings-json",
+        default=None,
+        metavar="FILE",
+        help="Сохранить время и пик памяти по фазам в JSON (для CI)"
+    )
+    parser.add_argument(
+        "--profile",
+        default=None,
+        metavar="FILE",
+        help="Снять профиль cProfile в FILE и снимок памяти tracemalloc в FILE.tracemalloc"
+    )
+
+
+def profiler_from_args(args: argparse.Namespace) -> Optional[PhaseProfiler]:
+    """
+    PhaseProfiler, если запрошена хотя бы одна из опций профилирования, иначе None.
+    """
+    if not (args.timings or args.timings_json or args.profile):
+        return None
+    profiler = PhaseProfiler()
+    if args.profile:
+        profiler.start_cprofile()
+    return profiler
+
+
+def finish_profiling(profiler: Optional[PhaseProfiler], args: argparse.Namespace) -> None:
+    """
+    Выводит/сохраняет результаты профилирования и останавливает профилировщик.
+    """
+    if profiler is None:
+        return
+    try:
+        if args.profile:
+            for path in profiler.dump_profile(args.profile):
+                print(f"Профиль сохранён: {path}")
+        if args.timings:
+            print(profiler.report())
+        if args.timings_json:
+            profiler.save_json(args.timings_json)
+            print(f"Замеры по фазам сохранены: {args.timings_json}")
+    finally:
+        profiler.stop()
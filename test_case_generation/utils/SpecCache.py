@@ -0,0 +1,49 @@
+import hashlib
+import os
+import pickle
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from test_case_generation.utils.Constants import TOOL_VERSION
+
+
+class SpecCache:
+    """
+    Персистентный кэш разобранных OpenAPI спецификаций.
+    Ключ — sha256 от содержимого файла спецификации и версии инструмента,
+    значение — состояние OpenAPISpec, сохранённое через pickle.
+    """
+
+    def __init__(self, cache_dir: Union[str, Path]):
+        self.cache_dir = Path(cache_dir)
+
+    @staticmethod
+    def make_key(content: bytes) -> str:
+        h = hashlib.sha256()
+        h.update(TOOL_VERSION.encode('utf-8'))
+        h.update(b'\0')
+        h.update(content)
+        return h.hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.pickle"
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._entry_path(key)
+        if not path.exists():
+            return None
+        try:
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except Exception:
+            # Повреждённая или несовместимая запись — просто перечитаем спецификацию
+            return None
+
+    def save(self, key: str, state: Dict[str, Any]) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._entry_path(key)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        # Атомарная замена, чтобы параллельные запуски не читали недописанный файл
+        os.replace(tmp_path, path)
@@ -0,0 +1,12 @@
+import sys
+from typing import Any
+
+
+def intern_str(value: Any) -> Any:
+    """
+    Интернирует строку (повторяющиеся имена, типы, форматы хранятся в одном экземпляре).
+    Значения других типов (например, type: [string, "null"] из OpenAPI 3.1) возвращаются как есть.
+    """
+    if type(value) is str:
+        return sys.intern(value)
+    return value
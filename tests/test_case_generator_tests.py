@@ -1,4 +1,6 @@
 import pytest
+import time
+import json
 import tempfile
 import yaml
 import os
@@ -136,3 +138,1159 @@ def test_gen_stub_value():
     assert gen._gen_stub_value('number', None) == "3.14"
     assert gen._gen_stub_value('string', 'date') == "test_value (::Date)"
 
+
+def test_openapi_spec_json(tmp_path):
+    import json
+    path = tmp_path / "spec.json"
+    path.write_text(json.dumps(MINIMAL_OPENAPI), encoding='utf-8')
+    spec = OpenAPISpec(str(path))
+    assert spec.get_base_url() == "http://localhost:1234"
+    assert "todo" in spec.parsed_schemas
+
+def test_openapi_spec_cache_hit_skips_parsing(openapi_file, tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    first = OpenAPISpec(openapi_file, cache_dir=str(cache_dir))
+    assert len(list(cache_dir.glob("*.pickle"))) == 1
+
+    def fail(*args, **kwargs):
+        raise AssertionError("спецификация не должна парситься при попадании в кэш")
+    monkeypatch.setattr(OpenAPISpec, "_parse_content", fail)
+
+    cached = OpenAPISpec(openapi_file, cache_dir=str(cache_dir))
+    assert cached.spec_path == openapi_file
+    assert list(cached.parsed_schemas) == list(first.parsed_schemas)
+    assert [op.operation_id for op in cached.parsed_operations] == [op.operation_id for op in first.parsed_operations]
+
+def _spec_with_schemas(tmp_path, schemas):
+    raw = dict(MINIMAL_OPENAPI, paths={}, components={"schemas": schemas})
+    path = tmp_path / "schemas.yaml"
+    path.write_text(yaml.dump(raw, allow_unicode=True), encoding='utf-8')
+    return OpenAPISpec(str(path))
+
+def test_gen_example_self_referencing_schema_is_cut_off(tmp_path):
+    spec = _spec_with_schemas(tmp_path, {
+        "Node": {
+            "type": "object",
+            "properties": {
+                "value": {"type": "integer"},
+                "next": {"$ref": "#/components/schemas/Node"}
+            }
+        }
+    })
+    gen = TestCaseGenerator(spec, max_ref_depth=1)
+    example = gen._gen_example({"$ref": "#/components/schemas/Node"})
+    assert example == {
+        "value": 12345,
+        "next": {"value": 12345, "next": "test_value (::Recursive)"}
+    }
+    assert "Node" in gen.ref_resolver.cycle_ids
+
+def test_gen_example_shared_schema_is_memoized(tmp_path):
+    spec = _spec_with_schemas(tmp_path, {
+        "Tag": {"type": "object", "properties": {"name": {"type": "string"}}},
+        "Todo": {"type": "object", "properties": {"tag": {"$ref": "#/components/schemas/Tag"}}}
+    })
+    gen = TestCaseGenerator(spec)
+    calls = []
+    original = gen._gen_from_schema_obj
+    def counting(sobj):
+        calls.append(sobj.name)
+        return original(sobj)
+    gen._gen_from_schema_obj = counting
+    for _ in range(3):
+        gen._gen_example({"$ref": "#/components/schemas/Todo"})
+        gen._gen_example({"$ref": "#/components/schemas/Tag"})
+    assert calls.count("Todo") == 1
+    assert calls.count("Tag") == 1
+
+def test_generate_test_cases_parallel_matches_serial(openapi_file, monkeypatch):
+    from test_case_generation.utils import Constants
+    spec = OpenAPISpec(openapi_file)
+    serial = TestCaseGenerator(spec)
+    serial.generate_test_cases()
+
+    monkeypatch.setattr(Constants, "PARALLEL_MIN_OPERATIONS", 0)
+    parallel = TestCaseGenerator(spec)
+    parallel.generate_test_cases(jobs=2)
+
+    assert [str(tc) for tc in parallel.test_cases] == [str(tc) for tc in serial.test_cases]
+    assert [tc.to_yaml_dict() for tc in parallel.test_cases] == [tc.to_yaml_dict() for tc in serial.test_cases]
+
+    # --jobs с --low-memory: текст строится в основном процессе по запросу
+    lazy = TestCaseGenerator(spec, low_memory=True)
+    lazy.generate_test_cases(jobs=2)
+    assert all(tc._steps is None and tc.text_renderer.generator is lazy for tc in lazy.test_cases)
+    assert [str(tc) for tc in lazy.test_cases] == [str(tc) for tc in serial.test_cases]
+
+def test_incremental_regeneration_keeps_unchanged_cases(tmp_path):
+    import copy
+    from test_case_generation.services.IncrementalRegenerator import IncrementalRegenerator
+    from test_case_generation.services.TestCaseWriter import TextTestCaseWriter, YamlTestCaseWriter
+    spec_path = tmp_path / "spec.yaml"
+    txt_out, yaml_out = str(tmp_path / "cases.txt"), str(tmp_path / "cases.yaml")
+    manifest = str(tmp_path / "manifest.json")
+
+    def run(raw):
+        spec_path.write_text(yaml.dump(raw, allow_unicode=True), encoding='utf-8')
+        spec = OpenAPISpec(str(spec_path))
+        gen = TestCaseGenerator(spec)
+        regenerator = IncrementalRegenerator(spec, gen, manifest)
+        writers = [TextTestCaseWriter(txt_out), YamlTestCaseWriter(yaml_out, spec.get_base_url())]
+        changed = regenerator.changed_operations(writers)
+        regenerator.write(changed, gen.iter_test_cases(operations=changed), writers)
+        regenerator.save_manifest()
+        return changed
+
+    assert len(run(MINIMAL_OPENAPI)) == 3
+
+    # Ручная правка кейса неизменённой операции
+    with open(yaml_out, encoding='utf-8') as f:
+        edited = f.read().replace("Смысл: List All todos", "Смысл: Hand edited")
+    with open(yaml_out, 'w', encoding='utf-8') as f:
+        f.write(edited)
+
+    raw = copy.deepcopy(MINIMAL_OPENAPI)
+    raw["paths"]["/todos/{todoId}"]["get"]["summary"] = "Get one todo"
+    changed = run(raw)
+    assert [op.operation_id for op in changed] == ["getTodo"]
+
+    with open(yaml_out, encoding='utf-8') as f:
+        cases = yaml.safe_load(f)["test_cases"]
+    assert [c["Смысл"] for c in cases] == ["Hand edited", "Create todo", "Get one todo"]
+    with open(txt_out, encoding='utf-8') as f:
+        assert "Смысл: Get one todo" in f.read()
+
+    # Смена сервера попадает в шапку YAML
+    raw["servers"] = [{"url": "http://new-host:8080"}]
+    run(raw)
+    with open(yaml_out, encoding='utf-8') as f:
+        assert yaml.safe_load(f)["environment"]["base_url"] == "http://new-host:8080"
+
+def test_jsonl_writer_round_trip(openapi_file, tmp_path):
+    import json
+    from test_case_generation.services.TestCaseWriter import JsonlTestCaseWriter, TestCaseWriter
+
+    class NoSplitWriter(TestCaseWriter):
+        def render_case(self, tc):
+            return ""
+
+    # Формат без split_blocks не создаётся, а не падает посреди записи
+    with pytest.raises(TypeError, match="split_blocks"):
+        NoSplitWriter(str(tmp_path / "x.txt"))
+    spec = OpenAPISpec(openapi_file)
+    gen = TestCaseGenerator(spec)
+    out = tmp_path / "cases.jsonl"
+    with JsonlTestCaseWriter(str(out), spec.get_base_url()) as writer:
+        for tc in gen.iter_test_cases():
+            writer.write(tc)
+    assert gen.test_cases == []
+
+    lines = out.read_text(encoding='utf-8').splitlines()
+    assert json.loads(lines[0]) == {"environment": {"base_url": "http://localhost:1234"}}
+    assert [json.loads(line)["Endpoint"] for line in lines[1:]] == [
+        f"{op.method} {op.path}" for op in spec.parsed_operations
+    ]
+
+def test_covering_array_covers_all_pairs():
+    import itertools
+    from test_case_generation.services.CombinatorialEngine import CombinatorialEngine
+    sizes = [4, 3, 3, 2, 2, 5] + [3] * 18
+    rows = CombinatorialEngine.covering_array(sizes, 2)
+    for a, b in itertools.combinations(range(len(sizes)), 2):
+        covered = {(r[a], r[b]) for r in rows}
+        assert len(covered) == sizes[a] * sizes[b]
+    # Намного меньше полного перебора
+    assert len(rows) < 40
+
+    # 3-wise: покрыты все тройки значений
+    sizes = [3, 2, 4] + [3] * 9
+    rows = CombinatorialEngine.covering_array(sizes, 3)
+    for combo in itertools.combinations(range(len(sizes)), 3):
+        assert len({tuple(r[i] for i in combo) for r in rows}) == sizes[combo[0]] * sizes[combo[1]] * sizes[combo[2]]
+
+def test_generate_pairwise_cases(tmp_path):
+    import copy
+    raw = copy.deepcopy(MINIMAL_OPENAPI)
+    raw["paths"]["/todos"]["get"]["parameters"] = [
+        {"name": "status", "in": "query", "required": True, "schema": {"type": "string", "enum": ["open", "done"]}},
+        {"name": "limit", "in": "query", "required": True,
+         "schema": {"type": "integer", "minimum": 1, "maximum": 100}},
+        {"name": "X-Flag", "in": "header", "required": True, "schema": {"type": "boolean"}},
+    ]
+    path = tmp_path / "spec.yaml"
+    path.write_text(yaml.dump(raw, allow_unicode=True), encoding='utf-8')
+    spec = OpenAPISpec(str(path))
+    gen = TestCaseGenerator(spec, strength=2)
+    gen.generate_test_cases()
+
+    list_cases = [tc for tc in gen.test_cases if tc.endpoint == "GET /todos"]
+    assert [tc.name for tc in list_cases][:2] == ["getTodos_1_1", "getTodos_1_2"]
+    assert len(list_cases) == 4
+    pairs = {(tc.steps_struct[0]["Endpoint"], tc.steps_struct[0]["Headers"]["X-Flag"]) for tc in list_cases}
+    assert {flag for _, flag in pairs} == {"true", "false"}
+    # Операции без варьируемых параметров дают один кейс с прежним именем
+    assert [tc.name for tc in gen.test_cases if tc.endpoint == "POST /todos"] == ["createTodo_2"]
+
+def test_nested_resource_preconditions(tmp_path):
+    id_param = lambda name: {"name": name, "in": "path", "required": True, "schema": {"type": "integer"}}
+    raw = dict(MINIMAL_OPENAPI, paths={
+        "/projects": {"post": {"operationId": "createProject", "responses": {"201": {"description": "ok"}}}},
+        "/projects/{projectId}": {
+            "parameters": [id_param("projectId")],
+            "delete": {"operationId": "deleteProject", "responses": {"204": {"description": "ok"}}},
+        },
+        "/projects/{projectId}/tasks": {
+            "parameters": [id_param("projectId")],
+            "post": {"operationId": "createTask", "responses": {"201": {"description": "ok"}}},
+        },
+        "/projects/{pid}/tasks/{taskId}": {
+            "parameters": [id_param("pid"), id_param("taskId")],
+            "get": {"operationId": "getTask", "responses": {"200": {"description": "ok"}}},
+            "delete": {"operationId": "deleteTask", "responses": {"204": {"description": "ok"}}},
+        },
+    })
+    path = tmp_path / "spec.yaml"
+    path.write_text(yaml.dump(raw, allow_unicode=True), encoding='utf-8')
+    gen = TestCaseGenerator(OpenAPISpec(str(path)))
+    gen.generate_test_cases()
+    by_name = {tc.name.rsplit("_", 1)[0]: tc for tc in gen.test_cases}
+
+    get_task = by_name["getTask"]
+    assert [p["Endpoint"] for p in get_task.preconditions_struct] == [
+        "POST /projects", "POST /projects/<id_project>/tasks"
+    ]
+    assert [p["Endpoint"] for p in get_task.postconditions_struct] == [
+        "DELETE /projects/<id_p>/tasks/<id_task>", "DELETE /projects/<id_project>"
+    ]
+    assert [p["Endpoint"] for p in by_name["createTask"].preconditions_struct] == ["POST /projects"]
+    assert [p["Endpoint"] for p in by_name["deleteTask"].postconditions_struct] == ["DELETE /projects/<id_project>"]
+
+def test_low_memory_mode_renders_text_lazily(openapi_file):
+    import pickle
+    regular = TestCaseGenerator(OpenAPISpec(openapi_file))
+    regular.generate_test_cases()
+
+    spec = OpenAPISpec(openapi_file, low_memory=True)
+    assert spec.raw_spec is None and spec.paths == {}
+    gen = TestCaseGenerator(spec, low_memory=True)
+    gen.generate_test_cases()
+
+    tc = gen.test_cases[0]
+    assert tc._steps is None and tc.text_renderer is not None
+    assert [str(t) for t in gen.test_cases] == [str(t) for t in regular.test_cases]
+    assert [t.to_yaml_dict() for t in gen.test_cases] == [t.to_yaml_dict() for t in regular.test_cases]
+    # Между процессами передаётся не текст, а номер операции, имя и значения параметров
+    copied = pickle.loads(pickle.dumps(tc))
+    assert copied._steps is None and copied.text_renderer.generator is None
+    assert (copied.text_renderer.index, copied.text_renderer.name) == (0, tc.name)
+    copied.text_renderer.generator = gen
+    assert str(copied) == str(regular.test_cases[0])
+
+def test_models_use_slots():
+    from test_case_generation.models.Operation import Operation
+    from test_case_generation.models.SchemaObject import SchemaObject
+    for obj in (Operation("get", "/x"), SchemaObject("x"), TestCase("x", [], [], [], [])):
+        assert not hasattr(obj, "__dict__")
+
+def test_operation_index_selectors():
+    from test_case_generation.models.Operation import Operation
+    from test_case_generation.services.OperationIndex import OperationIndex
+    ops = [
+        Operation("get", "/todos", operation_id="listTodos", tags=["todos"]),
+        Operation("post", "/todos", operation_id="createTodo", tags=["todos"]),
+        Operation("get", "/projects/{pid}/tasks", operation_id="listTasks", tags=["tasks"]),
+        Operation("delete", "/projects/{pid}", operation_id="deleteProject", tags=["projects"]),
+        Operation("get", "/projects-admin", operation_id="listAdmin", tags=["admin"]),
+        Operation("get", "/projectsettings", operation_id="getSettings", tags=["admin"]),
+    ]
+    index = OperationIndex(ops)
+    ids = lambda selected: [op.operation_id for op in selected]
+    assert ids(index.select(["tag:todos"])) == ["listTodos", "createTodo"]
+    # Префикс пути — по целым сегментам
+    assert ids(index.select(["/projects"])) == ["listTasks", "deleteProject"]
+    assert ids(index.select(["path:/projects/"])) == ["listTasks", "deleteProject"]
+    assert ids(index.select(["path:/"], ["path:/projects"])) == ["listTodos", "createTodo", "listAdmin", "getSettings"]
+    assert ids(index.select(["GET"])) == ["listTodos", "listTasks", "listAdmin", "getSettings"]
+    assert ids(index.select(["createTodo,tasks"])) == ["createTodo", "listTasks"]
+    assert ids(index.select([], ["method:get", "id:deleteProject"])) == ["createTodo"]
+    with pytest.raises(ValueError):
+        index.select(["unknown:x"])
+
+def test_generate_only_selected_operations(openapi_file, monkeypatch):
+    from test_case_generation.services.OperationIndex import OperationIndex
+    spec = OpenAPISpec(openapi_file)
+    gen = TestCaseGenerator(spec)
+    built = []
+    original = gen._make_test_case
+    monkeypatch.setattr(gen, "_make_test_case", lambda op, *a, **kw: built.append(op.operation_id) or original(op, *a, **kw))
+    selected = OperationIndex(spec.parsed_operations).select(["id:getTodo"])
+    gen.generate_test_cases(operations=selected)
+    assert built == ["getTodo"]
+    assert [tc.name for tc in gen.test_cases] == ["getTodo_3"]
+
+
+def test_synthetic_spec_is_deterministic_and_generates(tmp_path):
+    from benchmarks.SyntheticSpecGenerator import SyntheticSpecGenerator
+
+    spec_dict = SyntheticSpecGenerator(operations=12, seed=7).generate()
+    assert spec_dict == SyntheticSpecGenerator(operations=12, seed=7).generate()
+    assert spec_dict != SyntheticSpecGenerator(operations=12, seed=8).generate()
+
+    spec_file = tmp_path / "synthetic.yaml"
+    spec_file.write_text(yaml.dump(spec_dict, sort_keys=False), encoding="utf-8")
+    spec = OpenAPISpec(str(spec_file))
+    assert len(spec.parsed_operations) == 12
+
+    generator = TestCaseGenerator(spec)
+    generator.generate_test_cases()
+    assert len(generator.test_cases) == 12
+    # Циклические схемы (TreeNode, Owner <-> Pet) обрезаются, а не уходят в бесконечную рекурсию
+    assert any("::Recursive" in str(tc) for tc in generator.test_cases)
+
+
+def test_benchmark_baseline_comparison():
+    from benchmarks.main import compare_with_baseline
+
+    baseline = {"runs": {"10": {"phases": {"generate": {"wall_s": 1.0, "peak_mem_bytes": 100}}}}}
+    same = {"runs": {"10": {"phases": {"generate": {"wall_s": 1.1, "peak_mem_bytes": 100}}}}}
+    slower = {"runs": {"10": {"phases": {"generate": {"wall_s": 1.5, "peak_mem_bytes": 100}}}}}
+    assert compare_with_baseline(same, baseline, tolerance=0.2) == []
+    assert len(compare_with_baseline(slower, baseline, tolerance=0.2)) == 1
+
+
+def test_phase_profiler_records_pipeline_phases(openapi_file, tmp_path):
+    from test_case_generation.utils.PhaseProfiler import PhaseProfiler
+
+    profiler = PhaseProfiler()
+    profiler.start_cprofile()
+    try:
+        spec = OpenAPISpec(openapi_file, profiler=profiler)
+        generator = TestCaseGenerator(spec, profiler=profiler)
+        with profiler.phase("generate"):
+            generator.generate_test_cases()
+        written = profiler.dump_profile(str(tmp_path / "run.prof"))
+    finally:
+        profiler.stop()
+
+    phases = profiler.to_dict()
+    for name in ("spec_load", "schema_parse", "operation_parse", "generate"):
+        assert phases[name]["calls"] == 1
+        assert phases[name]["peak_mem_bytes"] > 0
+    assert phases["operation_generate"]["calls"] == len(spec.parsed_operations)
+    assert phases["operation_generate"]["peak_mem_bytes"] is None
+    assert json.loads(profiler.to_json())["phases"].keys() == phases.keys()
+    assert written == [str(tmp_path / "run.prof"), str(tmp_path / "run.prof.tracemalloc")]
+    assert all(os.path.exists(path) for path in written)
+
+
+def test_autotest_module_size_does_not_depend_on_case_count(openapi_file, tmp_path):
+    from autotest_generation.services.AutotestGenerator import create_test_file
+    from autotest_generation.utils.Constants import RUNTIME_MODULE, TEST_DATA_FILE, TRANSPORT_MODULE
+
+    spec = OpenAPISpec(openapi_file)
+    generator = TestCaseGenerator(spec)
+    generator.generate_test_cases()
+    cases = [tc.to_yaml_dict() for tc in generator.test_cases]
+
+    sizes = []
+    for count in (1, 200):
+        out_dir = tmp_path / str(count)
+        out_dir.mkdir()
+        create_test_file(
+            (cases * count)[:count], spec.get_base_url(), out_dir / "test_todos.py", transport={"retries": 0}
+        )
+        assert (out_dir / f"{RUNTIME_MODULE}.py").exists()
+        assert (out_dir / f"{TRANSPORT_MODULE}.py").exists()
+        data = json.loads((out_dir / TEST_DATA_FILE).read_text(encoding="utf-8"))
+        assert data["transport"] == {"retries": 0}
+        assert data["base_url"] == spec.get_base_url()
+        assert len(data["test_cases"]) == len(data["ids"]) == count
+        sizes.append((out_dir / "test_todos.py").stat().st_size)
+
+    assert sizes[0] == sizes[1]
+    assert data["ids"][0] == "getTodos_1"
+    assert data["test_cases"][0]["Шаги"][0]["Endpoint"] == "GET /todos"
+
+
+def test_shard_planner_balances_by_history(tmp_path):
+    from autotest_generation.services.ShardPlanner import ShardPlanner
+    from autotest_generation.services.AutotestRunner import combine_returncodes
+
+    planner = ShardPlanner({"slow_1": 10.0, "a_2": 1.0, "b_3": 1.0, "c_4": 1.0})
+    cases = [{"Тест-кейс": name} for name in ("a_2", "slow_1", "b_3", "c_4", "new_5")]
+
+    shards = planner.plan(cases, workers=2)
+    # Долгий кейс один в своём шарде, остальные (включая новый, без истории) — в другом
+    assert shards == [[1], [0, 2, 3, 4]]
+    assert sorted(i for shard in planner.plan(cases, workers=10) for i in shard) == list(range(5))
+
+    assert combine_returncodes([0, 0]) == 0
+    assert combine_returncodes([0, 1, 5]) == 1
+    assert combine_returncodes([1, 3]) == 3
+    assert combine_returncodes([5, 5]) == 5
+
+
+def test_run_history_selects_failed_and_changed(tmp_path):
+    from autotest_generation.services.RunHistory import RunHistory
+
+    path = tmp_path / "history.json"
+    cases = [{"Тест-кейс": name, "Шаги": [name]} for name in ("ok_1", "bad_2", "edited_3", "new_4")]
+    history = RunHistory(path)
+    for tc in cases[:3]:
+        history.record(tc, "failed" if tc["Тест-кейс"] == "bad_2" else "passed", 0.5)
+    history.save()
+
+    history = RunHistory(path)
+    edited = [dict(tc) for tc in cases]
+    edited[2]["Шаги"] = ["другой шаг"]
+    names = lambda selected: [tc["Тест-кейс"] for tc in selected]
+    assert names(history.select(edited, "all")) == ["ok_1", "bad_2", "edited_3", "new_4"]
+    assert names(history.select(edited, "failed")) == ["bad_2"]
+    # Кейс, ни разу не прошедший с текущими данными, тоже попадает в changed
+    assert names(history.select(edited, "changed")) == ["bad_2", "edited_3", "new_4"]
+    assert names(history.select(edited, "failed-first")) == ["bad_2", "edited_3", "new_4", "ok_1"]
+    assert history.durations() == {"ok_1": 0.5, "bad_2": 0.5, "edited_3": 0.5}
+    assert RunHistory.test_id_from_nodeid("test_todos.py::test_scenario[bad_2]") == "bad_2"
+
+    history.record(edited[1], "passed", 0.2)
+    assert names(history.select(edited, "failed")) == []
+
+    path.write_text("{испорчено", encoding="utf-8")
+    assert RunHistory(path).tests == {}
+
+
+def _start_todo_server():
+    """
+    Локальный HTTP/1.1 сервер (keep-alive) с мини-API /todos для проверки исполнителей.
+    state["unavailable"] — сколько следующих запросов получат 503 (для проверки повторов).
+    """
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    state = {"todos": {}, "next_id": 1, "connections": 0, "unavailable": 0, "lock": threading.Lock()}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            with state["lock"]:
+                state["connections"] += 1
+
+        def log_message(self, *args):
+            pass
+
+        def _reply(self, status, payload=None, chunked=False):
+            body = json.dumps(payload).encode() if payload is not None else b""
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            if chunked:
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for part in (body[:3], body[3:]):
+                    if part:
+                        self.wfile.write(b"%x\r\n%s\r\n" % (len(part), part))
+                self.wfile.write(b"0\r\n\r\n")
+            else:
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        def _body(self):
+            length = int(self.headers.get("Content-Length", 0))
+            return json.loads(self.rfile.read(length)) if length else None
+
+        def _unavailable(self):
+            with state["lock"]:
+                if not state["unavailable"]:
+                    return False
+                state["unavailable"] -= 1
+            self._body()
+            self._reply(503, {"error": "unavailable"})
+            return True
+
+        def do_POST(self):
+            if self._unavailable():
+                return
+            data = self._body() or {}
+            with state["lock"]:
+                todo_id = state["next_id"]
+                state["next_id"] += 1
+                state["todos"][todo_id] = dict(data, id=todo_id)
+            self._reply(201, state["todos"][todo_id])
+
+        def do_GET(self):
+            if self._unavailable():
+                return
+            self._body()
+            if self.path == "/todos":
+                return self._reply(200, list(state["todos"].values()), chunked=True)
+            todo = state["todos"].get(int(self.path.rsplit("/", 1)[1]))
+            self._reply(200 if todo else 404, todo or {"error": "not found"})
+
+        def do_PUT(self):
+            data = self._body() or {}
+            todo_id = int(self.path.rsplit("/", 1)[1])
+            with state["lock"]:
+                if todo_id in state["todos"]:
+                    state["todos"][todo_id] = dict(data, id=todo_id)
+            todo = state["todos"].get(todo_id)
+            self._reply(200 if todo else 404, todo or {"error": "not found"})
+
+        def do_DELETE(self):
+            self._body()
+            state["todos"].pop(int(self.path.rsplit("/", 1)[1]), None)
+            self._reply(204)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+def test_transport_reuses_connections_and_retries_idempotent_requests():
+    pytest.importorskip("requests")
+    from autotest_generation.services.AutotestTransport import create_session
+
+    server, state = _start_todo_server()
+    # localhost, а не 127.0.0.1: имя разрешается (dns_ms), а сервер слушает только IPv4
+    base_url = f"http://localhost:{server.server_address[1]}"
+    session = create_session({"retries": 2, "backoff": 0})
+    try:
+        first = session.post(f"{base_url}/todos", json={"title": "a"})
+        second = session.get(f"{base_url}/todos/1")
+        state["unavailable"] = 2
+        retried = session.get(f"{base_url}/todos/1")
+        state["unavailable"] = 1
+        not_retried = session.post(f"{base_url}/todos", json={"title": "b"})
+    finally:
+        session.close()
+        server.shutdown()
+
+    assert first.status_code == 201 and second.status_code == 200
+    assert first.timing["new_connections"] == 1 and not first.timing["reused_connection"]
+    assert first.timing["dns_ms"] > 0 and first.timing["connect_ms"] > 0
+    assert first.timing["total_ms"] >= first.timing["ttfb_ms"] > 0
+    # Второй запрос идёт по тому же keep-alive соединению: ни DNS, ни установки соединения
+    assert second.timing["new_connections"] == 0 and second.timing["reused_connection"]
+    assert second.timing["dns_ms"] == 0 and second.timing["connect_ms"] == 0
+    # GET повторяется при 503 до успеха, POST — нет: ответ 503 возвращается тесту, ресурс не создан
+    assert retried.status_code == 200 and retried.timing["retries"] == 2
+    assert not_retried.status_code == 503 and not_retried.timing["retries"] == 0
+    assert state["unavailable"] == 0 and state["next_id"] == 2
+    assert session.stats == {"requests": 4, "new_connections": state["connections"],
+                             "reused_connections": 4 - state["connections"], "retries": 2}
+    assert state["connections"] == 1
+
+
+def _todo_case(name, title, expected_title):
+    return {
+        "Тест-кейс": name,
+        "Описание": "",
+        "Предусловия": [{"Endpoint": "POST /todos", "Headers": {}, "Cookies": {}, "Body": {"title": title}}],
+        "Шаги": [{"Endpoint": "GET /todos/<id_todo>", "Headers": {}, "Cookies": {}, "Body": {}}],
+        "Ожидаемый результат": {"Статус": "200", "Body": {"title": expected_title}},
+        "Постусловия": [{"Endpoint": "DELETE /todos/<id_todo>", "Headers": {}, "Cookies": {}, "Body": {}}],
+    }
+
+
+def test_async_runner_against_local_server(tmp_path):
+    from autotest_generation.services.AsyncRunner import AsyncRunner, print_summary
+
+    server, state = _start_todo_server()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        cases = [_todo_case(f"todo_{i}", f"t{i}", f"t{i}") for i in range(20)]
+        cases.append(_todo_case("wrong_title", "real", "expected"))
+        cases.append({
+            "Тест-кейс": "list_chunked",
+            "Шаги": [{"Endpoint": "GET /todos", "Body": {}}],
+            "Ожидаемый результат": {"Статус": "200"},
+        })
+        results = AsyncRunner(base_url, allure_results=str(tmp_path), concurrency=8, limit_per_host=4).run(cases)
+    finally:
+        server.shutdown()
+
+    by_name = {r.name: r for r in results}
+    assert [r.name for r in results] == [c["Тест-кейс"] for c in cases]
+    assert all(by_name[f"todo_{i}"].status == "passed" for i in range(20))
+    assert by_name["wrong_title"].status == "failed"
+    assert by_name["list_chunked"].status == "passed"
+    # Постусловия выполняются и у упавшего кейса: все ресурсы удалены
+    assert state["todos"] == {}
+    # Соединения переиспользуются и не превышают лимит на хост
+    assert state["connections"] <= 4
+    assert print_summary(results) == 1
+
+    allure_files = list(tmp_path.glob("*-result.json"))
+    assert len(allure_files) == len(cases)
+    failed = [json.loads(p.read_text(encoding="utf-8")) for p in allure_files]
+    failed = [r for r in failed if r["status"] == "failed"]
+    assert [r["name"] for r in failed] == ["wrong_title"]
+    assert [s["name"] for s in failed[0]["steps"]] == [
+        "Предусловия", "Основной шаг", "Проверка ожидаемого результата", "Постусловия"
+    ]
+    assert "title" in failed[0]["statusDetails"]["message"]
+
+
+def test_async_run_history_selects_nothing_changed_on_rerun(tmp_path):
+    from autotest_generation.services.AutotestRunner import run_autotests_async
+    from autotest_generation.services.RunHistory import RunHistory
+    from autotest_generation.utils.TestCaseReader import load_test_cases
+
+    server, _ = _start_todo_server()
+    yaml_file = tmp_path / "test_cases.yaml"
+    yaml_file.write_text(yaml.dump({
+        "environment": {"base_url": f"http://127.0.0.1:{server.server_address[1]}"},
+        "test_cases": [_todo_case(f"todo_{i}", f"t{i}", f"t{i}") for i in range(3)],
+    }, allow_unicode=True), encoding="utf-8")
+    history_file = tmp_path / "history.json"
+    try:
+        returncode = run_autotests_async(
+            str(yaml_file), str(tmp_path / "allure"), history_file=history_file,
+            step_timings=tmp_path / "timings.json"
+        )
+    finally:
+        server.shutdown()
+
+    assert returncode == 0
+    cases = load_test_cases(str(yaml_file))["test_cases"]
+    assert RunHistory(history_file).select(cases, "changed") == []
+
+
+def test_shared_resource_pool_creates_once_and_cleans_up_at_end():
+    from autotest_generation.services.AutotestRuntime import (
+        ResourcePool, precondition_captures, is_read_only, run_postconditions
+    )
+
+    class Response:
+        def __init__(self, status_code, payload=None):
+            self.status_code = status_code
+            self.payload = payload
+
+        def json(self):
+            return self.payload
+
+    class RecordingSession:
+        def __init__(self):
+            self.calls = []
+
+        def request(self, method, url, **kwargs):
+            self.calls.append(f"{method} {url}")
+            return Response(201, {"id": len(self.calls)}) if method == "POST" else Response(204)
+
+    def request(endpoint):
+        return {"Endpoint": endpoint, "Headers": {}, "Cookies": {}, "Body": {}}
+
+    pres = [request("POST /users"), request("POST /users/<id_user>/pets")]
+    posts = [request("DELETE /users/<id_user>/pets/<id_pet>"), request("DELETE /users/<id_user>")]
+    read_case = {"Предусловия": pres, "Шаги": [request("GET /users/<id_user>/pets/<id_pet>")], "Постусловия": posts}
+    write_case = dict(read_case, Шаги=[request("PUT /users/<id_user>/pets/<id_pet>")])
+
+    # id сохраняется в плейсхолдер, который используют следующие запросы, а не всегда в id_todo
+    assert precondition_captures(read_case) == ["id_user", "id_pet"]
+    assert precondition_captures({"Предусловия": [request("POST /todos")]}) == ["id_todo"]
+    assert is_read_only(read_case) and not is_read_only(write_case)
+
+    session = RecordingSession()
+    pool = ResourcePool(session, "http://h")
+    for _ in range(3):
+        context = pool.acquire(pres, ["id_user", "id_pet"])
+        assert context == {"id_user": 1, "id_pet": 2}
+        pool.defer(context, posts)
+    # Меняющий кейс: общий родитель и свой экземпляр
+    context = pool.acquire(pres[:1], ["id_user"])
+    context["id_pet"] = 99
+    pool.defer(context, posts)
+    assert session.calls == ["POST http://h/users", "POST http://h/users/1/pets"]
+
+    pool.cleanup()
+    assert session.calls[2:] == [
+        "DELETE http://h/users/1/pets/2", "DELETE http://h/users/1/pets/99", "DELETE http://h/users/1"
+    ]
+    assert pool.report() == "Общие ресурсы: создано 2, переиспользовано 5"
+
+    failing = ResourcePool(type("Down", (), {"request": lambda *a, **k: Response(500)})(), "http://h")
+    for _ in range(2):
+        with pytest.raises(AssertionError, match="Общий ресурс не создан"):
+            failing.acquire(pres[:1], ["id_user"])
+    assert failing.created == 0
+
+    # Постусловия per-test: ресурс, id которого не сохранён, пропускается, ошибки запросов не роняют очистку
+    class BrokenSession(RecordingSession):
+        def request(self, method, url, **kwargs):
+            super().request(method, url, **kwargs)
+            raise ConnectionError("обрыв")
+
+    session = BrokenSession()
+    run_postconditions(session, {"id_user": 1}, "http://h", read_case)
+    assert session.calls == ["DELETE http://h/users/1"]
+
+
+def test_crud_scenario_chains_operations_and_halves_requests(tmp_path):
+    from test_case_generation.services.ScenarioGenerator import ScenarioGenerator
+    from autotest_generation.services.AsyncRunner import AsyncRunner
+
+    ok = lambda code: {code: {"description": "ok"}}
+    body = {"content": {"application/json": {"schema": {
+        "type": "object", "properties": {"title": {"type": "string", "example": "buy milk"}}
+    }}}}
+    # Ответы с id из примера (12345): сервер присвоит другой, поэтому чтение сравнивается с сохранённым
+    todo = {"description": "ok", "content": {"application/json": {"schema": {"type": "object", "properties": {
+        "id": {"type": "integer"}, "title": {"type": "string", "example": "buy milk"},
+        "tags": {"type": "array", "items": {"type": "string"}},
+    }}}}}
+    todo_id = [{"name": "todoId", "in": "path", "required": True, "schema": {"type": "integer"}}]
+    raw = dict(MINIMAL_OPENAPI, paths={
+        "/todos": {
+            "get": {"operationId": "listTodos", "responses": ok("200")},
+            "post": {"operationId": "createTodo", "requestBody": body, "responses": {"201": todo}},
+        },
+        "/todos/{todoId}": {
+            "parameters": todo_id,
+            "get": {"operationId": "getTodo", "responses": {"200": todo}},
+            "put": {"operationId": "updateTodo", "requestBody": body, "responses": {"200": todo}},
+            "delete": {"operationId": "deleteTodo", "responses": ok("204")},
+        },
+    })
+    path = tmp_path / "spec.yaml"
+    path.write_text(yaml.dump(raw, allow_unicode=True), encoding='utf-8')
+    gen = TestCaseGenerator(OpenAPISpec(str(path)))
+
+    scenarios = ScenarioGenerator(gen)
+    resources = scenarios.resources()
+    assert list(resources) == ["/todos/{todoId}"]
+    covered = scenarios.covered_operations(resources)
+    assert sorted(op.operation_id for op in gen.spec.parsed_operations if id(op) in covered) == [
+        "createTodo", "deleteTodo", "getTodo", "updateTodo"
+    ]
+    scenario = next(scenarios.iter_scenarios(resources))
+    data = scenario.to_yaml_dict()
+    assert data["Тест-кейс"] == "crud_todos"
+    assert [step["Endpoint"] for step in data["Шаги"]] == [
+        "POST /todos", "GET /todos/<id_todo>", "PUT /todos/<id_todo>", "GET /todos/<id_todo>", "DELETE /todos/<id_todo>"
+    ]
+    assert data["Шаги"][0]["Сохранить"] == {"id_todo": "id", "id_todo_title": "title"}
+    assert data["Шаги"][2]["Сохранить"] == {"id_todo_title": "title"}
+    assert data["Шаги"][1]["Ожидаемый результат"]["Body"] == {"id": "<id_todo>", "title": "<id_todo_title>"}
+    assert data["Ожидаемый результат"]["Статус"] == "204"
+    # Удаление ресурса — и постусловием, на случай падения до шага DELETE
+    assert [post["Endpoint"] for post in data["Постусловия"]] == ["DELETE /todos/<id_todo>"]
+    assert "Сохранить id созданного ресурса в <id_todo>" in str(scenario)
+
+    # Запросы отдельных кейсов тех же операций против фактических запросов сценария
+    gen.generate_test_cases(operations=[op for op in gen.spec.parsed_operations if id(op) in covered])
+    calls = lambda d: sum(len(d[key] or []) for key in ("Предусловия", "Шаги", "Постусловия"))
+    isolated = sum(calls(tc.to_yaml_dict()) for tc in gen.test_cases)
+
+    server, state = _start_todo_server()
+    try:
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        broken = json.loads(json.dumps(data))
+        broken["Шаги"][2]["Body"] = {"title": "changed"}
+        broken["Шаги"][2]["Сохранить"] = {}
+        missing = json.loads(json.dumps(data))
+        missing["Шаги"][0]["Сохранить"] = {"id_todo": "id", "id_todo_title": "missing"}
+        results = AsyncRunner(base_url).run([data, broken, missing])
+    finally:
+        server.shutdown()
+    assert [r.status for r in results] == ["passed", "failed", "failed"]
+    # Второе чтение сравнивается с сохранённым ответом изменения, а не с примером
+    assert "$.title: ожидалось \"buy milk\", получено \"changed\"" in results[1].message
+    assert "нет поля missing" in results[2].message
+    # Постусловия удалили ресурсы упавших сценариев, успешный не удалял свой повторно
+    assert state["todos"] == {}
+    assert len(results[0].timings) == len(data["Шаги"])
+    assert len(results[0].timings) * 2 <= isolated
+
+
+def test_body_assertion_engine_partial_exact_and_selectors():
+    from autotest_generation.services.AutotestRuntime import check_expected, compile_test_case
+
+    class Response:
+        status_code = 200
+        text = "..."
+
+        def __init__(self, payload):
+            self.payload = payload
+
+        def json(self):
+            return self.payload
+
+    def diffs(expected, payload):
+        try:
+            check_expected(Response(payload), expected)
+        except AssertionError as e:
+            return str(e)
+        return None
+
+    payload = {"meta": {"total": 3, "page": 1}, "items": [{"id": i, "title": f"t{i}", "done": False} for i in range(5000)]}
+    # Частичное сравнение: вложенные объекты — по подмножеству ключей, списки — без учёта порядка
+    expected = {"Body": {"meta": {"total": 3}, "items": [{"id": i, "title": f"t{i}"} for i in reversed(range(5000))]}}
+    started = time.perf_counter()
+    assert diffs(expected, payload) is None
+    assert time.perf_counter() - started < 1.0
+    assert "_plan" in expected
+
+    message = diffs({"Body": {"meta": {"total": 4}, "items": [{"id": 7, "title": "x"}, {"id": 9000}, 1]}}, payload)
+    first_line, *rest = message.splitlines()
+    assert first_line == "Тело ответа не совпадает с ожидаемым: $.meta.total: ожидалось 4, получено 3 (всего расхождений: 4)"
+    assert rest == [
+        '  $.items[id=7].title: ожидалось "x", получено "t7"',
+        '  $.items: нет элемента {"id": 9000}',
+        "  $.items: нет элемента 1",
+    ]
+
+    exact = {"Сравнение": "exact", "Body": {"tags": ["b", "a", "a"], "n": 1.0}}
+    assert diffs(exact, {"tags": ["a", "b", "a"], "n": 1}) is None
+    assert diffs(exact, {"tags": ["a", "b"], "n": True, "extra": 1}).splitlines() == [
+        "Тело ответа не совпадает с ожидаемым: $.tags: ожидалось элементов: 3, получено: 2 (всего расхождений: 4)",
+        '  $.tags: нет элемента "a"',
+        "  $.n: ожидалось 1.0, получено true",
+        "  $: лишние ключи extra",
+    ]
+
+    selectors = {"Пути": {"$.items[*].id": [4999, 0], "$.meta['page']": 1, "$.items[2].title": "t2", "$.nope": 1}}
+    assert diffs(selectors, payload) == "Тело ответа не совпадает с ожидаемым: $.nope: нет значения"
+
+    case = {"Тест-кейс": "t", "Шаги": [{"Endpoint": "GET /x", "Ожидаемый результат": {"Body": [1, {"a": 1}]}}],
+            "Ожидаемый результат": {"Статус": "200", "Body": {}}}
+    compiled = compile_test_case(case)
+    assert compiled["Ожидаемый результат"]["_plan"]["body"] is None
+    assert json.loads(json.dumps(compiled))["Шаги"][0]["Ожидаемый результат"]["_plan"]["body"]["t"] == "list"
+    assert "_plan" not in case["Шаги"][0]["Ожидаемый результат"]
+
+
+def test_latency_expectations_generated_and_checked(tmp_path):
+    from autotest_generation.services.AutotestRuntime import check_latency, percentile, latency_repeats
+    from autotest_generation.services.AsyncRunner import AsyncRunner
+
+    raw = json.loads(json.dumps(MINIMAL_OPENAPI))
+    raw["paths"]["/todos"]["get"]["x-latency"] = {"max_ms": 50, "repeat": 5}
+    path = tmp_path / "spec.yaml"
+    path.write_text(yaml.dump(raw, allow_unicode=True), encoding='utf-8')
+    gen = TestCaseGenerator(OpenAPISpec(str(path)), latency={"p95_ms": 200, "max_ms": None})
+    gen.generate_test_cases()
+    by_endpoint = {tc.endpoint: tc.to_yaml_dict() for tc in gen.test_cases}
+    # x-latency операции переопределяет умолчания по ключам
+    assert by_endpoint["GET /todos"]["Ожидаемый результат"]["Время ответа"] == {"Максимум": 50, "p95": 200, "Повторы": 5}
+    assert by_endpoint["POST /todos"]["Ожидаемый результат"]["Время ответа"] == {"p95": 200, "Повторы": 1}
+    assert "Время ответа: не больше 50 мс, p95 не больше 200 мс (замеров: 5)" in str(gen.test_cases[0])
+    # Без ожиданий поле не выводится
+    plain = TestCaseGenerator(OpenAPISpec(str(path)))
+    plain.generate_test_cases()
+    assert [tc.endpoint for tc in plain.test_cases if "Время ответа" in tc.to_yaml_dict()["Ожидаемый результат"]] \
+        == ["GET /todos"]
+
+    assert percentile([5, 1, 3, 2, 4], 95) == 5 and percentile([1, 2, 3, 4], 50) == 2
+    check_latency([10, 20], {"Максимум": 20, "p95": 20})
+    with pytest.raises(AssertionError, match=r"максимум 30.0 мс > 20 мс"):
+        check_latency([10, 30], {"Максимум": 20})
+    # Изменяющий шаг не повторяется
+    assert latency_repeats({"Шаги": [{"Endpoint": "POST /t"}], "Ожидаемый результат": {"Время ответа": {"Повторы": 3}}})[1] == 1
+
+    server, state = _start_todo_server()
+    try:
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        fast = _todo_case("fast", "a", "a")
+        fast["Ожидаемый результат"]["Время ответа"] = {"Максимум": 5000, "p95": 5000, "Повторы": 3}
+        slow = _todo_case("slow", "b", "b")
+        slow["Ожидаемый результат"]["Время ответа"] = {"Максимум": 0}
+        results = AsyncRunner(base_url, allure_results=str(tmp_path / "allure")).run([fast, slow])
+    finally:
+        server.shutdown()
+    assert [r.status for r in results] == ["passed", "failed"]
+    assert "Время ответа: максимум" in results[1].message
+    # Тайминги: предусловие, три замера основного шага, постусловие
+    assert [t[0] for t in results[0].timings] == ["Предусловия", "Шаги", "Повторы", "Повторы", "Постусловия"]
+    assert results[0].timings[1][1:3] == ["GET /todos/1", 200]
+    assert len(list((tmp_path / "allure").glob("*-attachment.json"))) == 2
+
+
+def test_load_runner_replays_cases_with_weights_and_histogram():
+    from autotest_generation.services.LatencyHistogram import LatencyHistogram
+    from autotest_generation.services.LoadRunner import LoadRunner, case_weights, parse_mix
+
+    histogram, other = LatencyHistogram(), LatencyHistogram()
+    size = len(histogram.counts)
+    for value in range(1, 10001):
+        (histogram if value % 2 else other).record(value / 10)
+    histogram.merge(other)
+    histogram.record(10 ** 9)
+    assert len(histogram.counts) == size
+    assert histogram.total == 10001 and histogram.max_us == 10 ** 12
+    for percent, exact in ((50, 500.0), (90, 900.0), (99, 990.0)):
+        assert abs(histogram.percentile(percent) - exact) <= exact / 100
+
+    cases = [_todo_case("get_todo", "a", "a"), _todo_case("wrong_status", "b", "b"), {
+        "Тест-кейс": "list_todos", "Вес": 0,
+        "Шаги": [{"Endpoint": "GET /todos", "Body": {}}], "Ожидаемый результат": {"Статус": "200"},
+    }]
+    cases[1]["Ожидаемый результат"]["Статус"] = "201"
+    assert case_weights(cases, parse_mix(["get_*=3", "wrong_*=1"])) == [3.0, 1.0, 0.0]
+    with pytest.raises(ValueError):
+        parse_mix(["get_todo"])
+
+    server, state = _start_todo_server()
+    try:
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        report = LoadRunner(base_url, duration=0.5, users=3).run(cases, case_weights(cases, parse_mix(["get_*=3"])))
+        created = state["next_id"] - 1
+        paced = LoadRunner(base_url, duration=0.5, users=3, rps=60).run(cases[:1], [1.0])
+    finally:
+        server.shutdown()
+
+    assert set(report["cases"]) == {"get_todo", "wrong_status"}
+    get_todo, wrong = report["cases"]["get_todo"], report["cases"]["wrong_status"]
+    assert get_todo["requests"] > wrong["requests"] > 0
+    assert get_todo["errors"] == {} and wrong["errors"] == {"статус 200": wrong["requests"]}
+    assert report["errors"] == wrong["requests"]
+    assert report["latency"]["count"] == report["requests"] and report["latency"]["p99_ms"] > 0
+    # Предусловия — один раз на пользователя и кейс, постусловия удалили все ресурсы
+    assert created <= 3 * 2 and report["setup_requests"] == 2 * created
+    assert state["todos"] == {}
+    assert 20 <= paced["requests"] <= 31 and paced["errors"] == 0
+
+
+def test_load_runner_gives_deleting_cases_fresh_setup():
+    from autotest_generation.services import AutotestRuntime as runtime
+    from autotest_generation.services.LoadRunner import LoadRunner, consumes_setup, iteration_postconditions
+
+    delete_case = _todo_case("delete_todo", "d", "d")
+    delete_case["Шаги"] = [{"Endpoint": "DELETE /todos/<id_todo>", "Headers": {}, "Cookies": {}, "Body": {}}]
+    delete_case["Ожидаемый результат"] = {"Статус": "204"}
+    get_case = _todo_case("get_todo", "a", "a")
+    # Как createTodo: ресурс создаёт сам шаг, постусловие удаляет его по id из ответа шага
+    create_case = _todo_case("create_todo", "c", "c")
+    create_case["Шаги"], create_case["Предусловия"] = create_case["Предусловия"], []
+    create_case["Ожидаемый результат"] = {"Статус": "201"}
+    assert consumes_setup(delete_case) and not consumes_setup(get_case)
+    assert runtime.step_captures(create_case) == {0: "id_todo"} and runtime.step_captures(get_case) == {}
+    assert iteration_postconditions(create_case) == create_case["Постусловия"]
+    assert iteration_postconditions(get_case) == []
+
+    server, state = _start_todo_server()
+    try:
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        cases = [delete_case, get_case, create_case]
+        report = LoadRunner(base_url, duration=0.5, users=2).run(cases, [1.0, 1.0, 1.0])
+        left = dict(state["todos"])
+        paced = LoadRunner(base_url, duration=0.5, users=2, rps=60).run([create_case], [1.0])
+    finally:
+        server.shutdown()
+
+    deleted, created = report["cases"]["delete_todo"], report["cases"]["create_todo"]
+    assert deleted["iterations"] > 2 and deleted["errors"] == {}
+    assert created["iterations"] > 2 and created["errors"] == {}
+    assert report["errors"] == 0
+    # Ресурс создаётся заново на каждую итерацию удаления, созданные шагами удаляются после итерации
+    assert state["next_id"] - 1 >= deleted["iterations"] + created["iterations"]
+    assert left == {} and state["todos"] == {}
+    # Удаления после итераций занимают места в расписании rps: всего не больше ~30 запросов за 0,5 с
+    assert paced["setup_requests"] >= paced["requests"] - 2
+    assert 20 <= paced["requests"] + paced["setup_requests"] <= 33
+    assert paced["offered_rps"] > paced["throughput_rps"]
+
+
+def test_mock_server_routes_store_and_keep_alive(tmp_path):
+    import asyncio
+    from mock_server.MockServer import MockServer
+    from mock_server.PathRouter import PathRouter
+    from autotest_generation.services.AsyncHttpClient import AsyncHttpClient
+
+    router = PathRouter()
+    for path in ("/todos", "/todos/{id}", "/todos/count", "/todos/{id}/items/{itemId}"):
+        router.add(path, path)
+    assert router.match("/todos/count") == ("/todos/count", {})
+    assert router.match("/todos/7/") == ("/todos/{id}", {"id": "7"})
+    assert router.match("/todos/7/items/9") == ("/todos/{id}/items/{itemId}", {"id": "7", "itemId": "9"})
+    # Литерал не подошёл дальше — пробуется параметр
+    assert router.match("/todos/count/items/9") == ("/todos/{id}/items/{itemId}", {"id": "count", "itemId": "9"})
+    assert router.match("/todos/7/nope") is None
+
+    raw = json.loads(json.dumps(MINIMAL_OPENAPI))
+    raw["paths"]["/todos/{todoId}"]["delete"] = {"operationId": "deleteTodo", "responses": {"204": {"description": "ok"}}}
+    path = tmp_path / "spec.yaml"
+    path.write_text(yaml.dump(raw, allow_unicode=True), encoding='utf-8')
+    mock = MockServer(OpenAPISpec(str(path)))
+    server = mock.run_in_thread()
+
+    async def scenario():
+        async with AsyncHttpClient(limit_per_host=1) as client:
+            url = server.base_url + "/todos"
+            created = await client.request("POST", url, json_body={"name": "buy milk"})
+            todo = created.json()
+            got = await client.request("GET", f"{url}/{todo['id']}?verbose=1")
+            deleted = await client.request("DELETE", f"{url}/{todo['id']}")
+            missing = await client.request("GET", f"{url}/{todo['id']}")
+            statuses = [r.status_code for r in (created, got, deleted, missing)]
+            listed = await client.request("GET", url)
+            wrong = await client.request("PATCH", url)
+            return statuses, todo, got.json(), listed.status_code, wrong.status_code, client.connections_opened
+
+    async def pipelined_and_concurrent(count):
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        writer.write(b"GET /todos HTTP/1.1\r\nHost: x\r\n\r\nGET /nope HTTP/1.1\r\nHost: x\r\n\r\n")
+        first = await reader.readuntil(b"\r\n\r\n")
+        await reader.readexactly(int(first.split(b"Content-Length: ")[1].split(b"\r\n")[0]))
+        second = await reader.readline()
+        writer.close()
+
+        async def connect():
+            r, w = await asyncio.open_connection("127.0.0.1", server.port)
+            w.write(b"GET /todos HTTP/1.1\r\nHost: x\r\n\r\n")
+            await r.readuntil(b"\r\n\r\n")
+            return w
+
+        writers = await asyncio.gather(*(connect() for _ in range(count)))
+        active = mock.active_connections
+        for w in writers:
+            w.close()
+        return first.split(b"\r\n")[0], second.strip(), active
+
+    try:
+        statuses, todo, got, listed, wrong, opened = asyncio.run(scenario())
+        first, second, active = asyncio.run(pipelined_and_concurrent(500))
+    finally:
+        server.stop()
+    assert statuses == [201, 200, 204, 404]
+    assert got == todo and todo["name"] == "buy milk" and todo["id"] == 1
+    assert (listed, wrong, opened) == (200, 405, 1)
+    assert (first, second) == (b"HTTP/1.1 200 OK", b"HTTP/1.1 404 Not Found")
+    assert active >= 500
+    assert mock.store == {"/todos": {}}
+
+
+def test_compiled_placeholder_substitution():
+    from autotest_generation.services.AutotestRuntime import compile_request, fill_body, prepare_request
+
+    context = {"id_todo": 7}
+    static_body = {"title": "x", "tags": [1, 2], "meta": {"a": "b"}}
+    request = {"Endpoint": "PUT /todos/<id_todo>/items/<id_item>", "Headers": {}, "Body": {
+        "title": "todo <id_todo>", "tags": [1, "<id_todo>"], "meta": {"a": "b"}, "n": 5,
+    }}
+    compiled = compile_request(request)
+    assert compiled["path_template"] == [["/todos/", "/items/", ""], ["id_todo", "id_item"]]
+    assert [slot[0] for slot in compiled["body_slots"]] == [["title"], ["tags", 1]]
+
+    method, url, headers, cookies, body = prepare_request(context, "http://h", dict(request, _compiled=compiled))
+    assert (method, url) == ("PUT", "http://h/todos/7/items/<id_item>")
+    assert headers["Content-Type"] == "application/json"
+    assert body == {"title": "todo 7", "tags": [1, "7"], "meta": {"a": "b"}, "n": 5}
+    # Исходное тело не меняется, нетронутые ветви не копируются
+    assert request["Body"]["tags"] == [1, "<id_todo>"]
+    assert body["meta"] is request["Body"]["meta"]
+    # Тело без плейсхолдеров передаётся как есть
+    assert fill_body(static_body, compile_request({"Endpoint": "POST /t", "Body": static_body})["body_slots"], context) \
+        is static_body
+
+
+def test_incremental_codegen_rewrites_only_changed_files(tmp_path, monkeypatch):
+    from autotest_generation.services import AutotestGenerator
+    from autotest_generation.services.AutotestGenerator import create_test_file
+    from autotest_generation.services.IncrementalCodegen import IncrementalCodegen
+
+    cases = [{"Тест-кейс": "a_1", "Шаги": [{"Endpoint": "GET /a", "Body": {}}], "Ожидаемый результат": {}}]
+    out_dir = tmp_path / "generated"
+
+    def generate(test_cases):
+        codegen = IncrementalCodegen(out_dir)
+        keep = create_test_file(test_cases, "http://h", out_dir / "test_a.py", codegen=codegen)
+        codegen.prune(keep)
+        codegen.save()
+        return codegen
+
+    assert generate(cases).written == 4
+    (out_dir / "test_stale.py").write_text("", encoding="utf-8")
+    module_mtime = (out_dir / "test_a.py").stat().st_mtime_ns
+
+    again = generate(cases)
+    assert (again.written, again.unchanged) == (0, 4)
+    assert not (out_dir / "test_stale.py").exists()
+    assert (out_dir / "test_a.py").stat().st_mtime_ns == module_mtime
+
+    changed = generate([dict(cases[0], Описание="new")])
+    assert changed.written == 1
+    assert "new" in (out_dir / "test_cases.json").read_text(encoding="utf-8")
+
+    # Файл, изменённый в обход манифеста, перезаписывается
+    (out_dir / "test_a.py").write_text("broken", encoding="utf-8")
+    assert generate([dict(cases[0], Описание="new")]).written == 1
+    assert "test_scenario" in (out_dir / "test_a.py").read_text(encoding="utf-8")
+
+    # Новый исполнитель компилирует кейсы по-своему: файл данных тоже перезаписывается
+    runtime = tmp_path / "AutotestRuntime.py"
+    runtime.write_bytes(AutotestGenerator.RUNTIME_SOURCE.read_bytes() + b"\n# new\n")
+    monkeypatch.setattr(AutotestGenerator, "RUNTIME_SOURCE", runtime)
+    assert generate([dict(cases[0], Описание="new")]).written == 2
+
+
+def test_test_cases_cache_hit_skips_parsing(tmp_path, monkeypatch):
+    from autotest_generation.utils import TestCaseReader
+
+    yaml_file = tmp_path / "test_cases.yaml"
+    yaml_file.write_text(yaml.dump({
+        "environment": {"base_url": "http://h"},
+        "test_cases": [_todo_case("todo_1", "t", "t")],
+    }, allow_unicode=True), encoding="utf-8")
+    cache_dir = tmp_path / "cache"
+    first = TestCaseReader.load_test_cases(str(yaml_file), cache_dir)
+    first["test_cases"][0]["_compiled"] = True
+
+    def fail(*args, **kwargs):
+        raise AssertionError("кейсы не должны парситься при попадании в кэш")
+    monkeypatch.setattr(TestCaseReader, "_parse", fail)
+
+    # Из кэша — исходные данные, без того, что исполнитель добавил в кейсы
+    cached = TestCaseReader.load_test_cases(str(yaml_file), cache_dir)
+    assert cached == {"environment": {"base_url": "http://h"}, "test_cases": [_todo_case("todo_1", "t", "t")]}
+
+    yaml_file.write_text(yaml.dump({"environment": {}, "test_cases": []}), encoding="utf-8")
+    with pytest.raises(AssertionError):
+        TestCaseReader.load_test_cases(str(yaml_file), cache_dir)
+
+
+def _write_pytest_dir(directory, body):
+    from autotest_generation.services.AutotestRunner import REPORTER_SOURCE
+
+    directory.mkdir()
+    (directory / "conftest.py").write_bytes(REPORTER_SOURCE.read_bytes())
+    (directory / "test_sample.py").write_text(body, encoding="utf-8")
+
+
+def test_pytest_processes_stream_results_and_stop_on_maxfail(tmp_path, capsys):
+    from autotest_generation.services.AutotestRunner import _run_pytest_processes
+
+    ok_dir, bad_dir = tmp_path / "ok", tmp_path / "bad"
+    _write_pytest_dir(ok_dir, "import pytest\n@pytest.mark.parametrize('i', range(3))\ndef test_ok(i):\n    pass\n")
+    _write_pytest_dir(
+        bad_dir,
+        "import time, pytest\n@pytest.mark.parametrize('i', range(50))\n"
+        "def test_bad(i):\n    time.sleep(0.05)\n    assert i < 0, 'boom'\n"
+    )
+    base = ["-p", "no:cacheprovider", "-q"]
+
+    assert _run_pytest_processes(
+        [["pytest", str(ok_dir)] + base], [tmp_path / "ok.jsonl"], total=3
+    ) == 0
+    assert "Прогресс: 3/3 (100%), прошло 3, упало 0" in capsys.readouterr().out
+
+    assert _run_pytest_processes(
+        [["pytest", str(ok_dir)] + base, ["pytest", str(bad_dir)] + base],
+        [tmp_path / "ok.jsonl", tmp_path / "bad.jsonl"],
+        total=53,
+        maxfail=2
+    ) == 1
+    out = capsys.readouterr().out
+    assert "Остановка прогона: достигнут --maxfail 2" in out
+    assert "[FAILED] test_sample.py::test_bad[0]: AssertionError: boom" in out
+
+
+def test_pytest_processes_stop_on_deadline(tmp_path):
+    from autotest_generation.services.AutotestRunner import _run_pytest_processes
+
+    _write_pytest_dir(tmp_path / "slow", "import time\ndef test_slow():\n    time.sleep(30)\n")
+    start = time.monotonic()
+    assert _run_pytest_processes(
+        [["pytest", str(tmp_path / "slow"), "-p", "no:cacheprovider"]], [tmp_path / "slow.jsonl"], total=1, deadline=1
+    ) == 2
+    assert time.monotonic() - start < 15